@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Atomic File Writes
+
+Every file the indexer and server publish (skill store blobs, the index
+generation marker and manifest, NumPy index files, the index artifact,
+Prometheus textfiles) is written to a temp file in the same directory and
+renamed over the target, so readers see the old file or the new one, never
+a partial write.
+
+tempfile.mkstemp() creates its file with mode 0600; the rename would carry
+that over, leaving the result unreadable to other users (e.g. a server or
+node_exporter running as a different account). The temp file is therefore
+chmod'ed to the mode a plain open() would have given it (0644 less the
+umask) before it is renamed.
+"""
+
+import os
+import tempfile
+from typing import BinaryIO, Callable
+
+
+def _umask() -> int:
+    # os.umask() can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+DEFAULT_MODE = 0o644  # before the umask, as for open(path, 'w')
+_UMASK = _umask()
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], None],
+                 mode: int = DEFAULT_MODE, fsync: bool = False):
+    """
+    Create or replace path with what write(f) writes to a binary file.
+
+    mode (less the process umask) is applied before the rename; fsync=True
+    also flushes the data to disk first, for large files worth keeping
+    across a crash.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, mode & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ChromaDB vs NumPy vector backends
+
+Builds both backends from the same synthetic, seeded embedding set and
+measures, for each one in a fresh subprocess (so RSS is not shared):
+
+- startup: import + open the collection + first query
+- RSS after startup and the query run
+- query latency p50/p99 over a fixed query set
+- recall@k against exact search (NumPy float32 is exact by construction)
+
+No embedding model is needed: vectors are random unit vectors, which is
+the worst case for HNSW and the typical case for a brute-force matmul.
+
+Usage:
+    python bench/bench_backends.py
+    python bench/bench_backends.py --n-skills 20000 --queries 1000
+    python bench/bench_backends.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_backends import open_collection  # noqa: E402
+
+
+COLLECTION_NAME = "bench_skills"
+DEFAULT_N_SKILLS = 5000
+DEFAULT_DIM = 384
+DEFAULT_QUERIES = 500
+DEFAULT_K = 10
+SEED = 42
+
+
+def unit_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Random L2-normalized float32 vectors."""
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_metadata(i: int) -> dict:
+    """Metadata shaped like an indexed skill (no content; that lives in the store)."""
+    return {
+        "name": f"Synthetic Skill {i}",
+        "tags": f"tag{i % 50},tag{i % 7},synthetic",
+        "intent": f"Synthetic skill number {i} for backend benchmarking.",
+        "risk_level": ("low", "medium", "high")[i % 3],
+        "version": "1.0.0",
+        "content_sha256": f"{i:064x}",
+    }
+
+
+def build_indexes(workdir: str, n_skills: int, dim: int, n_queries: int) -> dict:
+    """Write the Chroma collection, NumPy indexes and query file. Returns paths."""
+    rng = np.random.default_rng(SEED)
+    embeddings = unit_vectors(n_skills, dim, rng)
+    queries = unit_vectors(n_queries, dim, rng)
+    ids = [f"skills/synthetic-{i}/SKILL.md" for i in range(n_skills)]
+    metadatas = [synthetic_metadata(i) for i in range(n_skills)]
+
+    paths = {"queries": os.path.join(workdir, "queries.npy")}
+    np.save(paths["queries"], queries)
+
+    targets = [("chroma", None), ("numpy", "float32"), ("numpy", "float16"), ("numpy", "int8")]
+    for backend, dtype in targets:
+        label = backend if dtype is None else f"{backend}-{dtype}"
+        path = os.path.join(workdir, label)
+        start = time.perf_counter()
+        collection = open_collection(
+            backend, path, COLLECTION_NAME, None, create=True,
+            numpy_dtype=dtype or "float32"
+        )
+        if backend == "chroma":
+            batch = collection._client.get_max_batch_size()
+            for lo in range(0, n_skills, batch):
+                collection.upsert(
+                    ids=ids[lo:lo + batch],
+                    embeddings=embeddings[lo:lo + batch],
+                    metadatas=metadatas[lo:lo + batch]
+                )
+        else:
+            collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+        print(f"Built {label} index in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        paths[label] = (backend, path)
+    return paths
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend: str, path: str, queries_path: str, k: int) -> dict:
+    """Measure one backend in this (fresh) process."""
+    start = time.perf_counter()
+    collection = open_collection(backend, path, COLLECTION_NAME, None)
+    queries = np.load(queries_path)
+    collection.query(query_embeddings=queries[:1], n_results=k, include=["metadatas", "distances"])
+    startup = time.perf_counter() - start
+    rss_startup = current_rss_mb()
+
+    latencies = []
+    result_ids = []
+    for query in queries:
+        t = time.perf_counter()
+        result = collection.query(
+            query_embeddings=query[None, :], n_results=k, include=["metadatas", "distances"]
+        )
+        latencies.append(time.perf_counter() - t)
+        result_ids.append(result["ids"][0])
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "startup_s": startup,
+        "rss_startup_mb": rss_startup,
+        "rss_after_queries_mb": current_rss_mb(),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "ids": result_ids,
+    }
+
+
+def recall_at_k(results: list[list[str]], truth: list[list[str]]) -> float:
+    """Mean fraction of the exact top-k found by a backend."""
+    hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare ChromaDB and NumPy vector backends",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--n-skills", type=int, default=DEFAULT_N_SKILLS,
+                        help=f"Synthetic library size (default: {DEFAULT_N_SKILLS})")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM,
+                        help=f"Embedding dimension (default: {DEFAULT_DIM}, as all-MiniLM-L6-v2)")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help=f"Number of timed queries (default: {DEFAULT_QUERIES})")
+    parser.add_argument("-k", type=int, default=DEFAULT_K,
+                        help=f"Results per query (default: {DEFAULT_K})")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    parser.add_argument("--worker", nargs=3, metavar=("BACKEND", "PATH", "QUERIES"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, path, queries_path = args.worker
+        print(json.dumps(run_worker(backend, path, queries_path, args.k)))
+        return 0
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-backends-") as workdir:
+        paths = build_indexes(workdir, args.n_skills, args.dim, args.queries)
+        for label, target in paths.items():
+            if label == "queries":
+                continue
+            backend, path = target
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "-k", str(args.k),
+                 "--worker", backend, path, paths["queries"]],
+                capture_output=True, text=True, check=True
+            )
+            results[label] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    truth = results["numpy-float32"]["ids"]
+    for label, result in results.items():
+        result["recall_at_k"] = recall_at_k(result.pop("ids"), truth)
+
+    print(f"\n{args.n_skills} skills, dim {args.dim}, {args.queries} queries, k={args.k}\n")
+    print(f"{'backend':<16}{'startup s':>11}{'RSS MiB':>10}{'p50 ms':>9}{'p99 ms':>9}{'recall@k':>10}")
+    for label, r in results.items():
+        print(f"{label:<16}{r['startup_s']:>11.3f}{r['rss_after_queries_mb']:>10.1f}"
+              f"{r['p50_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['recall_at_k']:>10.3f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                "n_skills": args.n_skills, "dim": args.dim,
+                "queries": args.queries, "k": args.k, "results": results,
+            }, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
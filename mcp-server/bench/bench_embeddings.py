@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local ONNX embedding throughput and query latency
+
+Embeds the real skill library's searchable texts (repeated up to --texts)
+with OnnxEmbedder for every combination of threads, batch size, max
+sequence length and float/int8 weights, and measures:
+
+- indexing throughput: texts embedded per second, in batches
+- query latency p50/p99: one short query per call, as the server embeds
+
+With --fixed-padding, each setting is also run padding every input to
+max_seq_len, as Chroma's default embedding function does, to show what
+dynamic padding saves on short queries.
+
+Pick the fastest setting, then pass the same flags (--embed-threads,
+--embed-batch-size, --max-seq-len, --int8) to index_skills.py and
+mcp_server.py. max_seq_len and int8 change the vectors, so changing them
+needs a re-index.
+
+Usage:
+    python bench/bench_embeddings.py
+    python bench/bench_embeddings.py --threads 1 2 4 --batch-size 8 32 --int8 both
+    python bench/bench_embeddings.py --model-path ~/models/bge-small/onnx --json embed.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+MCP_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MCP_SERVER_DIR)
+
+from embeddings import (  # noqa: E402
+    DEFAULT_MODEL_PATH, INT8_MODEL_FILE, EmbeddingConfig, OnnxEmbedder,
+)
+from index_skills import (  # noqa: E402
+    DEFAULT_SKILLS_DIR, build_searchable_text, find_skill_files, parse_skill_file,
+)
+
+
+DEFAULT_TEXTS = 256
+DEFAULT_QUERIES = 200
+DEFAULT_THREADS = (1, 2, 0)
+DEFAULT_BATCH_SIZES = (1, 8, 32)
+DEFAULT_SEQ_LENS = (128, 256)
+QUERIES = (
+    "parse large documents",
+    "run python tests with uv",
+    "find and load skills",
+    "what time is it",
+    "create a new skill from a workflow",
+    "debug a failing kubernetes deployment",
+)
+
+
+def skill_texts(skills_dir: str, n: int) -> list[str]:
+    """Searchable texts of the skill library, repeated to n entries."""
+    texts = []
+    for filepath in find_skill_files(skills_dir):
+        skill = parse_skill_file(filepath)
+        if skill:
+            texts.append(build_searchable_text(skill))
+    if not texts:
+        raise SystemExit(f"No skills found in {skills_dir}")
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def fix_padding(embedder: OnnxEmbedder):
+    """Pad every input to max_seq_len, as Chroma's default function does."""
+    embedder.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]",
+                                      length=embedder.config.max_seq_len)
+
+
+def measure(embedder: OnnxEmbedder, texts: list[str], n_queries: int) -> dict:
+    """Throughput over texts and single-query latency percentiles."""
+    embedder(QUERIES[:2])  # warm-up: first run allocates buffers
+    start = time.perf_counter()
+    embedder(texts)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for i in range(n_queries):
+        t = time.perf_counter()
+        embedder([QUERIES[i % len(QUERIES)]])
+        latencies.append(time.perf_counter() - t)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "texts_per_s": len(texts) / elapsed,
+        "query_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "query_p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ONNX embedding throughput and query latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--model-path", default=DEFAULT_MODEL_PATH,
+                        help=f"Model directory (default: {DEFAULT_MODEL_PATH})")
+    parser.add_argument("--skills-dir", default=os.path.join(MCP_SERVER_DIR, DEFAULT_SKILLS_DIR),
+                        help="Skill library to take texts from (default: the repo's skills)")
+    parser.add_argument("--texts", type=int, default=DEFAULT_TEXTS,
+                        help=f"Texts embedded per throughput run (default: {DEFAULT_TEXTS})")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help=f"Timed single queries per setting (default: {DEFAULT_QUERIES})")
+    parser.add_argument("--threads", nargs="+", type=int, default=list(DEFAULT_THREADS),
+                        help="Intra-op thread counts, 0 = one per core "
+                             f"(default: {' '.join(map(str, DEFAULT_THREADS))})")
+    parser.add_argument("--batch-size", nargs="+", type=int, default=list(DEFAULT_BATCH_SIZES),
+                        help=f"Batch sizes (default: {' '.join(map(str, DEFAULT_BATCH_SIZES))})")
+    parser.add_argument("--max-seq-len", nargs="+", type=int, default=list(DEFAULT_SEQ_LENS),
+                        help=f"Truncation lengths (default: {' '.join(map(str, DEFAULT_SEQ_LENS))})")
+    parser.add_argument("--int8", choices=("off", "on", "both"), default="off",
+                        help=f"Float weights, {INT8_MODEL_FILE} (quantized on first use), "
+                             "or both (default: off)")
+    parser.add_argument("--fixed-padding", action="store_true",
+                        help="Also run each setting with inputs padded to max_seq_len")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    texts = skill_texts(args.skills_dir, args.texts)
+    int8_options = {"off": [False], "on": [True], "both": [False, True]}[args.int8]
+    padding_options = ["dynamic", "fixed"] if args.fixed_padding else ["dynamic"]
+
+    print(f"\n{len(texts)} texts, {args.queries} queries, {os.cpu_count()} CPUs\n")
+    print(f"{'int8':<6}{'threads':>8}{'batch':>7}{'seq':>6}{'padding':>9}"
+          f"{'texts/s':>10}{'q p50 ms':>10}{'q p99 ms':>10}")
+
+    results = []
+    for int8, threads, seq_len in itertools.product(int8_options, args.threads, args.max_seq_len):
+        for batch_size, padding in itertools.product(args.batch_size, padding_options):
+            config = EmbeddingConfig(args.model_path, threads, batch_size, seq_len, int8)
+            embedder = OnnxEmbedder(config)
+            if padding == "fixed":
+                fix_padding(embedder)
+            row = {
+                "int8": int8, "threads": threads, "batch_size": batch_size,
+                "max_seq_len": seq_len, "padding": padding,
+                **measure(embedder, texts, args.queries),
+            }
+            results.append(row)
+            print(f"{'yes' if int8 else 'no':<6}{threads or 'auto':>8}{batch_size:>7}{seq_len:>6}"
+                  f"{padding:>9}{row['texts_per_s']:>10.1f}"
+                  f"{row['query_p50_ms']:>10.2f}{row['query_p99_ms']:>10.2f}", flush=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model_path": args.model_path, "texts": len(texts), "queries": args.queries,
+                "cpus": os.cpu_count(), "results": results,
+            }, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: indexing and search at scale
+
+For each library size, generates a synthetic SKILL.md library with labeled
+queries (bench/synthetic_library.py), then measures, each in a fresh
+process:
+
+- index_skills wall time and peak RSS (full build into an empty index)
+- server cold start: spawn to MCP handshake, and spawn to the first
+  successful search_skills response (model and index loaded; "still
+  loading" errors are retried)
+- search_skills latency p50/p99 over the labeled queries, end to end over
+  stdio as a client sees it, and server RSS afterwards
+- recall@k: per query, the share of its relevant skills in the top k
+  (at most k can be found), averaged
+
+The JSON report records the commit, machine and settings next to the
+results, so reports from two commits can be diffed with --compare:
+
+    python bench/bench_scale.py --json base.json          # on main
+    python bench/bench_scale.py --json new.json --compare base.json
+
+Libraries are regenerated identically from the seed; pass --workdir to
+keep and reuse them (100k skills take a while to write). Indexes are
+always rebuilt. The embedding model flags (see embeddings.py) are passed
+to both the indexer and the server.
+
+Usage:
+    python bench/bench_scale.py                               # 100 1k 10k 100k
+    python bench/bench_scale.py --sizes 100 1000 --backend numpy
+    python bench/bench_scale.py --workdir /tmp/scale --json report.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MCP_SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, MCP_SERVER_DIR)
+
+from embeddings import EmbeddingConfig  # noqa: E402
+from mcp_server import MAX_RESULTS  # noqa: E402
+from synthetic_library import DEFAULT_QUERIES, SEED, load_queries, write_library  # noqa: E402
+from vector_backends import BACKENDS, DEFAULT_BACKEND  # noqa: E402
+
+
+REPORT_VERSION = 1
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+COLD_QUERY = "cold start probe"
+COLD_START_LIMIT = 1800  # seconds; the server answers "still loading" errors until ready
+PATH_PATTERN = re.compile(r'^\*\*Path\*\*: (.+)$', re.MULTILINE)
+FALLBACK_NOTE = "keyword matches only"
+# (report key, column header, format) for the summary table and --compare
+COLUMNS = (
+    ("index_s", "index s", "{:.1f}"),
+    ("index_peak_rss_mb", "idx MiB", "{:.0f}"),
+    ("handshake_s", "hello s", "{:.2f}"),
+    ("cold_start_s", "cold s", "{:.2f}"),
+    ("server_rss_mb", "srv MiB", "{:.0f}"),
+    ("query_p50_ms", "p50 ms", "{:.1f}"),
+    ("query_p99_ms", "p99 ms", "{:.1f}"),
+    ("recall_at_k", "recall@k", "{:.3f}"),
+)
+
+
+def git_revision() -> dict:
+    """Commit and dirty flag of the working tree, if it is a git checkout."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=MCP_SERVER_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def embedding_flags(args) -> list[str]:
+    """The EmbeddingConfig flags from args, to pass on to the indexer and server."""
+    flags = ["--model-path", args.model_path, "--embed-threads", str(args.embed_threads),
+             "--embed-batch-size", str(args.embed_batch_size), "--max-seq-len", str(args.max_seq_len)]
+    return flags + (["--int8"] if args.int8 else [])
+
+
+def index_paths(index_dir: str) -> dict:
+    return {
+        "chroma": os.path.join(index_dir, "chroma_data"),
+        "numpy": os.path.join(index_dir, "numpy_index"),
+        "store": os.path.join(index_dir, "skill_store"),
+    }
+
+
+def run_index_worker(skills_dir: str, index_dir: str, backend: str,
+                     embedding_config: EmbeddingConfig) -> dict:
+    """Index the library in this (fresh) process; report time and peak RSS."""
+    from index_skills import index_skills
+
+    paths = index_paths(index_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        count = index_skills(skills_dir, paths["chroma"], paths["store"], backend=backend,
+                             numpy_path=paths["numpy"], embedding_config=embedding_config)
+    return {
+        "indexed": count,
+        "index_s": time.perf_counter() - start,
+        # ru_maxrss is KiB on Linux
+        "index_peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def index_library(skills_dir: str, index_dir: str, backend: str, flags: list[str],
+                  log_path: str) -> dict:
+    """Build a fresh index in a subprocess (so peak RSS is the indexer's alone)."""
+    shutil.rmtree(index_dir, ignore_errors=True)
+    with open(log_path, 'w', encoding='utf-8') as log:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--backend", backend, *flags,
+             "--worker-index", skills_dir, index_dir],
+            stdout=subprocess.PIPE, stderr=log, text=True
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Indexing failed (exit {proc.returncode}); see {log_path}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def server_pid() -> int | None:
+    """PID of this process's mcp_server.py child (Linux /proc), or None."""
+    parent = str(os.getpid())
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding='utf-8') as f:
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+            with open(f"/proc/{entry}/cmdline", 'rb') as f:
+                cmdline = f.read()
+        except (OSError, IndexError):
+            continue
+        if ppid == parent and b"mcp_server.py" in cmdline:
+            return int(entry)
+    return None
+
+
+def process_rss_mb(pid: int | None) -> float | None:
+    """Current RSS of pid in MiB, from /proc/<pid>/status."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def recall_at_k(found: list[list[str]], relevant: list[list[str]], k: int) -> float:
+    """Mean per-query share of relevant skills in the top k (capped at k)."""
+    scores = [
+        len(set(f[:k]) & set(r)) / min(k, len(r))
+        for f, r in zip(found, relevant) if r
+    ]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+async def measure_server(skills_dir: str, index_dir: str, backend: str, flags: list[str],
+                         queries: list[dict], k: int, log_path: str) -> dict:
+    """Start mcp_server.py over stdio, time the cold start, then run the labeled queries."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    paths = index_paths(index_dir)
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(MCP_SERVER_DIR, "mcp_server.py"), "--backend", backend,
+              "--chroma-path", paths["chroma"], "--numpy-path", paths["numpy"],
+              "--store-path", paths["store"], "--skills-dir", skills_dir, *flags],
+        cwd=MCP_SERVER_DIR,
+    )
+    latencies = []
+    found = []
+    fallbacks = 0
+    errors = 0
+    with open(log_path, 'w', encoding='utf-8') as log:
+        start = time.perf_counter()
+        async with stdio_client(params, errlog=log) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                handshake = time.perf_counter() - start
+                while True:
+                    result = await session.call_tool("search_skills", {"query": COLD_QUERY})
+                    cold_start = time.perf_counter() - start
+                    if not result.content[0].text.startswith("Error"):
+                        break
+                    if cold_start > COLD_START_LIMIT:
+                        raise RuntimeError(f"Server not ready after {cold_start:.0f}s; see {log_path}")
+
+                for query in queries:
+                    t = time.perf_counter()
+                    result = await session.call_tool(
+                        "search_skills",
+                        {"query": query["query"], "n_results": k, "detail": "summary"}
+                    )
+                    latencies.append(time.perf_counter() - t)
+                    text = "".join(c.text for c in result.content if hasattr(c, "text"))
+                    errors += text.startswith("Error")
+                    fallbacks += FALLBACK_NOTE in text
+                    found.append(PATH_PATTERN.findall(text))
+                rss = process_rss_mb(server_pid())
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "handshake_s": handshake,
+        "cold_start_s": cold_start,
+        "server_rss_mb": rss,
+        "query_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "query_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "recall_at_k": recall_at_k(found, [q["relevant"] for q in queries], k),
+        "keyword_fallback_responses": fallbacks,
+        "error_responses": errors,
+    }
+
+
+def format_row(size, result: dict) -> str:
+    cells = [f"{size:>8}"]
+    for key, header, fmt in COLUMNS:
+        value = result.get(key)
+        cells.append(f"{fmt.format(value) if value is not None else '-':>{max(len(header), 8) + 1}}")
+    return "".join(cells)
+
+
+def header_row() -> str:
+    return f"{'skills':>8}" + "".join(f"{header:>{max(len(header), 8) + 1}}" for _, header, _ in COLUMNS)
+
+
+def compare(base: dict, current: dict):
+    """Print each metric of current next to base, with the relative change."""
+    for key in ("model", "backend", "k", "queries", "seed"):
+        if base["settings"].get(key) != current["settings"].get(key):
+            print(f"WARNING: {key} differs: base {base['settings'].get(key)!r}, "
+                  f"current {current['settings'].get(key)!r}")
+    print(f"\nCompared with {(base['git']['commit'] or 'unknown')[:12]}:\n")
+    print(f"{'skills':>8}  {'metric':<20}{'base':>12}{'current':>12}{'change':>10}")
+    for size, result in current["results"].items():
+        before = base["results"].get(size)
+        if before is None:
+            continue
+        for key, _, fmt in COLUMNS:
+            old, new = before.get(key), result.get(key)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            print(f"{size:>8}  {key:<20}{fmt.format(old):>12}{fmt.format(new):>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark indexing and search on synthetic libraries of several sizes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help=f"Library sizes (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help=f"Labeled queries per size (default: {DEFAULT_QUERIES})")
+    parser.add_argument("-k", type=int, default=MAX_RESULTS,
+                        help=f"Results per query for recall@k (default: {MAX_RESULTS}, the server's maximum)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"Vector backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Library seed (default: {SEED})")
+    parser.add_argument("--workdir", help="Keep libraries, indexes and logs here (default: a temp dir)")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    parser.add_argument("--compare", metavar="BASE_JSON", help="Compare with an earlier report")
+    parser.add_argument("--worker-index", nargs=2, metavar=("SKILLS_DIR", "INDEX_DIR"),
+                        help=argparse.SUPPRESS)
+    EmbeddingConfig.add_arguments(parser)
+    args = parser.parse_args()
+
+    embedding_config = EmbeddingConfig.from_args(args)
+    if args.worker_index:
+        print(json.dumps(run_index_worker(*args.worker_index, args.backend, embedding_config)))
+        return 0
+
+    flags = embedding_flags(args)
+    results = {}
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-scale-"))
+        os.makedirs(workdir, exist_ok=True)
+        print(f"\n{args.backend} backend, {embedding_config.describe()}, k={args.k}\n")
+        print(header_row())
+        for size in args.sizes:
+            library = os.path.join(workdir, f"library-{size}-seed{args.seed}")
+            skills_dir = write_library(library, size, args.queries, args.seed)
+            queries = load_queries(library)[:args.queries]
+            index_dir = os.path.join(workdir, f"index-{size}")
+            result = index_library(skills_dir, index_dir, args.backend, flags,
+                                   os.path.join(workdir, f"index-{size}.log"))
+            result.update(asyncio.run(measure_server(
+                skills_dir, index_dir, args.backend, flags, queries, args.k,
+                os.path.join(workdir, f"server-{size}.log")
+            )))
+            for key in ("keyword_fallback_responses", "error_responses"):
+                if result[key]:
+                    print(f"WARNING: {result[key]} {key.replace('_', ' ')}; "
+                          f"see {os.path.join(workdir, f'server-{size}.log')}", file=sys.stderr)
+            results[str(size)] = result
+            print(format_row(size, result), flush=True)
+
+    try:
+        model = {**embedding_config.metadata(), "threads": args.embed_threads,
+                 "batch_size": args.embed_batch_size}
+    except OSError:
+        model = {"embedding:model": embedding_config.model_name}
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": git_revision(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "settings": {"backend": args.backend, "k": args.k, "queries": args.queries,
+                     "seed": args.seed, "model": model},
+        "results": results,
+    }
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
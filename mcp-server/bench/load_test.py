@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Load Generator for mcp_server.py
+
+Launches the server (or attaches to a running one with --url) and drives
+search_skills from a query corpus, recording:
+
+- latency distribution: percentiles and a log-bucket histogram
+- errors by kind: tool errors ("Error: ..." responses), timeouts, transport
+  exceptions
+- a time series (every --sample-interval): throughput, in-flight requests,
+  errors, p50/p99 and server RSS
+
+Two ways to apply load:
+
+- closed loop (default): --concurrency workers, each sending its next
+  request when the previous one returns. Throughput adapts to the server,
+  so a slow server sees less load and queueing stays hidden.
+- open loop (--rate R): requests arrive at R per second on a fixed
+  schedule (or Poisson with --arrival poisson) whether or not earlier ones
+  finished. Latency is measured from each request's scheduled arrival, so
+  time spent queued (in the client, the transport or the server) counts.
+  Past the server's capacity, in-flight requests and latency grow without
+  bound, which is the honest answer.
+
+Transports: stdio runs one server process and one session; many requests
+share it concurrently, as one agent issuing parallel calls would.
+streamable-http and sse start one shared server on --bind, and --sessions
+clients connect to it, as many agent sessions would. Requests are spread
+over the sessions round-robin.
+
+Server flags go after "--" (e.g. "-- --backend numpy --result-cache-bytes 0").
+Repeated queries hit the server's result and embedding caches; use
+--unique-queries to append a counter so every request misses them.
+
+Usage:
+    python bench/load_test.py --concurrency 8 --duration 30
+    python bench/load_test.py --rate 50 --duration 60 --json load.json
+    python bench/load_test.py --transport streamable-http --sessions 8 --rate 100
+    python bench/load_test.py --url http://127.0.0.1:8765/mcp --rate 20
+    python bench/load_test.py --queries /tmp/lib/queries.json -- --chroma-path /tmp/idx/chroma_data
+"""
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MCP_SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, MCP_SERVER_DIR)
+
+from bench_scale import process_rss_mb, server_pid  # noqa: E402
+from mcp_server import MAX_RESULTS  # noqa: E402
+from synthetic_library import N_COMBINATIONS, labeled_queries  # noqa: E402
+from transport_config import (  # noqa: E402
+    DEFAULT_BIND, SSE_PATH, STREAMABLE_HTTP_PATH, TRANSPORTS,
+)
+
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_DURATION = 30.0
+DEFAULT_WARMUP = 2.0
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_SAMPLE_INTERVAL = 1.0
+DEFAULT_CORPUS_SIZE = 500
+READY_LIMIT = 600.0  # seconds to wait for the index to load
+READY_QUERY = "load test readiness probe"
+ARRIVALS = ("fixed", "poisson")
+# Histogram bucket upper bounds in ms (1-2-5 steps); the last bucket is open-ended
+BUCKETS_MS = [b * 10 ** e for e in range(0, 5) for b in (1, 2, 5)]
+SEED = 42
+
+
+def load_corpus(path: str | None, size: int, seed: int) -> list[str]:
+    """
+    Queries from path (a synthetic_library queries.json, or one query per
+    line), or synthetic SRE queries if path is None.
+    """
+    if path is None:
+        return [q["query"] for q in labeled_queries(N_COMBINATIONS, size, random.Random(seed))]
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(".json"):
+            return [q["query"] for q in json.load(f)["queries"]]
+        return [line.strip() for line in f if line.strip()]
+
+
+class Recorder:
+    """Per-request outcomes and the sampled time series."""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from  # requests scheduled earlier are warm-up
+        self.records: list[tuple[float, float, str | None]] = []  # (scheduled, latency, error)
+        self.in_flight = 0
+        self.samples: list[dict] = []
+
+    def record(self, scheduled: float, latency: float, error: str | None):
+        self.records.append((scheduled, latency, error))
+
+    def measured(self) -> list[tuple[float, float, str | None]]:
+        return [r for r in self.records if r[0] >= self.measure_from]
+
+
+def percentiles(latencies_s: list[float]) -> dict:
+    if not latencies_s:
+        return {}
+    ms = np.array(latencies_s) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "p999_ms": float(np.percentile(ms, 99.9)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def histogram(latencies_s: list[float]) -> dict:
+    """Request counts per BUCKETS_MS bucket, keyed by upper bound ("inf" last)."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for latency in latencies_s:
+        counts[bisect.bisect_left(BUCKETS_MS, latency * 1000)] += 1
+    return {**{f"le_{b}ms": c for b, c in zip(BUCKETS_MS, counts)}, "inf": counts[-1]}
+
+
+async def call(session, recorder: Recorder, query: str, scheduled: float,
+               k: int, timeout: float):
+    """Send one search_skills call; latency runs from its scheduled time."""
+    recorder.in_flight += 1
+    error = None
+    try:
+        result = await asyncio.wait_for(
+            session.call_tool("search_skills", {"query": query, "n_results": k}), timeout
+        )
+        if result.isError or (result.content and getattr(result.content[0], "text", "").startswith("Error")):
+            error = "tool_error"
+    except asyncio.TimeoutError:
+        error = "timeout"
+    except Exception as e:
+        error = type(e).__name__
+    finally:
+        recorder.in_flight -= 1
+    recorder.record(scheduled, time.perf_counter() - scheduled, error)
+
+
+class QueryStream:
+    """Round-robin over the corpus, optionally made unique per request."""
+
+    def __init__(self, corpus: list[str], unique: bool):
+        self.corpus = corpus
+        self.unique = unique
+        self.n = 0
+
+    def next(self) -> str:
+        query = self.corpus[self.n % len(self.corpus)]
+        self.n += 1
+        return f"{query} {self.n}" if self.unique else query
+
+
+async def closed_loop(sessions: list, recorder: Recorder, queries: QueryStream,
+                      concurrency: int, end: float, k: int, timeout: float):
+    async def worker(session):
+        while time.perf_counter() < end:
+            await call(session, recorder, queries.next(), time.perf_counter(), k, timeout)
+
+    await asyncio.gather(*(worker(sessions[i % len(sessions)]) for i in range(concurrency)))
+
+
+async def open_loop(sessions: list, recorder: Recorder, queries: QueryStream,
+                    rate: float, arrival: str, end: float, k: int, timeout: float,
+                    rng: random.Random):
+    tasks = set()
+    scheduled = time.perf_counter()
+    n = 0
+    while scheduled < end:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(
+            call(sessions[n % len(sessions)], recorder, queries.next(), scheduled, k, timeout)
+        )
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        n += 1
+        scheduled += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def sampler(recorder: Recorder, interval: float, start: float, pid: int | None,
+                  stop: asyncio.Event):
+    """Append a time-series sample every interval until stop is set."""
+    seen = 0
+    last = start
+    while True:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stop.wait(), interval)
+        now = time.perf_counter()
+        window = recorder.records[seen:]
+        seen += len(window)
+        latencies = [latency for _, latency, _ in window]
+        sample = {
+            "t_s": round(now - start, 3),
+            "completed": len(window),
+            "throughput_rps": len(window) / max(now - last, 1e-9),
+            "errors": sum(1 for _, _, error in window if error),
+            "in_flight": recorder.in_flight,
+            "server_rss_mb": process_rss_mb(pid),
+            **{key: value for key, value in percentiles(latencies).items()
+               if key in ("p50_ms", "p99_ms")},
+        }
+        recorder.samples.append(sample)
+        last = now
+        rss = sample["server_rss_mb"]
+        print(f"{sample['t_s']:>7.1f}{sample['throughput_rps']:>9.1f}{sample['in_flight']:>10}"
+              f"{sample['errors']:>8}{sample.get('p50_ms', 0):>9.1f}{sample.get('p99_ms', 0):>9.1f}"
+              f"{rss if rss is not None else 0:>9.0f}", flush=True)
+        if stop.is_set():
+            return
+
+
+async def wait_ready(session):
+    """Retry a probe query until the server has loaded its index."""
+    start = time.perf_counter()
+    while True:
+        result = await session.call_tool("search_skills", {"query": READY_QUERY})
+        if not result.content[0].text.startswith("Error"):
+            return
+        if time.perf_counter() - start > READY_LIMIT:
+            raise RuntimeError(f"Server not ready after {READY_LIMIT:g}s: {result.content[0].text}")
+
+
+def wait_for_port(host: str, port: int, proc: subprocess.Popen, limit: float = READY_LIMIT):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        with contextlib.suppress(OSError), socket.create_connection((host, port), timeout=1):
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on {host}:{port} within {limit:g}s")
+
+
+async def open_sessions(stack: contextlib.AsyncExitStack, args, server_args: list[str],
+                        log) -> tuple[list, int | None]:
+    """Start or attach to the server and open the client sessions. Returns (sessions, pid)."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.sse import sse_client
+    from mcp.client.stdio import stdio_client
+    from mcp.client.streamable_http import streamablehttp_client
+
+    server_script = os.path.join(MCP_SERVER_DIR, "mcp_server.py")
+    pid = args.server_pid
+    if args.transport == "stdio" and not args.url:
+        params = StdioServerParameters(command=sys.executable, args=[server_script, *server_args],
+                                       cwd=MCP_SERVER_DIR)
+        read, write = await stack.enter_async_context(stdio_client(params, errlog=log))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        return [session], pid or server_pid()
+
+    url = args.url
+    if url is None:
+        host, port = args.bind.rsplit(":", 1)
+        proc = subprocess.Popen(
+            [sys.executable, server_script, "--transport", args.transport, "--bind", args.bind,
+             *server_args],
+            cwd=MCP_SERVER_DIR, stdout=log, stderr=log
+        )
+        stack.callback(proc.wait)
+        stack.callback(proc.terminate)
+        wait_for_port(host, int(port), proc)
+        url = f"http://{args.bind}{SSE_PATH if args.transport == 'sse' else STREAMABLE_HTTP_PATH}"
+        pid = proc.pid
+
+    sessions = []
+    for _ in range(args.sessions):
+        if args.transport == "sse" or url.endswith(SSE_PATH):
+            read, write = await stack.enter_async_context(sse_client(url))
+        else:
+            read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        sessions.append(session)
+    return sessions, pid
+
+
+async def run(args, server_args: list[str], corpus: list[str], log) -> dict:
+    async with contextlib.AsyncExitStack() as stack:
+        sessions, pid = await open_sessions(stack, args, server_args, log)
+        await wait_ready(sessions[0])
+        rss_idle = process_rss_mb(pid)
+
+        start = time.perf_counter()
+        end = start + args.warmup + args.duration
+        recorder = Recorder(start + args.warmup)
+        queries = QueryStream(corpus, args.unique_queries)
+        stop = asyncio.Event()
+
+        print(f"{'t s':>7}{'req/s':>9}{'in flight':>10}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'RSS MiB':>9}")
+        sampling = asyncio.create_task(sampler(recorder, args.sample_interval, start, pid, stop))
+        if args.rate:
+            await open_loop(sessions, recorder, queries, args.rate, args.arrival, end,
+                            args.k, args.timeout, random.Random(args.seed))
+        else:
+            await closed_loop(sessions, recorder, queries, args.concurrency, end,
+                              args.k, args.timeout)
+        elapsed = time.perf_counter() - start - args.warmup
+        stop.set()
+        await sampling
+
+    measured = recorder.measured()
+    latencies = [latency for _, latency, error in measured if error is None]
+    errors: dict[str, int] = {}
+    for _, _, error in measured:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    rss_series = [s["server_rss_mb"] for s in recorder.samples if s["server_rss_mb"] is not None]
+    return {
+        "requests": len(measured),
+        "ok": len(latencies),
+        "errors": errors,
+        "error_rate": (len(measured) - len(latencies)) / len(measured) if measured else 0.0,
+        "throughput_rps": len(measured) / elapsed if elapsed > 0 else 0.0,
+        "latency": percentiles(latencies),
+        "histogram": histogram(latencies),
+        "server_rss_idle_mb": rss_idle,
+        "server_rss_peak_mb": max(rss_series) if rss_series else None,
+        "samples": recorder.samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive mcp_server.py search_skills under concurrent load",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        usage="%(prog)s [options] [-- server args]",
+    )
+    parser.add_argument("--transport", choices=TRANSPORTS, default="stdio",
+                        help="Transport to start the server with (default: stdio)")
+    parser.add_argument("--bind", default=DEFAULT_BIND,
+                        help=f"HOST:PORT for a started sse/streamable-http server (default: {DEFAULT_BIND})")
+    parser.add_argument("--url", help="Attach to a running HTTP server instead of starting one "
+                                      "(e.g. http://127.0.0.1:8765/mcp)")
+    parser.add_argument("--server-pid", type=int,
+                        help="PID of the --url server, to sample its RSS (default: not sampled)")
+    parser.add_argument("--sessions", type=int, default=1,
+                        help="Client sessions for HTTP transports (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Closed-loop workers (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float,
+                        help="Open loop: requests per second regardless of completions (default: closed loop)")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="fixed",
+                        help="Open-loop arrival process (default: fixed)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help=f"Measured seconds of load (default: {DEFAULT_DURATION:g})")
+    parser.add_argument("--warmup", type=float, default=DEFAULT_WARMUP,
+                        help=f"Seconds of load excluded from the results (default: {DEFAULT_WARMUP:g})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Per-request client timeout in seconds (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("-k", type=int, default=MAX_RESULTS,
+                        help=f"n_results per search (default: {MAX_RESULTS})")
+    parser.add_argument("--queries",
+                        help="Query corpus: queries.json from bench/synthetic_library.py or one query "
+                             "per line (default: synthetic SRE queries)")
+    parser.add_argument("--corpus-size", type=int, default=DEFAULT_CORPUS_SIZE,
+                        help=f"Synthetic queries when --queries is not given (default: {DEFAULT_CORPUS_SIZE})")
+    parser.add_argument("--unique-queries", action="store_true",
+                        help="Append a counter to each query so no request hits the server's caches")
+    parser.add_argument("--sample-interval", type=float, default=DEFAULT_SAMPLE_INTERVAL,
+                        help=f"Seconds between time-series samples (default: {DEFAULT_SAMPLE_INTERVAL:g})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Random seed (default: {SEED})")
+    parser.add_argument("--server-log", help="Write server stderr here (default: a temp file)")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+
+    argv = sys.argv[1:]
+    server_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, server_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    corpus = load_corpus(args.queries, args.corpus_size, args.seed)
+    mode = (f"open loop, {args.rate:g} req/s {args.arrival}" if args.rate
+            else f"closed loop, {args.concurrency} workers")
+    print(f"\n{args.url or args.transport}, {mode}, {args.duration:g}s "
+          f"(+{args.warmup:g}s warm-up), {len(corpus)} queries\n")
+
+    with contextlib.ExitStack() as stack:
+        if args.server_log:
+            log = stack.enter_context(open(args.server_log, 'w', encoding='utf-8'))
+        else:
+            log = stack.enter_context(tempfile.NamedTemporaryFile(
+                'w', prefix="load-test-server-", suffix=".log", delete=False))
+        report = asyncio.run(run(args, server_args, corpus, log))
+        log_path = log.name
+
+    latency = report["latency"]
+    print(f"\n{report['requests']} requests, {report['throughput_rps']:.1f} req/s, "
+          f"error rate {report['error_rate']:.2%} {report['errors'] or ''}")
+    if latency:
+        print("latency ms: " + ", ".join(f"{key[:-3]} {value:.1f}" for key, value in latency.items()))
+    if report["server_rss_peak_mb"] is not None:
+        print(f"server RSS: {report['server_rss_idle_mb']:.0f} MiB idle, "
+              f"{report['server_rss_peak_mb']:.0f} MiB peak")
+    print(f"server log: {log_path}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                "transport": args.url or args.transport, "sessions": args.sessions,
+                "mode": "open" if args.rate else "closed", "rate": args.rate,
+                "arrival": args.arrival if args.rate else None, "concurrency": args.concurrency,
+                "duration_s": args.duration, "warmup_s": args.warmup, "k": args.k,
+                "unique_queries": args.unique_queries, "server_args": server_args, **report,
+            }, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
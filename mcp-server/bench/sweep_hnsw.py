@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Sweep: HNSW parameters vs. recall and latency
+
+Builds one ChromaDB collection per (space, M, construction_ef) over a
+synthetic, seeded skill corpus, then for each search_ef (changed in place,
+no rebuild) measures:
+
+- recall@k against exact search (a NumPy matmul over the same vectors)
+- single-query latency p50/p99
+- build time per collection
+
+A changed search_ef only takes effect for clients that open the collection
+afterwards, so each setting is measured on a freshly reopened collection
+(as a server sees it after the indexer bumps the generation).
+
+The corpus is clustered (skills share topics, so real embeddings are far
+from uniform) and queries are perturbed corpus points, which is what makes
+HNSW's greedy search work hard. Pick the smallest settings that reach the
+recall you need, then pass them to index_skills.py (--space, --hnsw-m,
+--hnsw-construction-ef, --hnsw-search-ef).
+
+Usage:
+    python bench/sweep_hnsw.py                            # 50k skills
+    python bench/sweep_hnsw.py --n-skills 10000 --m 8 16 --search-ef 20 100
+    python bench/sweep_hnsw.py --spaces l2 cosine ip --json sweep.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_backends import recall_at_k, synthetic_metadata, unit_vectors  # noqa: E402
+from vector_backends import (  # noqa: E402
+    DEFAULT_SPACE, SPACES, hnsw_metadata, hnsw_settings, open_collection,
+)
+
+
+COLLECTION_NAME = "sweep_skills"
+DEFAULT_N_SKILLS = 50000
+DEFAULT_DIM = 384
+DEFAULT_QUERIES = 500
+DEFAULT_K = 10
+DEFAULT_CLUSTERS = 500
+DEFAULT_M = (8, 16, 32)
+DEFAULT_CONSTRUCTION_EF = (100, 200)
+DEFAULT_SEARCH_EF = (10, 25, 50, 100, 200)
+QUERY_NOISE = 0.5  # relative to the cluster spread
+SEED = 42
+
+
+def clustered_vectors(n: int, dim: int, n_clusters: int,
+                      rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors scattered around n_clusters random topic centers."""
+    centers = unit_vectors(n_clusters, dim, rng)
+    assignment = rng.integers(0, n_clusters, size=n)
+    vectors = centers[assignment] + rng.standard_normal((n, dim), dtype=np.float32) / np.sqrt(dim)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def perturbed_queries(corpus: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Unit-vector queries near random corpus points."""
+    picks = corpus[rng.integers(0, corpus.shape[0], size=n)]
+    noise = rng.standard_normal(picks.shape, dtype=np.float32) * QUERY_NOISE / np.sqrt(picks.shape[1])
+    queries = picks + noise
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, ids: list[str], k: int) -> list[list[str]]:
+    """Ground truth: the k most similar corpus vectors per query."""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [[ids[j] for j in row] for row in top]
+
+
+def build_collection(path: str, hnsw: dict, corpus: np.ndarray, ids: list[str],
+                     metadatas: list[dict]):
+    """Create and fill a collection with the given hnsw_metadata(). Returns (collection, seconds)."""
+    start = time.perf_counter()
+    collection = open_collection(
+        "chroma", path, COLLECTION_NAME, None, create=True,
+        metadata={"description": "HNSW sweep", **hnsw}
+    )
+    batch = collection._client.get_max_batch_size()
+    for lo in range(0, len(ids), batch):
+        collection.upsert(
+            ids=ids[lo:lo + batch],
+            embeddings=corpus[lo:lo + batch],
+            metadatas=metadatas[lo:lo + batch]
+        )
+    return collection, time.perf_counter() - start
+
+
+def measure(collection, queries: np.ndarray, truth: list[list[str]], k: int) -> dict:
+    """Recall@k and single-query latency percentiles for one setting."""
+    latencies = []
+    found = []
+    for query in queries:
+        t = time.perf_counter()
+        result = collection.query(
+            query_embeddings=query[None, :], n_results=k, include=["metadatas", "distances"]
+        )
+        latencies.append(time.perf_counter() - t)
+        found.append(result["ids"][0])
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "recall_at_k": recall_at_k(found, truth),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep HNSW space/M/ef settings for recall@k and latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--n-skills", type=int, default=DEFAULT_N_SKILLS,
+                        help=f"Synthetic library size (default: {DEFAULT_N_SKILLS})")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM,
+                        help=f"Embedding dimension (default: {DEFAULT_DIM}, as all-MiniLM-L6-v2)")
+    parser.add_argument("--clusters", type=int, default=DEFAULT_CLUSTERS,
+                        help=f"Topic clusters in the corpus (default: {DEFAULT_CLUSTERS})")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help=f"Number of timed queries (default: {DEFAULT_QUERIES})")
+    parser.add_argument("-k", type=int, default=DEFAULT_K,
+                        help=f"Results per query (default: {DEFAULT_K})")
+    parser.add_argument("--spaces", nargs="+", choices=SPACES, default=[DEFAULT_SPACE],
+                        help=f"Distance spaces (default: {DEFAULT_SPACE})")
+    parser.add_argument("--m", nargs="+", type=int, default=list(DEFAULT_M),
+                        help=f"HNSW M values (default: {' '.join(map(str, DEFAULT_M))})")
+    parser.add_argument("--construction-ef", nargs="+", type=int,
+                        default=list(DEFAULT_CONSTRUCTION_EF),
+                        help="HNSW construction ef values "
+                             f"(default: {' '.join(map(str, DEFAULT_CONSTRUCTION_EF))})")
+    parser.add_argument("--search-ef", nargs="+", type=int, default=list(DEFAULT_SEARCH_EF),
+                        help=f"HNSW search ef values (default: {' '.join(map(str, DEFAULT_SEARCH_EF))})")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    corpus = clustered_vectors(args.n_skills, args.dim, args.clusters, rng)
+    queries = perturbed_queries(corpus, args.queries, rng)
+    ids = [f"skills/synthetic-{i}/SKILL.md" for i in range(args.n_skills)]
+    metadatas = [synthetic_metadata(i) for i in range(args.n_skills)]
+    truth = exact_top_k(corpus, queries, ids, args.k)
+
+    print(f"\n{args.n_skills} skills, dim {args.dim}, {args.clusters} clusters, "
+          f"{args.queries} queries, k={args.k}\n")
+    print(f"{'space':<8}{'M':>4}{'c_ef':>6}{'s_ef':>6}{'build s':>9}"
+          f"{'recall@k':>10}{'p50 ms':>9}{'p99 ms':>9}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sweep-hnsw-") as workdir:
+        for space, m, construction_ef in itertools.product(args.spaces, args.m, args.construction_ef):
+            path = os.path.join(workdir, f"{space}-{m}-{construction_ef}")
+            collection, build_s = build_collection(
+                path, hnsw_metadata(space, m, construction_ef, args.search_ef[0]),
+                corpus, ids, metadatas
+            )
+            for search_ef in args.search_ef:
+                if hnsw_settings(collection)["hnsw:search_ef"] != search_ef:
+                    collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+                    collection = open_collection("chroma", path, COLLECTION_NAME, None, fresh=True)
+                row = {
+                    "space": space, "M": m, "construction_ef": construction_ef,
+                    "search_ef": search_ef, "build_s": build_s,
+                    **measure(collection, queries, truth, args.k),
+                }
+                results.append(row)
+                print(f"{space:<8}{m:>4}{construction_ef:>6}{search_ef:>6}{build_s:>9.1f}"
+                      f"{row['recall_at_k']:>10.3f}{row['p50_ms']:>9.3f}{row['p99_ms']:>9.3f}",
+                      flush=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                "n_skills": args.n_skills, "dim": args.dim, "clusters": args.clusters,
+                "queries": args.queries, "k": args.k, "results": results,
+            }, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Synthetic SKILL.md Libraries with Labeled Queries
+
+Writes N skills following dotcodex/docs/SKILL-SCHEMA.md (frontmatter with
+name/tags/intent/version/languages/risk_level; # Name, ## Usage,
+## Examples, ## Implementation) under <out>/skills/<slug>/SKILL.md, and a
+labeled query set in <out>/queries.json.
+
+Each skill is a seeded combination of an action, an SRE topic and a
+platform (plus a qualifier and the skill number, keeping names unique), e.g. "Rotate TLS
+Certificates on Kubernetes (Staging 12)". A query paraphrases one
+(action, topic, platform) combination; every skill with that combination
+is relevant, so recall@k has a ground truth at any library size. Larger
+libraries have more near-duplicates per combination, as real ones do.
+
+queries.json: {"n_skills", "seed", "queries": [{"query", "relevant": [ids]}]}
+with ids as index_skills.skill_id() produces them ("skills/<slug>/SKILL.md").
+It is written last, so its presence marks a complete library.
+
+Usage:
+    python bench/synthetic_library.py --n-skills 1000 --out /tmp/lib-1k
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+ACTIONS = (
+    ("debug", "Debug", "debugging"), ("rotate", "Rotate", "rotating"),
+    ("scale", "Scale", "scaling"), ("migrate", "Migrate", "migrating"),
+    ("back up", "Back Up", "backing up"), ("restore", "Restore", "restoring"),
+    ("monitor", "Monitor", "monitoring"), ("tune", "Tune", "tuning"),
+    ("upgrade", "Upgrade", "upgrading"), ("audit", "Audit", "auditing"),
+    ("provision", "Provision", "provisioning"), ("benchmark", "Benchmark", "benchmarking"),
+    ("roll back", "Roll Back", "rolling back"), ("secure", "Secure", "securing"),
+    ("clean up", "Clean Up", "cleaning up"), ("load test", "Load Test", "load testing"),
+)
+TOPICS = (
+    "TLS certificates", "disk usage", "replication lag", "connection pools",
+    "DNS records", "log retention", "memory leaks", "CPU throttling",
+    "alert rules", "access policies", "cron jobs", "message queues",
+    "cache eviction", "schema changes", "secrets", "container images",
+    "load balancers", "rate limits", "network partitions", "service meshes",
+    "feature flags", "on-call runbooks", "SLO dashboards", "autoscaling groups",
+    "database indexes", "object storage buckets", "CI pipelines", "VPN tunnels",
+    "time synchronization", "kernel parameters",
+)
+PLATFORMS = (
+    "Kubernetes", "PostgreSQL", "Redis", "Nginx", "Terraform", "Kafka",
+    "AWS", "GCP", "Azure", "Linux", "Docker", "Prometheus", "Elasticsearch",
+    "MySQL", "RabbitMQ", "Vault", "Consul", "Cassandra", "HAProxy", "systemd",
+)
+QUALIFIERS = (
+    "Staging", "Production", "Multi-Region", "Air-Gapped", "Edge", "Legacy",
+    "Blue-Green", "Canary", "Disaster Recovery", "Compliance", "High Availability",
+    "Cost-Optimized",
+)
+LANGUAGES = ("all", "bash", "python", "go", "yaml")
+RISK_LEVELS = ("low", "medium", "high")
+QUERY_TEMPLATES = (
+    "how do I {action} {topic} on {platform}",
+    "{platform} {topic} need to {action}",
+    "help me {action} the {topic} in our {platform} setup",
+    "{gerund} {topic} for {platform}",
+)
+N_COMBINATIONS = len(ACTIONS) * len(TOPICS) * len(PLATFORMS)
+STRIDE = 7919  # prime not dividing N_COMBINATIONS: a permutation, so small libraries mix all words
+DEFAULT_QUERIES = 200
+SEED = 42
+
+
+def combination(i: int) -> tuple[int, int, int]:
+    """(action, topic, platform) indexes of skill i; each repeats every N_COMBINATIONS skills."""
+    j = (i * STRIDE) % N_COMBINATIONS
+    n_platforms, n_topics = len(PLATFORMS), len(TOPICS)
+    return j // (n_platforms * n_topics), (j // n_platforms) % n_topics, j % n_platforms
+
+
+def slug(text: str) -> str:
+    return "-".join("".join(c if c.isalnum() else " " for c in text.lower()).split())
+
+
+def skill_markdown(i: int, rng: random.Random) -> tuple[str, str]:
+    """Return (slug, SKILL.md text) for skill i."""
+    a, t, p = combination(i)
+    verb, title_verb, gerund = ACTIONS[a]
+    topic, platform = TOPICS[t], PLATFORMS[p]
+    qualifier = QUALIFIERS[(i // N_COMBINATIONS) % len(QUALIFIERS)]
+    name = f"{title_verb} {topic.title()} on {platform} ({qualifier} {i})"
+    tags = [verb.replace(" ", ""), slug(topic), platform.lower(), slug(qualifier),
+            *rng.sample(["sre", "ops", "runbook", "incident", "automation", "maintenance"], 2)]
+    intent = (
+        f"Step-by-step workflow for {gerund} {topic} on {platform} in "
+        f"{qualifier.lower()} environments. Use when the user asks to {verb} {topic}, "
+        f"mentions {platform} {topic} problems, or needs a safe {qualifier.lower()} "
+        f"procedure for {gerund} {topic}."
+    )
+    risk = rng.choice(RISK_LEVELS)
+    languages = rng.choice(LANGUAGES)
+    steps = "\n".join(
+        f"{n}. {rng.choice(['Check', 'Verify', 'Record', 'Apply', 'Compare', 'Confirm'])} "
+        f"the {topic} {rng.choice(['state', 'configuration', 'metrics', 'owners', 'limits'])} "
+        f"on {platform} ({rng.choice(['before', 'after', 'during'])} the change)."
+        for n in range(1, rng.randint(4, 9))
+    )
+    command = f"{platform.lower()}-ctl {verb.replace(' ', '-')} {slug(topic)} --env {slug(qualifier)}"
+
+    text = f"""---
+name: "{name}"
+tags: {json.dumps(tags)}
+intent: "{intent}"
+version: "1.0.{i % 10}"
+languages: {languages}
+risk_level: {risk}
+requires_confirmation: {str(risk == "high").lower()}
+---
+
+# {name}
+
+## Usage
+
+Use this skill to {verb} {topic} on {platform} without guessing at the
+{qualifier.lower()} procedure. Prefer the scripted command below over manual
+steps, and stop if any check fails.
+
+## Examples
+
+User: "We need to {verb} the {topic} on {platform}"
+Agent: Run `{command} --dry-run`, review the plan, then rerun without `--dry-run`.
+
+User: "{gerund.capitalize()} {topic} failed halfway on {platform}"
+Agent: Check the last completed step in the log, then resume with `{command} --resume`.
+
+## Implementation
+
+### Steps
+
+{steps}
+
+### Command
+
+```bash
+# Plan first; the dry run changes nothing
+{command} --dry-run
+{command}
+```
+
+### Common Mistakes
+
+- Skipping the dry run in {qualifier.lower()} environments
+- {gerund.capitalize()} {topic} on every {platform} node at once instead of in batches
+"""
+    return slug(name), text
+
+
+def labeled_queries(n_skills: int, n_queries: int, rng: random.Random) -> list[dict]:
+    """Queries for random (action, topic, platform) combinations present in the library."""
+    by_combination: dict[tuple, list[int]] = {}
+    for i in range(n_skills):
+        by_combination.setdefault(combination(i), []).append(i)
+    combinations = sorted(by_combination)
+    queries = []
+    for n in range(n_queries):
+        a, t, p = combinations[rng.randrange(len(combinations))]
+        verb, _, gerund = ACTIONS[a]
+        template = QUERY_TEMPLATES[n % len(QUERY_TEMPLATES)]
+        queries.append({
+            "query": template.format(action=verb, gerund=gerund, topic=TOPICS[t], platform=PLATFORMS[p]),
+            "relevant": by_combination[(a, t, p)],
+        })
+    return queries
+
+
+def write_library(out: str, n_skills: int, n_queries: int = DEFAULT_QUERIES,
+                  seed: int = SEED) -> str:
+    """
+    Write the library under out (reused if a complete one with the same
+    size and seed is there). Returns the skills directory.
+    """
+    skills_dir = os.path.join(out, "skills")
+    queries_path = os.path.join(out, "queries.json")
+    if os.path.exists(queries_path):
+        with open(queries_path, encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing["n_skills"] == n_skills and existing["seed"] == seed:
+            return skills_dir
+
+    rng = random.Random(seed)
+    ids = []
+    for i in range(n_skills):
+        name, text = skill_markdown(i, rng)
+        directory = os.path.join(skills_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "SKILL.md"), 'w', encoding='utf-8') as f:
+            f.write(text)
+        ids.append(f"skills/{name}/SKILL.md")
+
+    queries = labeled_queries(n_skills, n_queries, rng)
+    for query in queries:
+        query["relevant"] = [ids[i] for i in query["relevant"]]
+    with open(queries_path, 'w', encoding='utf-8') as f:
+        json.dump({"n_skills": n_skills, "seed": seed, "queries": queries}, f)
+    return skills_dir
+
+
+def load_queries(out: str) -> list[dict]:
+    with open(os.path.join(out, "queries.json"), encoding='utf-8') as f:
+        return json.load(f)["queries"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic SKILL.md library")
+    parser.add_argument("--n-skills", type=int, required=True, help="Number of skills")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help=f"Labeled queries to write (default: {DEFAULT_QUERIES})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Random seed (default: {SEED})")
+    args = parser.parse_args()
+
+    skills_dir = write_library(args.out, args.n_skills, args.queries, args.seed)
+    print(f"Wrote {args.n_skills} skills to {skills_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
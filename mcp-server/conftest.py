@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures.
+
+library: a temporary skills directory indexed into a NumPy index. The ONNX
+model is replaced by a stub embedder and a placeholder model file, so no
+model download (or onnxruntime) is needed.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+import index_skills
+import mcp_server
+from embeddings import MODEL_FILE, EmbeddingConfig
+
+
+class StubEmbedder:
+    """Deterministic 8-dimensional vectors derived from each text's hash."""
+
+    def __init__(self, config: EmbeddingConfig):
+        self.config = config
+
+    def __call__(self, texts: list[str]) -> list:
+        return [np.frombuffer(hashlib.sha256(text.encode()).digest(), dtype=np.uint32)[:8]
+                .astype(np.float32) for text in texts]
+
+
+class SkillLibrary:
+    """Skills, NumPy index and skill store under one temporary directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.skills_dir = os.path.join(root, "skills")
+        self.numpy_path = os.path.join(root, "numpy")
+        self.store_path = os.path.join(root, "store")
+        self.model_path = os.path.join(root, "model")
+        self.write_model()
+
+    def write_model(self):
+        """(Re)write the placeholder model file (hashed, never run)."""
+        os.makedirs(self.model_path, exist_ok=True)
+        with open(os.path.join(self.model_path, MODEL_FILE), "wb") as f:
+            f.write(b"placeholder weights")
+
+    def config(self) -> EmbeddingConfig:
+        return EmbeddingConfig(model_path=self.model_path)
+
+    def write(self, name: str, intent: str, body: str = ""):
+        directory = os.path.join(self.skills_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "SKILL.md"), "w", encoding="utf-8") as f:
+            f.write(f'---\nname: "{name}"\ntags: ["{name}"]\nintent: "{intent}"\n---\n\n# {name}\n{body}')
+
+    def remove(self, name: str):
+        os.remove(os.path.join(self.skills_dir, name, "SKILL.md"))
+
+    def index(self, config: EmbeddingConfig | None = None) -> int:
+        return index_skills.index_skills(
+            self.skills_dir, os.path.join(self.root, "chroma"), store_path=self.store_path,
+            backend="numpy", numpy_path=self.numpy_path, embedding_config=config or self.config(),
+            parse_workers=1, embedding_store_path=None,
+        )
+
+    def server(self, **kwargs) -> mcp_server.SkillSearchServer:
+        return mcp_server.SkillSearchServer(
+            os.path.join(self.root, "chroma"), store_path=self.store_path,
+            skills_dir=self.skills_dir, backend="numpy", numpy_path=self.numpy_path,
+            embedding_config=self.config(), **kwargs,
+        )
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch) -> SkillLibrary:
+    monkeypatch.setattr(index_skills, "OnnxEmbedder", StubEmbedder)
+    monkeypatch.setattr(mcp_server, "OnnxEmbedder", StubEmbedder)
+    monkeypatch.setattr(mcp_server, "ONNX_AVAILABLE", True)
+    return SkillLibrary(str(tmp_path))
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache for SREcodex
+
+Stores every computed embedding in a SQLite file keyed by (embedding model
+id, SHA-256 of the embedded text), so the same text is never run through
+the model twice: a clean rebuild (`make reindex`) or a migration to another
+backend or HNSW setting re-reads vectors instead of recomputing them, and
+the MCP server remembers query embeddings across restarts.
+
+The model id (EmbeddingConfig.model_id()) covers the weights and the
+truncation length, so vectors from different settings never mix. The file
+lives outside the index directories and survives `make clean`; delete it
+to reclaim space.
+
+Skill texts are bounded by the library, but queries are not: the server
+keeps its query vectors under their own id (QUERY_SCOPE) and opens the
+store with max_rows, so the oldest query rows are pruned once that many
+are stored. The indexer's rows are never pruned. Rows are counted in
+memory (seeded at open) and pruned down to PRUNE_TO of max_rows, so the
+count query runs once per few thousand writes, not on every one; with
+several servers each only counts its own writes between recounts, so the
+cap is approximate.
+
+Table:
+    embeddings(model TEXT, text_sha256 TEXT, vector BLOB,  -- float32 bytes
+               stored_at INTEGER)                          -- unix time, ns
+
+SQLite in WAL mode lets the indexer and any number of server processes
+share the file; each instance serializes its own threads with a lock.
+"""
+
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+DEFAULT_EMBEDDING_STORE_PATH = "./embedding_store.db"
+DEFAULT_MAX_QUERY_ROWS = 50000  # query vectors kept by servers (~75 MB at 384 dims)
+QUERY_SCOPE = ":query"          # appended to the model id for server query rows
+LOOKUP_CHUNK = 500              # digests per SELECT ... IN (...)
+BUSY_TIMEOUT_MS = 5000          # wait this long for another process's write lock
+PRUNE_TO = 0.9                  # fraction of max_rows left after pruning
+
+
+def text_digest(text: str) -> str:
+    """Return the SHA-256 hex digest of an embedded text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    SQLite-backed cache of embedding vectors for one model id. With
+    max_rows set, a write that takes that id past max_rows deletes its
+    oldest rows.
+    """
+
+    def __init__(self, path: str, model_id: str, max_rows: int | None = None):
+        self.path = path
+        self.model_id = model_id
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False,
+                                   timeout=BUSY_TIMEOUT_MS / 1000)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_sha256 TEXT NOT NULL, vector BLOB NOT NULL,"
+            " stored_at INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (model, text_sha256)) WITHOUT ROWID"
+        )
+        # Stores created before stored_at existed: their rows count as oldest
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+        if "stored_at" not in columns:
+            self._db.execute("ALTER TABLE embeddings ADD COLUMN stored_at INTEGER NOT NULL DEFAULT 0")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_age ON embeddings (model, stored_at)"
+        )
+        self._db.commit()
+        # Upper bound on this id's rows (replaced rows are counted twice)
+        self._rows = self._count() if max_rows is not None else 0
+
+    @classmethod
+    def open(cls, path: str | None, model_id: str,
+             max_rows: int | None = None) -> "EmbeddingStore | None":
+        """Open the store, or return None (with a warning) if path is empty or unusable."""
+        if not path:
+            return None
+        try:
+            return cls(path, model_id, max_rows)
+        except sqlite3.Error as e:
+            print(f"WARNING: Embedding store disabled ({path}: {e})", file=sys.stderr)
+            return None
+
+    def get_many(self, digests: list[str]) -> dict[str, "np.ndarray"]:
+        """Return the stored vectors for the digests that have one."""
+        import numpy as np
+
+        found = {}
+        with self._lock:
+            try:
+                for lo in range(0, len(digests), LOOKUP_CHUNK):
+                    chunk = digests[lo:lo + LOOKUP_CHUNK]
+                    rows = self._db.execute(
+                        "SELECT text_sha256, vector FROM embeddings WHERE model = ? "
+                        f"AND text_sha256 IN ({','.join('?' * len(chunk))})",
+                        (self.model_id, *chunk)
+                    )
+                    for digest, blob in rows:
+                        found[digest] = np.frombuffer(blob, dtype=np.float32)
+            except sqlite3.Error as e:
+                print(f"WARNING: Embedding store lookup failed: {e}", file=sys.stderr)
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, items: list[tuple[str, "np.ndarray"]]):
+        """
+        Store (digest, vector) pairs in one transaction. A failed write is
+        only a lost cache entry, so it is reported and otherwise ignored.
+        """
+        import numpy as np
+
+        now = time.time_ns()
+        rows = [(self.model_id, digest, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for digest, vector in items]
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, text_sha256, vector, stored_at) "
+                        "VALUES (?, ?, ?, ?)", rows
+                    )
+                    self._rows += len(rows)
+                    if self.max_rows is not None and self._rows > self.max_rows:
+                        self._prune()
+            except sqlite3.Error as e:
+                print(f"WARNING: Embedding store write failed: {e}", file=sys.stderr)
+
+    def _count(self) -> int:
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_id,)
+        ).fetchone()
+        return count
+
+    def _prune(self):
+        """
+        Recount this model id's rows and, past max_rows, delete the oldest
+        down to PRUNE_TO of it (lock and transaction held).
+        """
+        count = self._count()
+        if count > self.max_rows:
+            keep = int(self.max_rows * PRUNE_TO)
+            self._db.execute(
+                "DELETE FROM embeddings WHERE model = ? AND text_sha256 IN ("
+                " SELECT text_sha256 FROM embeddings WHERE model = ?"
+                " ORDER BY stored_at LIMIT ?)",
+                (self.model_id, self.model_id, count - keep)
+            )
+            count = keep
+        self._rows = count
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters (lookups by this process)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def embed_cached(texts: list[str], embed, store: EmbeddingStore | None) -> list:
+    """
+    Embed texts with embed(texts), taking vectors already in store from
+    there and storing the rest. embed is only called if something is
+    missing. Returns one vector per text, in order.
+    """
+    if store is None:
+        return embed(texts)
+
+    # Each distinct text is looked up and embedded once
+    unique = {}
+    for text in texts:
+        unique.setdefault(text_digest(text), text)
+    found = store.get_many(list(unique))
+    missing = [digest for digest in unique if digest not in found]
+    if missing:
+        computed = embed([unique[digest] for digest in missing])
+        store.put_many(list(zip(missing, computed)))
+        found.update(zip(missing, computed))
+    return [found[text_digest(text)] for text in texts]
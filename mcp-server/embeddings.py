@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Local ONNX Embeddings for SREcodex
+
+index_skills.py and mcp_server.py embed through the same OnnxEmbedder,
+built from an EmbeddingConfig set by the same command-line flags
+(add_arguments()). The config's output-affecting settings (model, model
+hash, max sequence length, int8) are recorded in the collection metadata as
+"embedding:*" keys; the server compares them at load and disables vector
+search (keyword fallback) rather than query an index with the wrong model.
+
+Tuning (CPU):
+- threads: ONNX Runtime intra-op threads per inference (0 = runtime
+  default, one per core). A server running several --query-workers does
+  better with 1-2 threads each than with every worker using all cores.
+- batch_size: texts per inference call; matters when indexing.
+- max_seq_len: truncation length. Inputs are padded only to the longest
+  text in the batch (Chroma's default function pads everything to 256
+  tokens), so short queries cost a fraction of a full-length pass.
+- int8: use a dynamically quantized model_int8.onnx next to model.onnx
+  (created by quantize_model() on first use; needs the onnx package);
+  smaller and usually faster on CPU,
+  with slightly different vectors, so indexes must be rebuilt.
+
+The default model is all-MiniLM-L6-v2 from Chroma's model cache (the same
+files DefaultEmbeddingFunction uses, downloaded on first use), so indexes
+built before this module existed stay compatible.
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+
+# onnxruntime is imported when an embedder is created, not at import time,
+# so the MCP server can answer the handshake before loading it.
+ONNX_AVAILABLE = all(
+    importlib.util.find_spec(module) is not None for module in ("onnxruntime", "tokenizers")
+)
+
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "chroma", "onnx_models", "all-MiniLM-L6-v2", "onnx"
+)
+MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+DEFAULT_THREADS = 0         # 0 = ONNX Runtime default (one per core)
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_SEQ_LEN = 256   # sentence-transformers' setting for all-MiniLM-L6-v2
+METADATA_PREFIX = "embedding:"
+
+# What indexes built before embedding settings were recorded used
+LEGACY_METADATA = {
+    "embedding:model": "all-MiniLM-L6-v2",
+    "embedding:max_seq_len": DEFAULT_MAX_SEQ_LEN,
+    "embedding:int8": False,
+}
+
+
+class EmbeddingConfig:
+    """Embedding model location and CPU inference settings."""
+
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, threads: int = DEFAULT_THREADS,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_seq_len: int = DEFAULT_MAX_SEQ_LEN,
+                 int8: bool = False):
+        self.model_path = os.path.expanduser(model_path)
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_seq_len = max_seq_len
+        self.int8 = int8
+        self._digest = None
+
+    @property
+    def model_file(self) -> str:
+        return os.path.join(self.model_path, INT8_MODEL_FILE if self.int8 else MODEL_FILE)
+
+    @property
+    def model_name(self) -> str:
+        """Model directory name (its parent's for Chroma's '<model>/onnx' layout)."""
+        path = os.path.normpath(os.path.abspath(self.model_path))
+        if os.path.basename(path) == "onnx":
+            path = os.path.dirname(path)
+        return os.path.basename(path)
+
+    def model_digest(self) -> str:
+        """Short SHA-256 of the model file, identifying the exact weights."""
+        if self._digest is None:
+            self._digest = self.hash_model_file()
+        return self._digest
+
+    def hash_model_file(self) -> str:
+        """Hash the model file now (model_digest() caches this)."""
+        digest = hashlib.sha256()
+        with open(self.model_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
+    def set_model_digest(self, digest: str):
+        """Use a digest recorded for the same, unchanged model file instead of hashing it."""
+        self._digest = digest
+
+    def ensure_model(self):
+        """
+        Download the default model into Chroma's cache if it is missing, and
+        quantize it on first use with int8.
+        """
+        if os.path.exists(self.model_file):
+            return
+        float_model = os.path.join(self.model_path, MODEL_FILE)
+        if not os.path.exists(float_model) and self.model_path == DEFAULT_MODEL_PATH:
+            from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+            ONNXMiniLM_L6_V2()._download_model_if_not_exists()
+        if self.int8 and os.path.exists(float_model):
+            print(f"Quantizing {float_model} to {INT8_MODEL_FILE}...", file=sys.stderr)
+            quantize_model(self)
+
+    def model_id(self) -> str:
+        """Identifies the vectors these settings produce (embedding_store.py cache key)."""
+        return f"{self.model_name}:{self.model_digest()}:{self.max_seq_len}"
+
+    def metadata(self) -> dict:
+        """Collection metadata keys for the settings that change the vectors."""
+        return {
+            "embedding:model": self.model_name,
+            "embedding:model_sha256": self.model_digest(),
+            "embedding:max_seq_len": self.max_seq_len,
+            "embedding:int8": self.int8,
+        }
+
+    def mismatches(self, metadata: dict) -> list[str]:
+        """
+        Describe how an index's recorded embedding settings differ from this
+        config (empty if compatible). Settings the index did not record are
+        not compared.
+        """
+        recorded = {k: v for k, v in metadata.items() if k.startswith(METADATA_PREFIX)}
+        recorded = recorded or LEGACY_METADATA
+        return [
+            f"{key[len(METADATA_PREFIX):]}: index {recorded[key]!r}, this process {value!r}"
+            for key, value in self.metadata().items()
+            if key in recorded and recorded[key] != value
+        ]
+
+    def describe(self) -> str:
+        return (f"{self.model_name}{' int8' if self.int8 else ''} "
+                f"(threads={self.threads or 'auto'}, batch_size={self.batch_size}, "
+                f"max_seq_len={self.max_seq_len})")
+
+    @staticmethod
+    def add_arguments(parser):
+        """Add the shared embedding flags to an argparse parser."""
+        group = parser.add_argument_group("embedding model")
+        group.add_argument(
+            "--model-path",
+            default=DEFAULT_MODEL_PATH,
+            help=f"Directory with {MODEL_FILE} and {TOKENIZER_FILE} (default: {DEFAULT_MODEL_PATH})"
+        )
+        group.add_argument(
+            "--embed-threads",
+            type=int,
+            default=DEFAULT_THREADS,
+            help=f"ONNX Runtime intra-op threads, 0 = one per core (default: {DEFAULT_THREADS})"
+        )
+        group.add_argument(
+            "--embed-batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Texts per inference call (default: {DEFAULT_BATCH_SIZE})"
+        )
+        group.add_argument(
+            "--max-seq-len",
+            type=int,
+            default=DEFAULT_MAX_SEQ_LEN,
+            help=f"Truncate inputs to this many tokens (default: {DEFAULT_MAX_SEQ_LEN})"
+        )
+        group.add_argument(
+            "--int8",
+            action="store_true",
+            help=f"Use the quantized {INT8_MODEL_FILE} (default: off)"
+        )
+
+    @classmethod
+    def from_args(cls, args) -> "EmbeddingConfig":
+        return cls(args.model_path, args.embed_threads, args.embed_batch_size,
+                   args.max_seq_len, args.int8)
+
+
+class OnnxEmbedder:
+    """
+    Sentence embeddings from a BERT-style ONNX model: mean pooling over the
+    attention mask, then L2 normalization (as sentence-transformers and
+    Chroma's default function). Thread-safe; one session is shared by all
+    callers.
+    """
+
+    def __init__(self, config: EmbeddingConfig):
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime/tokenizers not installed. Install with: pip install chromadb")
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        config.ensure_model()
+        self.config = config
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(config.model_path, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=config.max_seq_len)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")  # to the longest in the batch
+
+        options = onnxruntime.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = config.threads
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            config.model_file, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, texts: list[str]):
+        import numpy as np
+
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, inputs)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1e-12
+        return (pooled / norms).astype(np.float32)
+
+    def __call__(self, texts: list[str]) -> list:
+        """Embed texts in batches of config.batch_size; returns one vector per text."""
+        vectors = []
+        batch_size = max(1, self.config.batch_size)
+        for lo in range(0, len(texts), batch_size):
+            vectors.extend(self._embed_batch(list(texts[lo:lo + batch_size])))
+        return vectors
+
+
+def quantize_model(config: EmbeddingConfig) -> str:
+    """
+    Write INT8_MODEL_FILE next to config's float model with ONNX Runtime
+    dynamic (weight-only) quantization. Requires the onnx package.
+    Returns the quantized model's path.
+    """
+    if importlib.util.find_spec("onnx") is None:
+        raise ImportError("Quantizing needs the onnx package. Install with: pip install onnx")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    source = os.path.join(config.model_path, MODEL_FILE)
+    target = os.path.join(config.model_path, INT8_MODEL_FILE)
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    return target
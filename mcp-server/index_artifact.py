@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Prebuilt, Memory-Mapped Index Artifact for SREcodex
+
+`index_skills.py --export PATH` packs a built index into one immutable file
+that `mcp_server.py --index-artifact PATH` memory-maps instead of opening
+ChromaDB, NumPy files and the skill store:
+
+- opening it reads only a small header, whatever the library size; rows
+  are decoded when a search or lookup touches them
+- the pages live in the OS page cache, so every server process on a host
+  shares one copy
+- it is written to a temp file and renamed over PATH, so servers see the
+  old artifact or the new one, never a partial file; servers that have the
+  old one mapped keep using it until they reload
+
+Layout (little-endian; sections start on 64-byte boundaries):
+
+    magic "SRCXART1"
+    sections, each a flat array:
+      embeddings       float32 [n, dim], normalized, rows in id order
+      ids              sorted ids (utf-8), with ids_offsets uint64 [n + 1]
+      metadata         compact JSON per row, with metadata_offsets
+      content          SKILL.md bodies, with content_offsets
+      etags            SHA-256 hex per row (the skill-store key)
+      doc_lengths      int32 [n], BM25 document lengths
+      terms            sorted BM25 terms, with terms_offsets uint64 [t + 1]
+      idf              float64 [t]
+      postings         int32 [p, 2] (row, term frequency) grouped by term,
+                       with posting_offsets uint64 [t + 1]
+      facets           sorted JSON [field, value] pairs of the filter fields
+                       (skill_filters.py), with facets_offsets uint64 [f + 1]
+      facet_rows       int32 rows having each pair, with facet_row_offsets
+    header             JSON: format version, index generation, counts,
+                       collection metadata, section offsets/dtypes/shapes
+    trailer            uint64 header offset + magic
+
+Vector search reuses the NumPy backend's exact search and BM25 scoring follows
+lexical_index.BM25Index, so results match the index it was exported from
+(up to the NumPy backend's exact search versus HNSW). `where` filters on
+the filter fields are answered from the facet row lists rather than by
+decoding every row's metadata.
+"""
+
+import bisect
+import itertools
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Callable
+
+import numpy as np
+
+from atomic_files import atomic_write
+from lexical_index import BM25Index, skill_terms, tokenize
+from skill_filters import LANGUAGE_FIELD_PREFIX, TAG_FIELD_PREFIX
+from skill_store import content_hash
+from vector_backends import (
+    DEFAULT_SPACE, cached_mask, collection_space, exact_top_k, normalize_rows, where_mask,
+)
+
+
+ARTIFACT_MAGIC = b"SRCXART1"
+ARTIFACT_VERSION = 1
+ALIGNMENT = 64
+TRAILER = struct.Struct("<Q8s")
+EXPORT_CHUNK = 1000  # rows fetched from the collection at a time
+FACET_FIELDS = ("risk_level", "always_load")  # plus every tag:/lang: field
+
+
+def is_facet(field: str) -> bool:
+    """True for the metadata fields search filters test (see skill_filters.build_where)."""
+    return field in FACET_FIELDS or field.startswith((TAG_FIELD_PREFIX, LANGUAGE_FIELD_PREFIX))
+
+
+def facet_key(field: str, value) -> str:
+    """Facet table key of a (field, value) pair."""
+    return json.dumps([field, value])
+
+
+# --- Writing ---------------------------------------------------------------
+
+class _Section:
+    """A section being written: a temp file, plus row offsets for blob sections."""
+
+    def __init__(self, dtype: str = "u1", blob: bool = False):
+        self.file = tempfile.TemporaryFile()
+        self.dtype = np.dtype(dtype)
+        self.offsets = [0] if blob else None
+        self.shape: tuple = (0,)
+
+    def add(self, data: bytes):
+        """Append one row of a blob section."""
+        self.file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        self.shape = (self.offsets[-1],)
+
+    def extend(self, rows):
+        """Append rows of a fixed-width section."""
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        self.file.write(rows.tobytes())
+        self.shape = (self.shape[0] + len(rows), *rows.shape[1:])
+
+
+def _fetch_rows(collection, ids: list[str]):
+    """Yield (id, metadata, embedding) for ids in order, EXPORT_CHUNK at a time."""
+    for lo in range(0, len(ids), EXPORT_CHUNK):
+        chunk = ids[lo:lo + EXPORT_CHUNK]
+        result = collection.get(ids=chunk, include=["metadatas", "embeddings"])
+        rows = {
+            skill_id: (metadata, embedding)
+            for skill_id, metadata, embedding
+            in zip(result["ids"], result["metadatas"], result["embeddings"])
+        }
+        for skill_id in chunk:
+            yield skill_id, *rows[skill_id]
+
+
+def _bm25_sections(vocabulary: dict[str, int], postings: "np.ndarray",
+                   doc_lengths: "np.ndarray") -> dict[str, "np.ndarray"]:
+    """
+    Sorted term table, idf and term-grouped postings from (term id, row, tf)
+    triples, scored as BM25Index.build() does.
+    """
+    terms = sorted(vocabulary)
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+    term_ranks = rank[postings[:, 0]]
+    order = np.lexsort((postings[:, 1], term_ranks))
+    document_frequency = np.bincount(term_ranks, minlength=len(terms))
+    n_docs = len(doc_lengths)
+    idf = np.log(1 + (n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+    return {
+        "terms": terms,
+        "idf": idf,
+        "postings": postings[order, 1:],
+        "posting_offsets": np.concatenate([[0], np.cumsum(document_frequency)]),
+    }
+
+
+def write_artifact(path: str, collection, read_content: Callable[[dict], str],
+                   generation: int) -> int:
+    """
+    Export every skill in collection (vectors, metadata, the bodies
+    read_content(metadata) returns, and a BM25 index) as an artifact at
+    path, atomically replacing any existing one. Returns the row count.
+    """
+    ids = sorted(collection.get(include=[])["ids"])
+    sections = {
+        "embeddings": _Section("<f4"),
+        "ids": _Section(blob=True),
+        "metadata": _Section(blob=True),
+        "content": _Section(blob=True),
+        "etags": _Section("S64"),
+        "doc_lengths": _Section("<i4"),
+    }
+    vocabulary: dict[str, int] = {}
+    postings = array('q')  # flat (term id, row, tf) per distinct term of each row
+    facets: dict[str, array] = {}
+
+    for row, (skill_id, metadata, embedding) in enumerate(_fetch_rows(collection, ids)):
+        metadata = dict(metadata)
+        content = read_content(metadata)
+        metadata.pop("full_content", None)
+        data = content.encode('utf-8')
+        terms = skill_terms(metadata)
+
+        sections["embeddings"].extend(normalize_rows(embedding))
+        sections["ids"].add(skill_id.encode('utf-8'))
+        sections["metadata"].add(json.dumps(metadata, separators=(",", ":")).encode('utf-8'))
+        sections["content"].add(data)
+        sections["etags"].extend([metadata.get("content_sha256") or content_hash(data)])
+        sections["doc_lengths"].extend([len(terms)])
+        counts: dict[int, int] = {}
+        for term in terms:
+            term_id = vocabulary.setdefault(term, len(vocabulary))
+            counts[term_id] = counts.get(term_id, 0) + 1
+        for term_id, tf in counts.items():
+            postings.extend((term_id, row, tf))
+        for field, value in metadata.items():
+            if is_facet(field):
+                facets.setdefault(facet_key(field, value), array('i')).append(row)
+
+    doc_lengths = np.frombuffer(_read_back(sections["doc_lengths"]), dtype="<i4")
+    bm25 = _bm25_sections(vocabulary, np.frombuffer(postings, dtype=np.int64).reshape(-1, 3),
+                          doc_lengths)
+    sections["terms"] = _Section(blob=True)
+    for term in bm25["terms"]:
+        sections["terms"].add(term.encode('utf-8'))
+    for name, dtype in (("idf", "<f8"), ("postings", "<i4"), ("posting_offsets", "<u8")):
+        sections[name] = _Section(dtype)
+        sections[name].extend(bm25[name])
+    sections["facets"] = _Section(blob=True)
+    sections["facet_rows"] = _Section("<i4")
+    facet_row_offsets = [0]
+    for key in sorted(facets):
+        sections["facets"].add(key.encode('utf-8'))
+        sections["facet_rows"].extend(facets[key])
+        facet_row_offsets.append(facet_row_offsets[-1] + len(facets[key]))
+    sections["facet_row_offsets"] = _Section("<u8")
+    sections["facet_row_offsets"].extend(facet_row_offsets)
+    for name in ("ids", "metadata", "content", "terms", "facets"):
+        sections[f"{name}_offsets"] = _Section("<u8")
+        sections[f"{name}_offsets"].extend(sections[name].offsets)
+
+    header = {
+        "format": "srecodex-index-artifact",
+        "version": ARTIFACT_VERSION,
+        "generation": generation,
+        "created_at": time.time(),
+        "count": len(ids),
+        "avg_doc_length": float(doc_lengths.mean()) if len(ids) else 0.0,
+        # A ChromaDB collection may keep its space only in its configuration
+        "collection_metadata": {**(collection.metadata or {}),
+                                "hnsw:space": collection_space(collection)},
+        "sections": {},
+    }
+    _assemble(path, sections, header)
+    return len(ids)
+
+
+def _read_back(section: _Section) -> bytes:
+    section.file.seek(0)
+    return section.file.read()
+
+
+def _assemble(path: str, sections: dict[str, _Section], header: dict):
+    """Concatenate the sections into a temp file next to path, then rename it over path."""
+    def write(f):
+        f.write(ARTIFACT_MAGIC)
+        for name, section in sections.items():
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            header["sections"][name] = {
+                "offset": f.tell(), "dtype": section.dtype.str, "shape": list(section.shape),
+            }
+            section.file.seek(0)
+            shutil.copyfileobj(section.file, f)
+            section.file.close()
+        header_offset = f.tell()
+        f.write(json.dumps(header).encode('utf-8'))
+        f.write(TRAILER.pack(header_offset, ARTIFACT_MAGIC))
+
+    # Read-only: a new export is a new file
+    atomic_write(path, write, mode=0o444, fsync=True)
+
+
+# --- Reading ---------------------------------------------------------------
+
+class _StringTable(Sequence):
+    """Lazily decoded utf-8 strings from a blob section and its offsets."""
+
+    def __init__(self, blob: "np.ndarray", offsets: "np.ndarray"):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].tobytes().decode('utf-8')
+
+    def find(self, value: str) -> int:
+        """Row of value in a sorted table, or -1 (binary search)."""
+        i = bisect.bisect_left(self, value)
+        return i if i < len(self) and self[i] == value else -1
+
+
+class _JsonTable(_StringTable):
+    """Lazily decoded JSON rows."""
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return super().__getitem__(i)
+        return json.loads(super().__getitem__(i))
+
+
+class _RowMapping(Mapping):
+    """{id: value of row} over the sorted id table, without building a dict."""
+
+    def __init__(self, ids: _StringTable, value: Callable[[int], object]):
+        self._ids = ids
+        self._value = value
+
+    def __getitem__(self, key):
+        row = self._ids.find(key) if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        return self._value(row)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class ArtifactBM25Index(BM25Index):
+    """BM25Index scoring over the artifact's memory-mapped term and postings tables."""
+
+    def __init__(self, ids: _StringTable, doc_lengths: "np.ndarray", avg_doc_length: float,
+                 terms: _StringTable, idf: "np.ndarray", postings: "np.ndarray",
+                 posting_offsets: "np.ndarray"):
+        super().__init__()
+        self.ids = ids
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = avg_doc_length
+        self._terms = terms
+        self._idf = idf
+        self._postings = postings
+        self._posting_offsets = posting_offsets
+
+    def search(self, query: str, n_results: int,
+               doc_filter: Callable[[str], bool] | None = None) -> list[tuple[str, float]]:
+        """Same scores as BM25Index.search(), accumulated with array operations."""
+        if not len(self.ids) or n_results <= 0:
+            return []
+
+        scores = np.zeros(len(self.ids))
+        for term in set(tokenize(query)):
+            t = self._terms.find(term)
+            if t < 0:
+                continue
+            block = self._postings[int(self._posting_offsets[t]):int(self._posting_offsets[t + 1])]
+            rows, tfs = block[:, 0], block[:, 1].astype(np.float64)
+            norm = 1 - self.b + self.b * self.doc_lengths[rows] / self.avg_doc_length
+            scores[rows] += self._idf[t] * tfs * (self.k1 + 1) / (tfs + self.k1 * norm)
+
+        candidates = np.flatnonzero(scores)
+        if doc_filter is None:
+            if len(candidates) > n_results:
+                candidates = candidates[np.argpartition(-scores[candidates], n_results - 1)[:n_results]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        else:
+            # Best first, stopping once n_results pass: the filter may be costly
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            candidates = list(itertools.islice(
+                (i for i in ranked if doc_filter(self.ids[i])), n_results
+            ))
+        return [(self.ids[i], float(scores[i])) for i in candidates]
+
+
+class IndexArtifact:
+    """
+    A read-only, memory-mapped artifact. It answers the read side of the
+    collection API (count/get/query, like NumpyBackend) and also carries the
+    catalog, ETags, skill bodies and BM25 index the server would otherwise
+    assemble at startup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        header_offset, magic = TRAILER.unpack_from(buffer, len(buffer) - TRAILER.size)
+        if buffer[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC or magic != ARTIFACT_MAGIC:
+            raise ValueError(f"{path} is not an index artifact")
+        header = json.loads(buffer[header_offset:len(buffer) - TRAILER.size])
+        if header.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported index artifact version {header.get('version')} in {path}")
+        self.header = header
+
+        arrays = {
+            name: np.frombuffer(buffer, dtype=np.dtype(spec["dtype"]),
+                                count=int(np.prod(spec["shape"])),
+                                offset=spec["offset"]).reshape(spec["shape"])
+            for name, spec in header["sections"].items()
+        }
+        self.generation = header["generation"]
+        self.metadata = header["collection_metadata"]
+        self.space = self.metadata.get("hnsw:space", DEFAULT_SPACE)
+        self.matrix = arrays["embeddings"]
+        self.ids = _StringTable(arrays["ids"], arrays["ids_offsets"])
+        self.metadatas = _JsonTable(arrays["metadata"], arrays["metadata_offsets"])
+        self._content = _StringTable(arrays["content"], arrays["content_offsets"])
+        self._etags = arrays["etags"]
+        self._facets = _StringTable(arrays["facets"], arrays["facets_offsets"])
+        self._facet_rows = arrays["facet_rows"]
+        self._facet_row_offsets = arrays["facet_row_offsets"]
+        self._masks = OrderedDict()
+
+        self.paths = self.ids  # sorted, as resource listing needs
+        self.catalog = _RowMapping(self.ids, self.metadatas.__getitem__)
+        self.etags = _RowMapping(self.ids, lambda row: self._etags[row].decode('ascii'))
+        self.lexical_index = ArtifactBM25Index(
+            self.ids, arrays["doc_lengths"], header["avg_doc_length"],
+            _StringTable(arrays["terms"], arrays["terms_offsets"]),
+            arrays["idf"], arrays["postings"], arrays["posting_offsets"],
+        )
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results: int = 10, include: list[str] | None = None,
+              where: dict | None = None, **_ignored) -> dict:
+        """Exact top-k by cosine similarity, as NumpyBackend.query()."""
+        queries = normalize_rows(query_embeddings)
+        if not len(self.ids):
+            return {"ids": [[] for _ in queries], "metadatas": [[] for _ in queries],
+                    "distances": [[] for _ in queries]}
+        mask = self._mask(where) if where else None
+        rows, distances = exact_top_k(self.matrix, queries, n_results, mask, space=self.space)
+        return {
+            "ids": [[self.ids[j] for j in row] for row in rows],
+            "metadatas": [[self.metadatas[j] for j in row] for row in rows],
+            "distances": distances,
+        }
+
+    def _mask(self, where: dict) -> "np.ndarray":
+        """
+        Row mask for a `where` filter (memoized), from the facet tables when
+        it only tests filter fields.
+        """
+        def compute(where: dict) -> "np.ndarray":
+            mask = self._facet_mask(where)
+            return mask if mask is not None else where_mask(self.metadatas, where)
+        return cached_mask(self._masks, where, compute)
+
+    def _facet_rows_mask(self, field: str, values: list) -> "np.ndarray":
+        """Mask of rows whose field equals one of values."""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for value in values:
+            i = self._facets.find(facet_key(field, value))
+            if i >= 0:
+                mask[self._facet_rows[int(self._facet_row_offsets[i]):int(self._facet_row_offsets[i + 1])]] = True
+        return mask
+
+    def _facet_mask(self, where: dict) -> "np.ndarray | None":
+        """skill_filters.matches_where() for every row at once, or None if where tests other fields."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._facet_mask(clause) for clause in condition]
+                if any(part is None for part in parts):
+                    return None
+                combined = np.full(len(self.ids), key == "$and")
+                for part in parts:
+                    combined = combined & part if key == "$and" else combined | part
+                mask &= combined
+            elif not is_facet(key):
+                return None
+            elif isinstance(condition, dict):
+                for op, operand in condition.items():
+                    if op in ("$eq", "$ne"):
+                        hits = self._facet_rows_mask(key, [operand])
+                    elif op in ("$in", "$nin"):
+                        hits = self._facet_rows_mask(key, operand)
+                    else:
+                        raise ValueError(f"Unsupported where operator: {op}")
+                    mask &= hits if op in ("$eq", "$in") else ~hits
+            else:
+                mask &= self._facet_rows_mask(key, [condition])
+        return mask
+
+    def get(self, ids: list[str] | None = None, include: list[str] | None = None,
+            **_ignored) -> dict:
+        """Return {"ids", "metadatas"} for the given ids (all when None)."""
+        if ids is None:
+            return {"ids": list(self.ids), "metadatas": list(self.metadatas)}
+        rows = [row for row in map(self.ids.find, ids) if row >= 0]
+        return {"ids": [self.ids[row] for row in rows],
+                "metadatas": [self.metadatas[row] for row in rows]}
+
+    def read(self, path: str) -> str | None:
+        """Return a skill's SKILL.md body, or None if path is not in the artifact."""
+        row = self.ids.find(path)
+        return self._content[row] if row >= 0 else None
+
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Index Generation Marker for SREcodex
+
+The indexer bumps a small generation file inside the index directory after
+every successful write. Running MCP servers stat() it to notice a re-index
+cheaply and hot-swap the new index without restarting.
+
+File: <index_path>/index_generation.json
+    {"generation": 7, "updated_at": 1731859200.123}
+
+The file is replaced atomically (temp file + rename), so its inode changes
+on every bump; servers compare the full stat stamp rather than the counter,
+which also catches a wipe-and-rebuild that restarts the counter at 1.
+
+A Chroma server (--chroma-url) has no directory the indexer and servers
+share, so there the generation and its bump time live in the collection's
+metadata instead, and servers poll that.
+"""
+
+import json
+import os
+import time
+
+from atomic_files import atomic_write
+
+
+GENERATION_FILE = "index_generation.json"
+GENERATION_KEY = "srecodex:generation"                 # collection metadata (Chroma server)
+GENERATION_UPDATED_KEY = "srecodex:generation_updated_at"
+
+
+def generation_path(index_path: str) -> str:
+    """Return the generation file path for an index directory."""
+    return os.path.join(index_path, GENERATION_FILE)
+
+
+def read_generation(index_path: str) -> int:
+    """Return the current generation, or 0 if the index was never stamped."""
+    try:
+        with open(generation_path(index_path), 'r', encoding='utf-8') as f:
+            return int(json.load(f).get("generation", 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def generation_stamp(index_path: str) -> tuple | None:
+    """
+    Return a cheap change-detection stamp (inode, size, mtime) for the
+    generation file, or None if it does not exist.
+    """
+    return path_stamp(generation_path(index_path))
+
+
+def path_stamp(path: str) -> tuple | None:
+    """(inode, size, mtime) of a file replaced by rename, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def bump_generation(index_path: str) -> int:
+    """Increment the generation counter atomically and return the new value."""
+    generation = read_generation(index_path) + 1
+    data = json.dumps({"generation": generation, "updated_at": time.time()}).encode('utf-8')
+    atomic_write(generation_path(index_path), lambda f: f.write(data))
+    return generation
+
+
+def metadata_generation(metadata: dict) -> int:
+    """Return the generation kept in collection metadata, or 0 if never stamped."""
+    return int(metadata.get(GENERATION_KEY, 0))
+
+
+def metadata_stamp(metadata: dict) -> tuple | None:
+    """
+    Change-detection stamp (generation, bump time) for a generation kept in
+    collection metadata, or None if it was never stamped.
+    """
+    if GENERATION_KEY not in metadata:
+        return None
+    return (metadata[GENERATION_KEY], metadata.get(GENERATION_UPDATED_KEY))
+
+
+def bump_collection_generation(collection) -> int:
+    """
+    Increment the generation in a Chroma collection's metadata and return
+    the new value. modify() replaces the whole metadata and rejects "hnsw:"
+    keys (the collection configuration keeps those), so the rest is carried
+    over and they are left out.
+    """
+    metadata = {key: value for key, value in (collection.metadata or {}).items()
+                if not key.startswith("hnsw:")}
+    generation = metadata_generation(metadata) + 1
+    collection.modify(metadata={
+        **metadata, GENERATION_KEY: generation, GENERATION_UPDATED_KEY: time.time(),
+    })
+    return generation
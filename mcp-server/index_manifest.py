@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Index Manifest for Incremental Indexing
+
+The indexer records what it indexed in a manifest next to the generation
+marker, so the next run only re-embeds skills whose files changed and
+deletes the ids of skills that are gone.
+
+File: <index_path>/index_manifest.json
+    {
+      "version": 1,
+      "settings": {...},            # what the stored vectors depend on
+      "collection_metadata": {...}, # as last applied to the collection
+      "generation": 7,              # generation written with this manifest
+      "model": {                    # the embedding model file, as last hashed
+        "file": "...", "stamp": [inode, size, mtime_ns], "sha256": "..."
+      },
+      "skills": {
+        "skills/uv-python/SKILL.md": {
+          "sha256": "...", "mtime_ns": ..., "size": ..., "indexed": true
+        }
+      }
+    }
+
+settings hold the embedding model id (name and weights digest) and every
+other setting the vectors or metadata depend on; a manifest with different
+settings, or written for a generation other than the current one (another
+indexer wrote the index since), is ignored and the run re-indexes
+everything. "indexed" is false for files that were seen but could not be
+parsed, so an unchanged broken file is not re-read on every run.
+
+"model" lets a run skip hashing the model file (~90 MB) while its stamp is
+unchanged, and skip downloading it when it is missing until some skill
+actually needs embedding.
+"""
+
+import json
+import os
+import sys
+
+from atomic_files import atomic_write
+from index_generation import path_stamp
+
+
+MANIFEST_FILE = "index_manifest.json"
+MANIFEST_VERSION = 2  # bump when skill metadata or ids are built differently
+
+
+def manifest_path(index_path: str) -> str:
+    """Return the manifest path for an index directory."""
+    return os.path.join(index_path, MANIFEST_FILE)
+
+
+def file_stamp(st: os.stat_result) -> dict:
+    """The stat fields an unchanged file is recognized by."""
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def model_entry(model_file: str, digest: str) -> dict:
+    """The manifest's record of the model file and its digest."""
+    stamp = path_stamp(model_file)
+    return {"file": os.path.abspath(model_file),
+            "stamp": list(stamp) if stamp else None, "sha256": digest}
+
+
+def recorded_model_digest(manifest: dict | None, model_file: str) -> str | None:
+    """
+    Return the digest the manifest recorded for model_file if the file is
+    unchanged since (same stamp) or missing, else None (hash it).
+    """
+    entry = (manifest or {}).get("model")
+    if not entry or entry.get("file") != os.path.abspath(model_file):
+        return None
+    stamp = path_stamp(model_file)
+    if stamp is None or list(stamp) == entry.get("stamp"):
+        return entry.get("sha256")
+    return None
+
+
+def read_manifest(index_path: str) -> dict | None:
+    """Return the manifest as written, or None if there is none or it is unreadable."""
+    try:
+        with open(manifest_path(index_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Ignoring unreadable manifest: {e}", file=sys.stderr)
+        return None
+
+
+def check_manifest(manifest: dict | None, settings: dict, generation: int) -> dict | None:
+    """
+    Return manifest if it can be trusted for an incremental run with these
+    settings on an index now at generation, else None (printing why,
+    unless there is none yet).
+    """
+    if manifest is None:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        reason = f"format version {manifest.get('version')}"
+    elif manifest.get("settings") != settings:
+        changed = sorted(
+            key for key in set(settings) | set(manifest.get("settings") or {})
+            if (manifest.get("settings") or {}).get(key) != settings.get(key)
+        )
+        reason = "settings changed: " + ", ".join(changed)
+    elif manifest.get("generation") != generation:
+        reason = "the index was written by another run"
+    else:
+        return manifest
+    print(f"Manifest out of date ({reason}); re-indexing all skills")
+    return None
+
+
+def save_manifest(index_path: str, settings: dict, collection_metadata: dict,
+                  generation: int, skills: dict, model: dict | None = None):
+    """Write the manifest atomically (temp file + rename)."""
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "settings": settings,
+        "collection_metadata": collection_metadata,
+        "generation": generation,
+        "model": model,
+        "skills": skills,
+    }
+    data = json.dumps(manifest, separators=(",", ":")).encode('utf-8')
+    atomic_write(manifest_path(index_path), lambda f: f.write(data))
@@ -3,67 +3,131 @@
 Skill Indexing Pipeline for SREcodex
 
 Parses YAML frontmatter from SKILL.md files, embeds intent fields,
-and stores full documents in ChromaDB for semantic search.
+and stores full documents in a content-addressed skill store for retrieval.
 
 Key Design Decisions:
 - Parent-Child Indexing: Embed only the intent field, retrieve full document
 - This avoids RAG chunking that breaks executable code
+- Full SKILL.md bodies live in the skill store (keyed by SHA-256);
+  ChromaDB metadata keeps only the hash
+- Pluggable vector backend: ChromaDB (default) or an exact NumPy matrix
 - Idempotent: Safe to re-run (uses upsert)
+- Incremental: a manifest (see index_manifest.py) lets a run embed only
+  new or changed skills and delete the ids of removed ones
+- Each run bumps the index generation so running MCP servers hot-reload
+- Tags and languages are also stored as one boolean field per value
+  (see skill_filters.py) so searches can filter on them
+- Embeddings come from embeddings.OnnxEmbedder; its settings are recorded
+  in the collection metadata so the server can refuse a mismatched model
+- Computed embeddings are cached on disk (see embedding_store.py), so
+  rebuilding an index from scratch only re-embeds texts never seen before
+- Each skill's section outline and per-section token counts are stored
+  (see skill_sections.py) so the server can fit skills to a token budget
+- Changed skills stream through a pipeline: parsing over a process pool,
+  embedding in batches, upserts on a writer thread, joined by bounded
+  queues, so memory stays flat and all stages run at once
+- --watch keeps running and re-indexes the SKILL.md files that change
+  (see skill_watcher.py), bumping the generation after each burst
+- --export packs the finished index into one immutable, memory-mappable
+  file (see index_artifact.py) that servers can load instantly
 
 Usage:
     python index_skills.py                    # Index from default path
     python index_skills.py --skills-dir PATH  # Index from custom path
     python index_skills.py --chroma-path PATH # Use custom ChromaDB path
+    python index_skills.py --store-path PATH  # Use custom skill store path
+    python index_skills.py --backend numpy    # Write a NumPy index instead
+    python index_skills.py --chroma-url http://localhost:8000  # Chroma server
+    python index_skills.py --space cosine --hnsw-m 32  # Distance space / HNSW graph
+    python index_skills.py --model-path DIR --int8     # Embedding model (see embeddings.py)
+    python index_skills.py --full             # Re-embed every skill
+    python index_skills.py --export skills.idx   # Also write an index artifact
+    python index_skills.py --watch            # Re-index on every SKILL.md change
 """
 
 import argparse
+import itertools
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import yaml
-import chromadb
-from chromadb.utils import embedding_functions
+
+from embedding_store import DEFAULT_EMBEDDING_STORE_PATH, EmbeddingStore, embed_cached
+from embeddings import METADATA_PREFIX as EMBEDDING_METADATA_PREFIX, EmbeddingConfig, OnnxEmbedder
+from index_generation import (
+    bump_collection_generation, bump_generation, metadata_generation, read_generation,
+)
+from index_manifest import (
+    check_manifest, file_stamp, model_entry, read_manifest, recorded_model_digest, save_manifest,
+)
+from skill_filters import filter_fields
+from skill_sections import count_tokens, outline_json
+from skill_store import DEFAULT_STORE_PATH, SkillStore, content_hash
+from skill_watcher import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, watch
+from vector_backends import (
+    BACKENDS, DEFAULT_BACKEND, DEFAULT_HNSW_CONSTRUCTION_EF, DEFAULT_HNSW_M,
+    DEFAULT_HNSW_SEARCH_EF, DEFAULT_NUMPY_DTYPE, DEFAULT_NUMPY_PATH, DEFAULT_SPACE,
+    HNSW_BUILD_KEYS, NUMPY_DTYPES, SPACES, NumpyBackend, hnsw_metadata, max_batch_size,
+    open_collection,
+)
 
 
 # Default configuration
 DEFAULT_SKILLS_DIR = "../dotcodex/skills"
 DEFAULT_CHROMA_PATH = "./chroma_data"
 COLLECTION_NAME = "srecodex_skills"
+LISTED_SKILLS = 50  # names printed after indexing; large libraries are summarized
+
+# Indexing pipeline (parse -> embed -> write)
+DEFAULT_WRITE_BATCH_SIZE = 1000  # skills embedded and upserted together
+DEFAULT_PARSE_WORKERS = 0        # 0 = one per core
+PARSE_CHUNK = 64                 # files per parse task
+PARSE_WINDOW = 2                 # parse tasks in flight per worker
+PARSE_POOL_MIN = 256             # fewer changed files are parsed in-process
+WRITE_QUEUE_DEPTH = 2            # embedded batches waiting for the writer
 
 
-def parse_skill_file(filepath: str) -> dict | None:
+def parse_skill_file(filepath: str, content: str | None = None) -> dict | None:
     """
     Extract YAML frontmatter and full content from SKILL.md file.
 
-    Returns dict with id, name, tags, intent, risk_level, full_content
-    or None if file doesn't have valid frontmatter.
+    content, if given, is the file's text already read by the caller.
+    Returns dict with id, name, tags, intent, risk_level, version, languages,
+    always_load, full_content or None if file doesn't have valid frontmatter.
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"ERROR: Could not read {filepath}: {e}")
-        return None
+    if content is None:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"ERROR: Could not read {filepath}: {e}", file=sys.stderr)
+            return None
 
     # Check for YAML frontmatter (between --- markers)
     if not content.startswith('---'):
-        print(f"SKIP: No frontmatter in {filepath}")
+        print(f"SKIP: No frontmatter in {filepath}", file=sys.stderr)
         return None
 
     parts = content.split('---', 2)
     if len(parts) < 3:
-        print(f"SKIP: Invalid frontmatter format in {filepath}")
+        print(f"SKIP: Invalid frontmatter format in {filepath}", file=sys.stderr)
         return None
 
     try:
         metadata = yaml.safe_load(parts[1])
     except yaml.YAMLError as e:
-        print(f"SKIP: YAML parse error in {filepath}: {e}")
+        print(f"SKIP: YAML parse error in {filepath}: {e}", file=sys.stderr)
         return None
 
     if not metadata:
-        print(f"SKIP: Empty frontmatter in {filepath}")
+        print(f"SKIP: Empty frontmatter in {filepath}", file=sys.stderr)
         return None
 
     # Extract fields with defaults
@@ -72,12 +136,40 @@ def parse_skill_file(filepath: str) -> dict | None:
         "name": metadata.get("name", ""),
         "tags": metadata.get("tags", []),
         "intent": metadata.get("intent", ""),
-        "risk_level": metadata.get("risk_level", "unknown"),
+        "risk_level": metadata.get("risk_level"),
         "version": metadata.get("version", ""),
+        "languages": metadata.get("languages", "all"),
+        "always_load": bool(metadata.get("always_load", False)),
         "full_content": content  # Store complete file for retrieval
     }
 
 
+def skill_metadata(skill: dict) -> dict:
+    """
+    Build the collection metadata for a parsed skill (without content).
+
+    Lists are stored comma-joined for display and BM25, plus the scalar
+    filter fields (including the normalized risk_level) from
+    skill_filters.filter_fields(). The section outline
+    (skill_sections.section_outline()) is stored as JSON with the total
+    token count, for max_tokens budgeting.
+    """
+    languages = skill["languages"]
+    if isinstance(languages, (list, tuple)):
+        languages = ",".join(str(language) for language in languages)
+    return {
+        "name": skill["name"],
+        "tags": ",".join(skill["tags"]) if skill["tags"] else "",
+        "intent": skill["intent"],
+        "version": skill["version"],
+        "languages": languages or "all",
+        "sections": outline_json(skill["full_content"]),
+        "token_count": count_tokens(skill["full_content"]),
+        **filter_fields(skill["tags"], skill["languages"], skill["risk_level"],
+                        skill["always_load"]),
+    }
+
+
 def build_searchable_text(skill: dict) -> str:
     """
     Combine metadata fields into single searchable string.
@@ -93,13 +185,21 @@ def build_searchable_text(skill: dict) -> str:
     return " | ".join(filter(None, parts))
 
 
+def skill_id(filepath: str, skills_dir: str) -> str:
+    """
+    Return the collection id for a skill file: its path relative to the
+    parent of the skills directory (e.g. 'skills/uv-python/SKILL.md').
+    """
+    return os.path.relpath(filepath, os.path.dirname(os.path.normpath(skills_dir)))
+
+
 def find_skill_files(skills_dir: str) -> list[str]:
     """Find all SKILL.md files recursively in the skills directory."""
     skill_files = []
     skills_path = Path(skills_dir).resolve()
 
     if not skills_path.exists():
-        print(f"ERROR: Skills directory not found: {skills_path}")
+        print(f"ERROR: Skills directory not found: {skills_path}", file=sys.stderr)
         return []
 
     for root, dirs, files in os.walk(skills_path):
@@ -110,91 +210,451 @@ def find_skill_files(skills_dir: str) -> list[str]:
     return skill_files
 
 
-def index_skills(skills_dir: str, chroma_path: str) -> int:
+def current_generation(index_path: str, backend: str = DEFAULT_BACKEND,
+                       chroma_url: str | None = None) -> int:
     """
-    Main indexing function.
-
-    Returns the number of skills successfully indexed.
+    Return the index generation: the marker file in index_path, or on a
+    Chroma server the collection metadata (0 if never indexed or the
+    server is unreachable).
     """
-    print(f"Indexing skills from: {os.path.abspath(skills_dir)}")
-    print(f"ChromaDB path: {os.path.abspath(chroma_path)}")
-
-    # Find all SKILL.md files
-    skill_files = find_skill_files(skills_dir)
-    print(f"Found {len(skill_files)} SKILL.md files")
-
-    if not skill_files:
-        print("No skill files found. Nothing to index.")
+    if backend != "chroma" or not chroma_url:
+        return read_generation(index_path)
+    try:
+        collection = open_collection(backend, index_path, COLLECTION_NAME, None,
+                                     chroma_url=chroma_url)
+    except Exception:
         return 0
+    return metadata_generation(collection.metadata or {})
+
+
+def index_skills(skills_dir: str, chroma_path: str,
+                 store_path: str = DEFAULT_STORE_PATH,
+                 backend: str = DEFAULT_BACKEND,
+                 numpy_path: str = DEFAULT_NUMPY_PATH,
+                 numpy_dtype: str = DEFAULT_NUMPY_DTYPE,
+                 chroma_url: str | None = None,
+                 hnsw: dict | None = None,
+                 embedding_config: EmbeddingConfig | None = None,
+                 full: bool = False,
+                 write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+                 parse_workers: int = DEFAULT_PARSE_WORKERS,
+                 embedding_store_path: str | None = DEFAULT_EMBEDDING_STORE_PATH,
+                 changed_paths: set[str] | None = None) -> int:
+    """
+    Main indexing function.
 
-    # Parse all skill files
-    skills = []
-    for filepath in skill_files:
-        skill = parse_skill_file(filepath)
-        if skill:
-            skills.append(skill)
+    With chroma_url, the chroma backend writes to a Chroma server instead of
+    chroma_path, and the generation is kept in the collection metadata (the
+    manifest is still written under chroma_path).
+    hnsw (see vector_backends.hnsw_metadata()) selects the distance space
+    and HNSW parameters, recorded in the collection metadata; ChromaDB's
+    defaults if None. embedding_config selects the embedding model and
+    inference settings (defaults if None).
+
+    Runs are incremental: the manifest next to the index (see
+    index_manifest.py) says which files were indexed with which content,
+    so only new or changed skills are parsed and embedded, and ids of
+    skills that are gone are deleted in one batch. When nothing changed,
+    the run ends after a stat() per file (and of the model file, whose
+    digest the manifest keeps). With full, or when the manifest
+    does not match the settings, every skill is re-embedded.
+
+    Changed files go through a parse -> embed -> write pipeline:
+    parse_workers processes (0 = one per core) read and parse them, this
+    thread embeds them write_batch_size at a time (capped by ChromaDB's
+    batch limit), and a writer thread upserts each batch while the next
+    one is embedded. Texts already in the embedding store at
+    embedding_store_path (None or "" disables it) are not re-embedded, and
+    the model is only loaded if some text is new.
+
+    changed_paths (from --watch) lists the SKILL.md files that may have
+    changed since the last run; with a usable manifest, only those are
+    stat()ed instead of walking skills_dir.
+
+    Returns the number of skills in the index.
+    """
+    index_path = chroma_path if backend == "chroma" else numpy_path
 
-    print(f"Parsed {len(skills)} valid skills (with frontmatter)")
+    print(f"Indexing skills from: {os.path.abspath(skills_dir)}")
+    print(f"Backend: {backend}")
+    if backend == "chroma" and chroma_url:
+        print(f"Chroma server: {chroma_url}")
+    else:
+        print(f"Index path: {os.path.abspath(index_path)}")
+    print(f"Skill store path: {os.path.abspath(store_path)}")
+    hnsw = hnsw or hnsw_metadata()
+    print("HNSW: " + ", ".join(f"{k[len('hnsw:'):]}={v}" for k, v in hnsw.items()))
+    embedding_config = embedding_config or EmbeddingConfig()
+    print(f"Embedding model: {embedding_config.describe()}")
+    recorded = None if full else read_manifest(index_path)
+    # An unchanged model file is not re-hashed, and a missing one is only
+    # downloaded once a skill needs embedding (checked against the digest then)
+    model_digest = recorded_model_digest(recorded, embedding_config.model_file)
+    model_missing = False
+    if model_digest:
+        embedding_config.set_model_digest(model_digest)
+        model_missing = not os.path.exists(embedding_config.model_file)
+    else:
+        embedding_config.ensure_model()
+
+    collection_metadata = {
+        "description": "SREcodex skills for semantic search",
+        **hnsw,
+        **embedding_config.metadata(),
+    }
+    # Everything the stored vectors and metadata depend on
+    settings = {
+        "backend": backend,
+        "chroma_url": chroma_url if backend == "chroma" else None,
+        "numpy_dtype": numpy_dtype if backend == "numpy" else None,
+        "store_path": os.path.abspath(store_path),
+        **{key: value for key, value in collection_metadata.items()
+           if key in HNSW_BUILD_KEYS or key.startswith(EMBEDDING_METADATA_PREFIX)},
+    }
 
-    if not skills:
-        print("No valid skills to index.")
-        return 0
+    manifest = None if full else check_manifest(
+        recorded, settings, current_generation(index_path, backend, chroma_url)
+    )
+    previous = manifest["skills"] if manifest else {}
+    if manifest and changed_paths is not None:
+        files = _apply_changed_paths(previous, changed_paths, skills_dir)
+        print(f"{len(changed_paths)} SKILL.md files changed; {len(files)} in total")
+    else:
+        # Find all SKILL.md files
+        skill_files = find_skill_files(skills_dir)
+        print(f"Found {len(skill_files)} SKILL.md files")
+        if not skill_files:
+            # Still runs through: skills indexed before must be removed
+            print("WARNING: No skill files found", file=sys.stderr)
+
+        files = {
+            skill_id(filepath, skills_dir): (filepath, file_stamp(os.stat(filepath)))
+            for filepath in skill_files
+        }
+    changed = [sid for sid, (_, stamp) in files.items() if not _unchanged(previous.get(sid), stamp)]
+    vanished = [sid for sid in previous if sid not in files]
+
+    if (manifest and not changed and not vanished
+            and manifest["collection_metadata"] == collection_metadata):
+        count = sum(entry["indexed"] for entry in previous.values())
+        model = model_entry(embedding_config.model_file, embedding_config.model_digest())
+        if manifest.get("model") != model:
+            # Record the model hashed this run, so the next one can skip it
+            save_manifest(index_path, settings, collection_metadata, manifest["generation"],
+                          previous, model)
+        print(f"Index up to date: {count} skills, generation {manifest['generation']}")
+        return count
+
+    # Load the vector backend (imported lazily, so the parsing helpers
+    # above can be reused by the MCP server without it)
+    print(f"Initializing {backend} backend...")
+
+    # Get or create collection; vectors are computed here, not by the backend
+    collection = open_collection(
+        backend,
+        index_path,
+        COLLECTION_NAME,
+        None,
+        create=True,
+        metadata=collection_metadata,
+        numpy_dtype=numpy_dtype,
+        chroma_url=chroma_url
+    )
 
-    # Initialize ChromaDB
-    print("Initializing ChromaDB...")
-    client = chromadb.PersistentClient(path=chroma_path)
+    if manifest:
+        expected = sum(entry["indexed"] for entry in previous.values())
+        if collection.count() != expected:
+            print(f"WARNING: Collection has {collection.count()} skills, manifest {expected}; "
+                  "re-indexing all skills", file=sys.stderr)
+            manifest, previous, changed = None, {}, list(files)
+    if manifest:
+        previous_ids = {sid for sid, entry in previous.items() if entry["indexed"]}
+    else:
+        # Also removes skills indexed before there was a manifest
+        previous_ids = set(collection.get(include=[])["ids"])
+
+    # Manifest entries: unchanged files carry over, changed ones are re-read
+    changed_ids = set(changed)
+    entries = {sid: previous[sid] for sid in files if sid not in changed_ids}
+    tasks = [(sid, *files[sid], previous.get(sid)) for sid in changed]
+
+    # Streaming pipeline: parse (process pool) -> embed (this thread, in
+    # write batches) -> upsert (writer thread). Only a few batches are in
+    # flight at a time, so memory stays flat however large the library is.
+    batch = min(write_batch_size, max_batch_size(collection) or write_batch_size)
+    if isinstance(collection, NumpyBackend):
+        # Every upsert rewrites the whole matrix (held in memory anyway)
+        batch = max(1, len(tasks))
+    embedding_store = EmbeddingStore.open(embedding_store_path, embedding_config.model_id())
+    embedder = None
+
+    def embed(texts: list[str]) -> list:
+        nonlocal embedder
+        if embedder is None:
+            embedder = OnnxEmbedder(embedding_config)
+            if model_missing and embedding_config.hash_model_file() != model_digest:
+                raise RuntimeError(f"{embedding_config.model_file} differs from the model the index "
+                                   "was built with; re-run with --full")
+        return embedder(texts)
+
+    embed_seconds = 0.0
+    indexed_names = []
+    n_embedded = 0
+    start = time.perf_counter()
+    writer = _BatchWriter(collection)
+    writer.start()
+    try:
+        results = _parse_stream(tasks, store_path, parse_workers)
+        for chunk in _chunks(_skills_to_embed(results, entries), batch):
+            ids, documents, metadatas, names = (list(column) for column in zip(*chunk))
+            t = time.perf_counter()
+            embeddings = embed_cached(documents, embed, embedding_store)
+            embed_seconds += time.perf_counter() - t
+            writer.put(ids, documents, metadatas, embeddings)
+            n_embedded += len(ids)
+            indexed_names.extend(names[:LISTED_SKILLS - len(indexed_names)])
+    finally:
+        writer.close()
+        if embedding_store is not None:
+            embedding_store.close()
+
+    # Touched but not edited: re-hashed, nothing to re-embed
+    touched = sum(1 for sid in changed
+                  if sid in entries and sid in previous
+                  and entries[sid]["sha256"] == previous[sid]["sha256"])
+    indexed_ids = {sid for sid, entry in entries.items() if entry["indexed"]}
+    deleted = sorted(previous_ids - indexed_ids)
+    print(f"Parsed {n_embedded} new or changed skills; "
+          f"{len(files) - len(changed) + touched} unchanged, {len(deleted)} removed")
+    if n_embedded:
+        elapsed = time.perf_counter() - start
+        print(f"Embedded and upserted {n_embedded} skills in {elapsed:.2f}s "
+              f"({n_embedded / elapsed if elapsed else 0:.0f}/s; embedding {embed_seconds:.2f}s, "
+              f"{writer.busy_seconds:.2f}s in upserts)")
+        if embedding_store is not None:
+            print(f"Embedding store: {embedding_store.hits} cached, "
+                  f"{embedding_store.misses} computed ({os.path.abspath(embedding_store_path)})")
+
+    if deleted:
+        collection.delete(ids=deleted)
+
+    # Written last: servers reload only once the index is complete. A run
+    # that only saw touched files changes nothing servers would see.
+    if n_embedded or deleted or not manifest or manifest["collection_metadata"] != collection_metadata:
+        if backend == "chroma" and chroma_url:
+            generation = bump_collection_generation(collection)
+        else:
+            generation = bump_generation(index_path)
+    else:
+        generation = manifest["generation"]
+    save_manifest(index_path, settings, collection_metadata, generation, entries,
+                  model_entry(embedding_config.model_file, embedding_config.model_digest()))
+    # Indexed entries' file hashes are their skill store keys
+    removed = SkillStore(store_path).retain(
+        settings["chroma_url"] or os.path.abspath(index_path),
+        (entry["sha256"] for entry in entries.values() if entry["indexed"]),
+    )
+    if removed:
+        print(f"Skill store: removed {removed} unreferenced blobs")
 
-    # Use default embedding function (all-MiniLM-L6-v2)
-    # Can be upgraded to OpenAI/Cohere embeddings for better accuracy
-    embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+    print(f"Successfully indexed {len(indexed_ids)} skills ({backend} backend)")
+    print(f"Collection: {COLLECTION_NAME}")
+    print(f"Total documents in collection: {collection.count()}")
+    print(f"Index generation: {generation}")
 
-    # Get or create collection
-    collection = client.get_or_create_collection(
-        name=COLLECTION_NAME,
-        embedding_function=embedding_fn,
-        metadata={"description": "SREcodex skills for semantic search"}
-    )
+    # Show what changed
+    for heading, names, total in (("Indexed skills", indexed_names, n_embedded),
+                                  ("Removed skills", deleted, len(deleted))):
+        if names:
+            print(f"\n{heading}:")
+            for name in names[:LISTED_SKILLS]:
+                print(f"  - {name}")
+            if total > LISTED_SKILLS:
+                print(f"  ... and {total - LISTED_SKILLS} more")
 
-    # Prepare batch upsert data
-    ids = []
-    documents = []
-    metadatas = []
+    return len(indexed_ids)
 
-    for skill in skills:
-        # Use relative path from skills dir as ID for cleaner display
-        rel_path = os.path.relpath(skill["id"], os.path.dirname(skills_dir))
-        ids.append(rel_path)
 
-        # This text gets embedded for search
-        documents.append(build_searchable_text(skill))
+def _read_changed(tasks: list[tuple], store_path: str) -> list[tuple]:
+    """
+    Parse stage: read and hash each changed file and, if its content changed,
+    parse it and put its body in the skill store. Runs in parse workers.
 
-        # Store full content and metadata for retrieval
-        metadatas.append({
-            "name": skill["name"],
-            "tags": ",".join(skill["tags"]) if skill["tags"] else "",
-            "risk_level": skill["risk_level"],
-            "version": skill["version"],
-            "full_content": skill["full_content"]  # Complete skill file
-        })
+    Takes (id, filepath, stat stamp, previous manifest entry) tuples and
+    returns (id, manifest entry, searchable text, metadata, name) ones;
+    the last three are None for files that were only touched or could not
+    be parsed, and the entry is None for files that could not be read.
+    """
+    store = SkillStore(store_path)
+    results = []
+    for sid, filepath, stamp, previous in tasks:
+        try:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            content = data.decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"ERROR: Could not read {filepath}: {e}", file=sys.stderr)
+            results.append((sid, None, None, None, None))
+            continue
+
+        digest = content_hash(data)
+        if previous and previous["sha256"] == digest:
+            results.append((sid, {**previous, **stamp}, None, None, None))
+            continue
+
+        skill = parse_skill_file(filepath, content)
+        entry = {"sha256": digest, **stamp, "indexed": skill is not None}
+        if not skill:
+            results.append((sid, entry, None, None, None))
+            continue
+
+        # Full content goes to the skill store; metadata keeps only its hash
+        metadata = {**skill_metadata(skill), "content_sha256": store.put(skill["full_content"])}
+        # The searchable text is what gets embedded
+        results.append((sid, entry, build_searchable_text(skill), metadata, skill["name"]))
+    return results
+
+
+def _parse_stream(tasks: list[tuple], store_path: str, workers: int):
+    """
+    Yield _read_changed() results for tasks, in order.
 
-    # Upsert to collection (safe to re-run)
-    print("Upserting to ChromaDB...")
-    collection.upsert(
-        ids=ids,
-        documents=documents,
-        metadatas=metadatas
-    )
+    Large runs fan out over a process pool, keeping at most PARSE_WINDOW
+    tasks per worker submitted, so parsed skills never pile up ahead of
+    the embedder. Workers are spawned rather than forked: by now this
+    process runs Chroma's threads, which a fork would copy mid-flight.
+    """
+    chunks = (tasks[lo:lo + PARSE_CHUNK] for lo in range(0, len(tasks), PARSE_CHUNK))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < PARSE_POOL_MIN:
+        for chunk in chunks:
+            yield from _read_changed(chunk, store_path)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_read_changed, chunk, store_path))
+            if len(pending) >= workers * PARSE_WINDOW:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _skills_to_embed(results, entries: dict):
+    """Record each parsed file's manifest entry; yield (id, text, metadata, name) to embed."""
+    for sid, entry, document, metadata, name in results:
+        if entry is not None:
+            entries[sid] = entry
+        if document is not None:
+            yield sid, document, metadata, name
+
+
+def _chunks(iterable, size: int):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class _BatchWriter(threading.Thread):
+    """
+    Write stage: upserts embedded batches on its own thread, so the next
+    batch is embedded while one is written. At most WRITE_QUEUE_DEPTH
+    batches wait; put() blocks when the writer falls behind.
+    """
 
-    print(f"Successfully indexed {len(skills)} skills to ChromaDB")
-    print(f"Collection: {COLLECTION_NAME}")
-    print(f"Total documents in collection: {collection.count()}")
+    def __init__(self, collection):
+        super().__init__(name="index-writer", daemon=True)
+        self.collection = collection
+        self.queue = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+        self.busy_seconds = 0.0
+        self.error = None
+
+    def put(self, ids: list[str], documents: list[str], metadatas: list[dict], embeddings):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((ids, documents, metadatas, embeddings))
+
+    def close(self):
+        """Wait until every queued batch is written; re-raise a write error."""
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        while (item := self.queue.get()) is not None:
+            if self.error is not None:
+                continue  # keep draining so put() cannot block forever
+            ids, documents, metadatas, embeddings = item
+            start = time.perf_counter()
+            try:
+                self.collection.upsert(ids=ids, documents=documents,
+                                       metadatas=metadatas, embeddings=embeddings)
+            except Exception as e:
+                self.error = e
+            self.busy_seconds += time.perf_counter() - start
+
+
+def export_index(export_path: str, chroma_path: str,
+                 store_path: str = DEFAULT_STORE_PATH,
+                 backend: str = DEFAULT_BACKEND,
+                 numpy_path: str = DEFAULT_NUMPY_PATH,
+                 chroma_url: str | None = None) -> int:
+    """
+    Write the index at chroma_path/numpy_path (or on chroma_url) to an
+    index artifact at export_path, with skill bodies from the skill store
+    (a body missing from the store raises FileNotFoundError rather than
+    shipping a placeholder). The artifact replaces export_path atomically.
+    Returns the row count.
+    """
+    # numpy is only needed for exporting
+    from index_artifact import write_artifact
+
+    index_path = chroma_path if backend == "chroma" else numpy_path
+    collection = open_collection(backend, index_path, COLLECTION_NAME, None,
+                                 fresh=True, chroma_url=chroma_url)
+    store = SkillStore(store_path)
+
+    def read_content(metadata: dict) -> str:
+        digest = metadata.get("content_sha256")
+        # Indexes built before the skill store kept content inline
+        return store.read(digest) if digest else metadata.get("full_content", "")
+
+    start = time.perf_counter()
+    generation = (metadata_generation(collection.metadata or {})
+                  if backend == "chroma" and chroma_url else read_generation(index_path))
+    count = write_artifact(export_path, collection, read_content, generation)
+    size_mb = os.path.getsize(export_path) / (1024 * 1024)
+    print(f"Exported {count} skills to {os.path.abspath(export_path)} "
+          f"({size_mb:.1f} MB) in {time.perf_counter() - start:.2f}s")
+    return count
+
+
+def _apply_changed_paths(previous: dict, changed_paths: set[str],
+                         skills_dir: str) -> dict[str, tuple[str, dict]]:
+    """
+    {id: (filepath, stat stamp)} for the skills in the manifest plus
+    changed_paths, without walking skills_dir: manifest entries keep their
+    recorded stamp, changed paths are stat()ed, and gone ones are dropped.
+    """
+    parent = os.path.dirname(os.path.normpath(skills_dir))
+    # A manifest entry holds the stamp fields, so it matches itself
+    files = {sid: (os.path.join(parent, sid), entry) for sid, entry in previous.items()}
+    for filepath in changed_paths:
+        sid = skill_id(filepath, skills_dir)
+        try:
+            files[sid] = (filepath, file_stamp(os.stat(filepath)))
+        except FileNotFoundError:
+            files.pop(sid, None)
+    return files
 
-    # Show indexed skills
-    print("\nIndexed skills:")
-    for skill in skills:
-        print(f"  - {skill['name']}")
 
-    return len(skills)
+def _unchanged(entry: dict | None, stamp: dict) -> bool:
+    """True if a manifest entry matches a file's current stat stamp."""
+    return entry is not None and all(entry.get(key) == value for key, value in stamp.items())
 
 
 def main():
@@ -206,6 +666,15 @@ Examples:
     python index_skills.py
     python index_skills.py --skills-dir /path/to/skills
     python index_skills.py --chroma-path /custom/chroma/path
+    python index_skills.py --store-path /custom/skill/store
+    python index_skills.py --backend numpy --numpy-dtype float16
+    python index_skills.py --chroma-url http://localhost:8000
+    python index_skills.py --space cosine --hnsw-m 32 --hnsw-search-ef 200
+    python index_skills.py --embed-threads 4 --embed-batch-size 64
+    python index_skills.py --full
+    python index_skills.py --parse-workers 8 --write-batch-size 2000
+    python index_skills.py --export /srv/srecodex/skills.idx
+    python index_skills.py --watch --debounce 2
         """
     )
     parser.add_argument(
@@ -218,16 +687,155 @@ Examples:
         default=DEFAULT_CHROMA_PATH,
         help=f"Path to ChromaDB data directory (default: {DEFAULT_CHROMA_PATH})"
     )
+    parser.add_argument(
+        "--chroma-url",
+        help="Index into a Chroma server (e.g. http://localhost:8000) instead of --chroma-path"
+    )
+    parser.add_argument(
+        "--store-path",
+        default=DEFAULT_STORE_PATH,
+        help=f"Path to content-addressed skill store (default: {DEFAULT_STORE_PATH})"
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help=f"Vector backend to write (default: {DEFAULT_BACKEND})"
+    )
+    parser.add_argument(
+        "--numpy-path",
+        default=DEFAULT_NUMPY_PATH,
+        help=f"Path to NumPy index directory (default: {DEFAULT_NUMPY_PATH})"
+    )
+    parser.add_argument(
+        "--numpy-dtype",
+        choices=NUMPY_DTYPES,
+        default=DEFAULT_NUMPY_DTYPE,
+        help=f"Storage type for NumPy embeddings (default: {DEFAULT_NUMPY_DTYPE})"
+    )
+
+    parser.add_argument(
+        "--space",
+        choices=SPACES,
+        default=DEFAULT_SPACE,
+        help=f"Distance space; relevance is derived from it (default: {DEFAULT_SPACE})"
+    )
+    parser.add_argument(
+        "--hnsw-m",
+        type=int,
+        default=DEFAULT_HNSW_M,
+        help=f"HNSW links per node; more = better recall, more memory (default: {DEFAULT_HNSW_M})"
+    )
+    parser.add_argument(
+        "--hnsw-construction-ef",
+        type=int,
+        default=DEFAULT_HNSW_CONSTRUCTION_EF,
+        help=f"HNSW candidate list size while building (default: {DEFAULT_HNSW_CONSTRUCTION_EF})"
+    )
+    parser.add_argument(
+        "--hnsw-search-ef",
+        type=int,
+        default=DEFAULT_HNSW_SEARCH_EF,
+        help=f"HNSW candidate list size per query (default: {DEFAULT_HNSW_SEARCH_EF})"
+    )
+    EmbeddingConfig.add_arguments(parser)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-embed every skill instead of only new or changed ones"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=DEFAULT_PARSE_WORKERS,
+        help=f"Processes parsing changed skills, 0 = one per core (default: {DEFAULT_PARSE_WORKERS})"
+    )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=DEFAULT_WRITE_BATCH_SIZE,
+        help=f"Skills embedded and upserted per batch (default: {DEFAULT_WRITE_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--embedding-store",
+        default=DEFAULT_EMBEDDING_STORE_PATH,
+        help="SQLite cache of computed embeddings, shared with the server; '' disables "
+             f"(default: {DEFAULT_EMBEDDING_STORE_PATH})"
+    )
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="After indexing, write an index artifact for mcp_server.py --index-artifact"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-index SKILL.md files as they change (inotify, else polling)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"--watch: seconds without changes before re-indexing a burst (default: {DEFAULT_DEBOUNCE:g})"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"--watch: seconds between scans when inotify is unavailable (default: {DEFAULT_POLL_INTERVAL:g})"
+    )
 
     args = parser.parse_args()
 
-    count = index_skills(args.skills_dir, args.chroma_path)
+    options = dict(
+        backend=args.backend,
+        numpy_path=args.numpy_path,
+        numpy_dtype=args.numpy_dtype,
+        chroma_url=args.chroma_url,
+        hnsw=hnsw_metadata(args.space, args.hnsw_m, args.hnsw_construction_ef,
+                           args.hnsw_search_ef),
+        embedding_config=EmbeddingConfig.from_args(args),
+        write_batch_size=args.write_batch_size,
+        parse_workers=args.parse_workers,
+        embedding_store_path=args.embedding_store
+    )
+    count = index_skills(args.skills_dir, args.chroma_path, args.store_path,
+                         full=args.full, **options)
 
-    if count == 0:
+    if count == 0 and not args.watch:
         sys.exit(1)
 
+    def export():
+        export_index(args.export, args.chroma_path, args.store_path, backend=args.backend,
+                     numpy_path=args.numpy_path, chroma_url=args.chroma_url)
+
+    if args.export and count:
+        export()
+
     print("\nIndexing complete!")
 
+    if args.watch:
+        index_path = args.chroma_path if args.backend == "chroma" else args.numpy_path
+
+        def reindex(changed_paths: set[str] | None):
+            print(f"\nChanges detected at {time.strftime('%H:%M:%S')}; re-indexing")
+            generation = current_generation(index_path, args.backend, args.chroma_url)
+            try:
+                index_skills(args.skills_dir, args.chroma_path, args.store_path,
+                             changed_paths=changed_paths, **options)
+                if args.export and current_generation(
+                        index_path, args.backend, args.chroma_url) != generation:
+                    export()
+            except Exception as e:
+                # Keep watching: the next change (or a fix) triggers another run
+                print(f"ERROR: Re-indexing failed: {e}", file=sys.stderr)
+
+        try:
+            watch(args.skills_dir, reindex, args.debounce, args.poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
 
 if __name__ == "__main__":
     main()
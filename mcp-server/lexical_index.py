@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+In-Memory BM25 Lexical Index for SREcodex Skills
+
+Complements vector search with exact keyword matching over each skill's
+name, tags and intent. Used two ways by the MCP server:
+
+- Hybrid ranking: BM25 and vector rankings are merged with reciprocal
+  rank fusion, so an exact tag hit ("redis", "pytest") is not buried
+  under vaguer semantic matches.
+- Fallback: when ChromaDB or the embedding model is unavailable (or
+  misses its deadline), BM25 alone answers in well under a millisecond.
+
+Key Design:
+- Field boosts: name and tag terms count double relative to intent terms
+- Pure Python, no dependencies; thousands of skills index in milliseconds
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Callable
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "the", "this",
+    "to", "use", "when", "with", "you", "your",
+})
+NAME_BOOST = 2
+TAG_BOOST = 2
+RRF_K = 60
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase text and split into alphanumeric terms, dropping stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def skill_terms(metadata: dict) -> list[str]:
+    """
+    Build the weighted term list for one skill from its metadata.
+
+    Tags may be a list or the comma-joined string stored in ChromaDB.
+    """
+    tags = metadata.get("tags") or ""
+    if isinstance(tags, str):
+        tags = tags.split(",")
+
+    terms = tokenize(metadata.get("name") or "") * NAME_BOOST
+    terms += tokenize(" ".join(tags)) * TAG_BOOST
+    terms += tokenize(metadata.get("intent") or "")
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of skill terms."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: list[str] = []
+        self.doc_lengths: list[int] = []
+        self.avg_doc_length = 0.0
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.idf: dict[str, float] = {}
+
+    @classmethod
+    def from_metadata(cls, catalog: dict[str, dict]) -> "BM25Index":
+        """Build an index from {skill_id: metadata}."""
+        index = cls()
+        index.build({skill_id: skill_terms(m) for skill_id, m in catalog.items()})
+        return index
+
+    def build(self, documents: dict[str, list[str]]):
+        """Index {doc_id: terms}, replacing any previous contents."""
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.ids = []
+        self.doc_lengths = []
+
+        for doc_index, (doc_id, terms) in enumerate(documents.items()):
+            self.ids.append(doc_id)
+            self.doc_lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings[term].append((doc_index, tf))
+
+        n_docs = len(self.ids)
+        self.avg_doc_length = sum(self.doc_lengths) / n_docs if n_docs else 0.0
+        self.postings = dict(postings)
+        self.idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, n_results: int,
+               doc_filter: Callable[[str], bool] | None = None) -> list[tuple[str, float]]:
+        """
+        Return up to n_results (doc_id, score) pairs, best first. With
+        doc_filter, only ids for which it returns True are considered.
+        """
+        if not self.ids or n_results <= 0:
+            return []
+
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for doc_index, tf in docs:
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_index] / self.avg_doc_length
+                scores[doc_index] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        if doc_filter is not None:
+            scores = {i: s for i, s in scores.items() if doc_filter(self.ids[i])}
+        best = heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+        return [(self.ids[doc_index], score) for doc_index, score in best]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = RRF_K) -> list[tuple[str, float]]:
+    """
+    Merge several best-first rankings of ids with reciprocal rank fusion.
+
+    Each id scores sum(1 / (k + rank)) over the rankings it appears in.
+    Returns (id, score) pairs, best first.
+    """
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -2,39 +2,130 @@
 """
 MCP Server for SREcodex Skill Discovery
 
-Exposes search_skills() tool for semantic skill lookup via the MCP protocol.
-Uses ChromaDB as the vector store backend.
+Exposes search_skills() tool for semantic skill lookup, search_skills_batch()
+for many lookups in one round trip, get_skill() for on-demand content
+retrieval, and server_stats() for latency/cache metrics via the MCP protocol.
+Uses ChromaDB as the vector store backend by default, or an exact
+memory-mapped NumPy index (--backend numpy).
 
 Key Design:
-- Returns FULL skill content, not chunks
-- Graceful degradation if ChromaDB unavailable
+- Returns FULL skill content, not chunks (detail="full" or get_skill);
+  compact summaries by default to keep discovery turns small
+- Optional max_tokens budget for a response: inlined skills are cut down by
+  whole sections (Usage, Examples, Script-First Directive first) using the
+  section outline stored at index time; omitted sections are named for
+  get_skill, in a note that counts against the budget
+- Hybrid ranking: vector results fused with an in-memory BM25 index over
+  name, tags and intent (reciprocal rank fusion)
+- Graceful degradation if ChromaDB unavailable: BM25-only keyword search
+  over the skills directory
 - Configurable result count
+- Query embeddings are LRU-cached, so repeat lookups skip model inference,
+  and also kept in the on-disk embedding store shared with the indexer
+  (embedding_store.py), so they survive restarts; the oldest stored
+  queries are pruned past --embedding-store-max-queries
+- Local ONNX embedding model with tunable threads / sequence length /
+  int8 (embeddings.py); the index's recorded embedding settings are checked
+  at load, and a mismatched index is not queried
+- Optional filters (tags, risk_level, languages, always_load, exclude_paths)
+  are pushed down into the vector query and the keyword ranker
+- Formatted search_skills responses are cached per (query, n_results,
+  detail, index generation), so repeat discovery calls skip all search work
+- Blocking ChromaDB work runs on a bounded thread pool with a per-call deadline
+- Lazy startup: the MCP handshake is answered immediately while ChromaDB and
+  the embedding model load (and warm up) in the background
+- Hot reload: when index_skills.py bumps the index generation, the new index
+  is loaded in the background and swapped in atomically; in-flight requests
+  finish against the index they started with
+- Per-phase latency histograms (embed, ann, bm25, content, format, queue
+  wait) and per-tool counts/errors, optionally exported as a Prometheus
+  text file
+- Every indexed skill is also an MCP resource, skill://<path>, with its
+  content hash as ETag (in _meta) so clients can cache bodies; a read of
+  skill://<path>?if-none-match=<etag> returns no contents if unchanged.
+  Sessions that listed or subscribed get list_changed / updated
+  notifications when a new index generation changes skills
+- --index-artifact serves a prebuilt file from index_skills.py --export
+  (index_artifact.py): it is memory-mapped, so startup does not grow with
+  the library and co-located servers share its pages; replacing the file
+  triggers a reload like a generation bump
 
 Usage:
     python mcp_server.py                     # Start with default settings
     python mcp_server.py --chroma-path PATH  # Custom ChromaDB path
+    python mcp_server.py --store-path PATH   # Custom skill store path
+    python mcp_server.py --skills-dir PATH   # Skills for keyword-only fallback
+    python mcp_server.py --backend numpy     # Serve the NumPy index
+    python mcp_server.py --chroma-url URL    # Use a shared Chroma server
+    python mcp_server.py --index-artifact skills.idx  # Serve an exported artifact
+    python mcp_server.py --metrics-file PATH # Export Prometheus metrics
+    python mcp_server.py --transport streamable-http --bind 127.0.0.1:8765
 
-The server communicates via stdio using the MCP protocol.
+By default the server communicates via stdio using the MCP protocol. With
+--transport sse or streamable-http, one long-lived process (e.g. the systemd
+unit) serves every agent session concurrently, sharing one embedding model,
+index and cache; stdio_shim.py bridges command-only clients to it.
 """
 
+import time
+
+# Captured before the remaining imports so startup timings include them
+_PROCESS_START = time.perf_counter()
+
 import argparse
 import asyncio
+import bisect
+import importlib.util
 import os
 import sys
-from typing import Any
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from urllib.parse import parse_qs, quote, unquote
 
-try:
-    import chromadb
-    from chromadb.utils import embedding_functions
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    CHROMADB_AVAILABLE = False
+from embedding_store import (
+    DEFAULT_EMBEDDING_STORE_PATH, DEFAULT_MAX_QUERY_ROWS, QUERY_SCOPE, EmbeddingStore, embed_cached,
+)
+from embeddings import ONNX_AVAILABLE, EmbeddingConfig, OnnxEmbedder
+from index_generation import (
+    generation_stamp, metadata_generation, metadata_stamp, path_stamp, read_generation,
+)
+from index_skills import (
+    DEFAULT_SKILLS_DIR, find_skill_files, parse_skill_file, skill_id, skill_metadata,
+)
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from metrics import ServerMetrics
+from skill_filters import build_where, matches_where, normalize_filters
+from skill_sections import (
+    count_tokens, extract_sections, load_outline, omitted_roots, render_sections, select_sections,
+)
+from skill_store import DEFAULT_STORE_PATH, SkillStore, content_hash
+from transport_config import (
+    DEFAULT_BIND, DEFAULT_TRANSPORT, SSE_MESSAGES_PATH, SSE_PATH, STREAMABLE_HTTP_PATH, TRANSPORTS,
+)
+from vector_backends import (
+    BACKENDS, DEFAULT_BACKEND, DEFAULT_CHROMA_TIMEOUT, DEFAULT_NUMPY_PATH, DEFAULT_SPACE,
+    collection_space, distance_to_relevance, open_collection, parse_chroma_url,
+)
+
+# chromadb is imported lazily by the background loader (it takes seconds to
+# import); only check that it is installed here.
+CHROMADB_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+if not CHROMADB_AVAILABLE:
     print("WARNING: chromadb not installed. Install with: pip install chromadb", file=sys.stderr)
 
 try:
     from mcp.server import Server
-    from mcp.types import Tool, TextContent
+    from mcp.shared.exceptions import McpError
+    from mcp.types import (
+        INTERNAL_ERROR, INVALID_PARAMS, ErrorData, InitializedNotification,
+        ListResourcesRequest, ListResourcesResult, ReadResourceRequest, ReadResourceResult,
+        Resource, ServerResult, TextContent, TextResourceContents, Tool,
+    )
     from mcp.server.stdio import stdio_server
+    from pydantic import AnyUrl
     MCP_AVAILABLE = True
 except ImportError:
     MCP_AVAILABLE = False
@@ -46,39 +137,1115 @@ DEFAULT_CHROMA_PATH = "./chroma_data"
 COLLECTION_NAME = "srecodex_skills"
 DEFAULT_RESULTS = 3
 MAX_RESULTS = 5
+MAX_BATCH_QUERIES = 20
+CANDIDATE_MULTIPLIER = 3  # candidates per ranker = n_results * this, before fusion
+DEFAULT_EMBEDDING_CACHE_SIZE = 256
+DEFAULT_EMBEDDING_CACHE_TTL = 3600.0  # seconds; 0 disables expiry
+DEFAULT_RESULT_CACHE_BYTES = 8 * 1024 * 1024  # 0 disables
+DEFAULT_QUERY_WORKERS = 4
+DEFAULT_QUERY_TIMEOUT = 10.0  # seconds, including time spent waiting for a worker
+DEFAULT_RELOAD_INTERVAL = 2.0  # seconds between index generation checks; 0 disables
+DEFAULT_METRICS_INTERVAL = 15.0  # seconds between Prometheus file rewrites
+WARMUP_QUERY = "warm up skill search"
+DETAIL_LEVELS = ("summary", "full")
+DEFAULT_DETAIL = "summary"
+SKILL_URI_PREFIX = "skill://"
+SKILL_MIME_TYPE = "text/markdown"
+IF_NONE_MATCH_PARAM = "if-none-match"
+RESOURCE_PAGE_SIZE = 500  # resources per resources/list page
+RESOURCE_NOT_FOUND = -32002  # JSON-RPC error code the MCP spec uses for unknown resources
+
+# Optional filter arguments shared by search_skills and search_skills_batch
+FILTER_PROPERTIES = {
+    "tags": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only skills having ALL of these tags"
+    },
+    "risk_level": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only skills with one of these risk levels: low, medium, high, or unknown (undeclared)"
+    },
+    "languages": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only skills supporting ANY of these languages (skills declaring 'all' always match)"
+    },
+    "always_load": {
+        "type": "boolean",
+        "description": "Only skills whose always_load flag matches"
+    },
+    "exclude_paths": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Skill paths to leave out (e.g., skills already loaded)"
+    },
+}
+
+MAX_TOKENS_PROPERTY = {
+    "type": "integer",
+    "minimum": 1,
+    "description": (
+        "Token budget for the whole response (detail='full'). Skills are cut "
+        "down by whole sections, keeping Usage, Examples and Script-First "
+        "Directive first; omitted sections are named for get_skill"
+    )
+}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query used as a cache key: leading, trailing and
+    repeated whitespace removed. Case is kept, since a cased model (any
+    --model-path) embeds "PR" and "pr" differently.
+    """
+    return " ".join(query.split())
+
+
+def parse_filters(arguments: dict) -> tuple[dict, frozenset[str]]:
+    """
+    Read the optional filter arguments of a search tool call.
+
+    Returns (filters, exclude_paths): canonical metadata filters (see
+    skill_filters.normalize_filters) and the set of paths to leave out.
+    Raises ValueError on malformed values.
+    """
+    for name in ("tags", "risk_level", "languages", "exclude_paths"):
+        value = arguments.get(name)
+        if value is not None and not isinstance(value, (list, str)):
+            raise ValueError(f"'{name}' must be a list of strings")
+    filters = normalize_filters(
+        tags=arguments.get("tags"),
+        risk_level=arguments.get("risk_level"),
+        languages=arguments.get("languages"),
+        always_load=arguments.get("always_load"),
+    )
+    exclude = arguments.get("exclude_paths") or []
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    return filters, frozenset(exclude)
+
+
+def describe_filters(filters: dict, exclude: frozenset[str]) -> str:
+    """One-line summary of active filters for response text ('' if none)."""
+    parts = [f"{name}={','.join(value) if isinstance(value, list) else value}"
+             for name, value in filters.items()]
+    if exclude:
+        parts.append(f"excluding {len(exclude)} path(s)")
+    return "; ".join(parts)
+
+
+def path_filter(catalog: dict[str, dict], where: dict | None,
+                exclude: frozenset[str]) -> Callable[[str], bool] | None:
+    """
+    Predicate for BM25 candidates: not excluded and matching where (looked
+    up in catalog). None when there is nothing to filter.
+    """
+    if where and exclude:
+        return lambda path: path not in exclude and matches_where(catalog.get(path, {}), where)
+    if where:
+        return lambda path: matches_where(catalog.get(path, {}), where)
+    if exclude:
+        return lambda path: path not in exclude
+    return None
+
+
+def parse_bind(bind: str) -> tuple[str, int]:
+    """Split 'HOST:PORT' (or '[v6addr]:PORT') into (host, port)."""
+    host, sep, port = bind.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"expected HOST:PORT, got '{bind}'")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+def parse_n_results(arguments: dict) -> int:
+    """Return the n_results argument, capped at MAX_RESULTS; raises ValueError if invalid."""
+    n_results = arguments.get("n_results", DEFAULT_RESULTS)
+    if isinstance(n_results, bool) or not isinstance(n_results, int) or n_results < 1:
+        raise ValueError("'n_results' must be a positive integer")
+    return min(n_results, MAX_RESULTS)
+
+
+def parse_max_tokens(arguments: dict) -> int | None:
+    """Return the optional max_tokens argument; raises ValueError if invalid."""
+    max_tokens = arguments.get("max_tokens")
+    if max_tokens is None:
+        return None
+    if isinstance(max_tokens, bool) or not isinstance(max_tokens, int) or max_tokens < 1:
+        raise ValueError("'max_tokens' must be a positive integer")
+    return max_tokens
+
+
+def format_omitted(path: str, count: int, names: list[str] | None = None) -> str:
+    """
+    One-line note for sections a token budget left out: the names to pass
+    to get_skill, or (names=None) just how many there are.
+    """
+    if names is None:
+        return f"_{count} sections omitted to fit max_tokens; fetch with get_skill(path=\"{path}\")_"
+    listed = ", ".join(f'"{name}"' for name in names)
+    return f"_Omitted to fit max_tokens; fetch with get_skill(path=\"{path}\", sections=[{listed}])_"
+
+
+def omitted_names(outline: list[dict], omitted: list[dict]) -> list[str]:
+    """get_skill section names for what was omitted: titles, or ids where a title repeats."""
+    titles = [section["title"].lower() for section in outline]
+    return [section["title"] if titles.count(section["title"].lower()) == 1 else section["id"]
+            for section in omitted_roots(outline, omitted)]
+
+
+def omitted_note_tokens(path: str, outline: list[dict]) -> int:
+    """Tokens to reserve for a skill's count-only omitted-sections note."""
+    return count_tokens("\n\n" + format_omitted(path, len(outline)))
+
+
+def inline_count(frame_tokens: list[int], max_tokens: int) -> int:
+    """How many leading skills' frames (header plus minimum note) fit in max_tokens; at least one."""
+    used = 0
+    for n, tokens in enumerate(frame_tokens):
+        used += tokens
+        if used > max_tokens:
+            return max(1, n)
+    return len(frame_tokens)
+
+
+def budget_contents(paths: list[str], skills: dict[str, dict], contents: dict[str, str],
+                    max_tokens: int) -> dict[str, str]:
+    """
+    Fit the bodies of paths (in rank order) into max_tokens in total,
+    counting the notes on omitted sections.
+
+    A count-only note is reserved for every skill first. Then every
+    skill's PRIORITY_SECTIONS are packed, and only then the remaining
+    sections; each pass gives each skill an equal share of what is left,
+    so budget a skill does not use rolls over to the next one. Finally, in
+    rank order, a note is upgraded to name its sections if the leftover
+    budget allows. Only when max_tokens cannot hold even the count-only
+    notes is it exceeded (by those notes).
+    """
+    outlines = {path: load_outline(skills[path], contents[path]) for path in paths}
+    reserved = {path: omitted_note_tokens(path, outlines[path]) for path in paths}
+    remaining = max_tokens - sum(reserved.values())
+    chosen: dict[str, set[int]] = {path: set() for path in paths}
+    for priority_only in (True, False):
+        for i, path in enumerate(paths):
+            share = max(0, remaining) // (len(paths) - i)
+            chosen[path], used = select_sections(outlines[path], share, chosen[path], priority_only)
+            remaining -= used
+
+    rendered = {path: render_sections(contents[path], outlines[path], chosen[path])
+                for path in paths}
+    # Reservations of skills that fit whole go back to the pool
+    remaining += sum(reserved[path] for path in paths if not rendered[path][1])
+    packed = {}
+    for path in paths:
+        text, omitted = rendered[path]
+        if omitted:
+            note = format_omitted(path, len(omitted))
+            named = format_omitted(path, len(omitted), omitted_names(outlines[path], omitted))
+            budget = remaining + reserved[path]
+            if count_tokens("\n\n" + named) <= budget:
+                note = named
+            remaining = budget - count_tokens("\n\n" + note)
+            text = f"{text}\n\n{note}" if text else note
+        packed[path] = text
+    return packed
+
+
+def format_dropped(count: int, what: str) -> str:
+    """Note for results a max_tokens budget had no room to inline at all."""
+    return f"_{count} {what} to fit max_tokens_\n"
+
+
+def format_full_skill(heading: str, path: str, metadata: dict, content: str) -> str:
+    """A skill's header block and inlined SKILL.md, as detail='full' responses show it."""
+    return f"""## {heading}
+
+**Path**: {path}
+**Tags**: {metadata.get('tags', 'none')}
+**Version**: {metadata.get('version', 'unknown')}
+
+### Full Skill Content:
+
+{content}
+
+---
+"""
+
+
+def format_relevance(relevance: float | None) -> str:
+    """Render a relevance score; None marks a keyword-only (BM25) match."""
+    if relevance is None:
+        return "keyword match"
+    return f"relevance: {relevance:.2f}"
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache mapping normalized query text to its embedding vector.
+
+    Thread-safe: lookups happen on the query worker threads.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_EMBEDDING_CACHE_SIZE,
+                 ttl: float = DEFAULT_EMBEDDING_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached embedding for key, or None on a miss or expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, embedding = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: Any):
+        """Store an embedding, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached embeddings (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class ResultCache:
+    """
+    LRU cache of formatted search responses, bounded by total UTF-8 size.
+
+    Keys include the index version, so entries from an older generation are
+    never returned; the server also clears the cache when it swaps indexes.
+    Only touched from the event loop, but locked so stats() is safe anywhere.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        """Return the cached text for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, text: str):
+        """Store text, evicting least recently used entries to fit max_bytes."""
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (text, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        """Drop all cached responses (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def skill_uri(path: str) -> str:
+    """Resource URI of the skill with the given id (its relative path)."""
+    return SKILL_URI_PREFIX + quote(path, safe="/")
+
+
+def parse_skill_uri(uri: str) -> tuple[str, str | None]:
+    """
+    Split skill://<path>[?if-none-match=<etag>] into (path, etag or None).
+    Raises ValueError for other URIs.
+    """
+    uri = str(uri)
+    if not uri.startswith(SKILL_URI_PREFIX):
+        raise ValueError(f"not a {SKILL_URI_PREFIX} URI: {uri}")
+    path, _, query = uri[len(SKILL_URI_PREFIX):].partition("?")
+    etag = parse_qs(query).get(IF_NONE_MATCH_PARAM, [None])[0]
+    return unquote(path), etag
+
+
+def skill_etag(metadata: dict) -> str:
+    """A skill's content version: its skill-store hash (SHA-256 of the body)."""
+    digest = metadata.get("content_sha256")
+    if digest:
+        return digest
+    # Keyword-only fallback and pre-store indexes keep the body inline
+    return content_hash(metadata.get("full_content", "").encode('utf-8'))
+
+
+class IndexSnapshot:
+    """
+    Everything a search reads from one index generation: the vector
+    collection, the skill catalog and the BM25 index built over it.
+
+    Snapshots are never mutated. A reload builds a new one and swaps the
+    server's reference, so a request that captured the old snapshot
+    finishes against a consistent view.
+    """
+
+    def __init__(self, collection=None, catalog: dict[str, dict] | None = None,
+                 lexical_index: BM25Index | None = None,
+                 generation: int = 0, stamp: tuple | None = None,
+                 artifact=None):
+        # A ChromaDB Collection, or a backend exposing the same query/get/count API
+        self.collection = collection
+        self.count = collection.count() if collection is not None else 0
+        # Distance space the collection was built with; sets relevance scoring
+        self.space = collection_space(collection) if collection is not None else DEFAULT_SPACE
+        # {skill_id: metadata} for every indexed skill, and a BM25 index over it
+        self.catalog = catalog or {}
+        self.lexical_index = lexical_index
+        # An IndexArtifact (see index_artifact.py) already holds the listing,
+        # ETags and skill bodies; nothing is built per snapshot
+        self.artifact = artifact
+        # Resource listing order (also the pagination cursor) and ETags
+        if artifact is not None:
+            self.paths, self.etags = artifact.paths, artifact.etags
+        else:
+            self.paths = sorted(self.catalog)
+            self.etags = {path: skill_etag(m) for path, m in self.catalog.items()}
+        self.generation = generation
+        # generation_stamp() (or the artifact's path_stamp()) when loaded
+        self.stamp = stamp
+
+    @property
+    def version(self) -> tuple:
+        """
+        Cache-key component identifying this generation. The stamp keeps it
+        unique even if a wipe-and-rebuild restarts the counter.
+        """
+        return (self.generation, self.stamp)
+
+
+def changed_skills(old: IndexSnapshot, new: IndexSnapshot) -> set[str] | None:
+    """
+    Paths whose skill was edited or removed between two snapshots, or None
+    if the skill list is unchanged. Blocking.
+    """
+    changed = {path for path, etag in old.etags.items() if new.etags.get(path) != etag}
+    if not changed and old.etags.keys() == new.etags.keys():
+        return None
+    return changed
 
 
 class SkillSearchServer:
     """MCP Server for semantic skill search."""
 
-    def __init__(self, chroma_path: str):
+    def __init__(self, chroma_path: str,
+                 store_path: str = DEFAULT_STORE_PATH,
+                 skills_dir: str = DEFAULT_SKILLS_DIR,
+                 backend: str = DEFAULT_BACKEND,
+                 numpy_path: str = DEFAULT_NUMPY_PATH,
+                 embedding_cache_size: int = DEFAULT_EMBEDDING_CACHE_SIZE,
+                 embedding_cache_ttl: float = DEFAULT_EMBEDDING_CACHE_TTL,
+                 query_workers: int = DEFAULT_QUERY_WORKERS,
+                 query_timeout: float = DEFAULT_QUERY_TIMEOUT,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 metrics_file: str | None = None,
+                 metrics_interval: float = DEFAULT_METRICS_INTERVAL,
+                 chroma_url: str | None = None,
+                 chroma_timeout: float = DEFAULT_CHROMA_TIMEOUT,
+                 result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+                 embedding_config: EmbeddingConfig | None = None,
+                 embedding_store_path: str | None = None,
+                 embedding_store_max_queries: int = DEFAULT_MAX_QUERY_ROWS,
+                 index_artifact: str | None = None):
         self.chroma_path = chroma_path
-        self.collection = None
+        self.chroma_url = chroma_url
+        self.chroma_timeout = chroma_timeout
+        self.query_workers = query_workers
+        self.store = SkillStore(store_path)
+        self.skills_dir = skills_dir
+        self.backend = backend
+        self.index_path = chroma_path if backend == "chroma" else numpy_path
+        # Prebuilt artifact served instead of the backend's index, if set
+        self.index_artifact = index_artifact
+        # Replaced wholesale on reload; read it once per request
+        self.index = IndexSnapshot()
+        self.embedding_config = embedding_config or EmbeddingConfig()
+        self.embedding_fn = None
+        self.embedding_cache = EmbeddingCache(embedding_cache_size, embedding_cache_ttl)
+        # Opened with the model (its id needs the weights); None if disabled
+        self.embedding_store_path = embedding_store_path
+        self.embedding_store_max_queries = embedding_store_max_queries
+        self.embedding_store = None
+        self.metrics = ServerMetrics()
+        self.result_cache = ResultCache(result_cache_bytes)
+        self.metrics.register_cache("embedding", self.embedding_cache.stats)
+        self.metrics.register_cache("result", self.result_cache.stats)
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self._metrics_task = None
+        self.query_timeout = query_timeout
+        # Embedding + HNSW lookups are synchronous; run them off the event loop.
+        # The semaphore is held until the worker thread finishes (not merely until
+        # the caller gives up), so at most query_workers queries are ever running
+        # or queued inside the executor.
+        self._executor = ThreadPoolExecutor(
+            max_workers=query_workers,
+            thread_name_prefix="skill-query"
+        )
+        self._query_slots = asyncio.Semaphore(query_workers)
+        # Set once the background loader has finished (successfully or not)
+        self._ready = asyncio.Event()
+        self._warm_up_task = None
+        self.reload_interval = reload_interval
+        self._last_reload_check = 0.0
+        # Stamp of the last generation loaded (or attempted), so a failed
+        # reload is not retried until the index changes again
+        self._seen_stamp = None
+        self._reload_task = None
+        self._watch_task = None
+        # Sessions that listed or subscribed to resources, for change
+        # notifications, and each session's subscribed skill paths
+        self._resource_sessions = weakref.WeakSet()
+        self._subscriptions = weakref.WeakKeyDictionary()
         self.server = None
-        self._init_chromadb()
         self._init_mcp_server()
 
     def _init_chromadb(self):
-        """Initialize ChromaDB connection."""
-        if not CHROMADB_AVAILABLE:
+        """
+        Open the vector backend (and, on first use, the embedding model).
+        Returns the collection, or None if unavailable or embedded with
+        different settings than self.embedding_config. Blocking; runs on a
+        worker thread.
+
+        Each call opens a local ChromaDB index on a System of its own, so
+        writes made by the indexer since the last open are visible and the
+        System is stopped once the snapshot holding it is released.
+        """
+        if self.backend == "chroma" and not CHROMADB_AVAILABLE:
             print("ChromaDB not available - search will return errors", file=sys.stderr)
-            return
+            return None
+        if not ONNX_AVAILABLE:
+            print("onnxruntime not available - vector search disabled", file=sys.stderr)
+            return None
 
         try:
-            client = chromadb.PersistentClient(path=self.chroma_path)
-            embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+            embedding_fn = self._load_embedder()
 
-            # Try to get existing collection
-            self.collection = client.get_collection(
-                name=COLLECTION_NAME,
-                embedding_function=embedding_fn
+            # Try to get existing collection (queries are embedded here, not by the backend)
+            collection = open_collection(
+                self.backend,
+                self.index_path,
+                COLLECTION_NAME,
+                None,
+                fresh=True,
+                chroma_url=self.chroma_url,
+                chroma_timeout=self.chroma_timeout,
+                # One in-flight request per query worker, plus the loader
+                chroma_pool_size=self.query_workers + 1
             )
-            print(f"Connected to ChromaDB collection: {COLLECTION_NAME}", file=sys.stderr)
-            print(f"Collection contains {self.collection.count()} documents", file=sys.stderr)
+            self.embedding_fn = embedding_fn
+            if not self._embedding_matches(collection.metadata or {}):
+                return None
+            print(f"Connected to {self.backend} collection: {COLLECTION_NAME}", file=sys.stderr)
+            print(f"Collection contains {collection.count()} documents "
+                  f"(space: {collection_space(collection)})", file=sys.stderr)
+            return collection
         except Exception as e:
-            print(f"WARNING: Could not connect to ChromaDB: {e}", file=sys.stderr)
+            location = self.chroma_url if self.backend == "chroma" and self.chroma_url else self.index_path
+            print(f"WARNING: Could not open {self.backend} index at {location}: {e}", file=sys.stderr)
             print("Run 'python index_skills.py' first to create the collection", file=sys.stderr)
-            self.collection = None
+            return None
+
+    def _load_embedder(self):
+        """
+        Return the embedding model, loading it (and opening the embedding
+        store) on first use. Raises if the model cannot be loaded. Blocking.
+        """
+        if self.embedding_fn is not None:
+            return self.embedding_fn
+        embedding_fn = OnnxEmbedder(self.embedding_config)
+        print(f"Loaded embedding model: {self.embedding_config.describe()}", file=sys.stderr)
+        # Queries are kept apart from the indexer's skill texts, and capped
+        self.embedding_store = EmbeddingStore.open(self.embedding_store_path,
+                                                   self.embedding_config.model_id() + QUERY_SCOPE,
+                                                   max_rows=self.embedding_store_max_queries)
+        if self.embedding_store is not None:
+            self.metrics.register_cache("embedding_store", self.embedding_store.stats)
+        return embedding_fn
+
+    def _embedding_matches(self, index_metadata: dict) -> bool:
+        """Check the index's recorded embedding settings; False (with an error) if they differ."""
+        mismatches = self.embedding_config.mismatches(index_metadata)
+        if mismatches:
+            print(
+                "ERROR: Index was embedded with different settings ("
+                + "; ".join(mismatches)
+                + "). Re-index, or start the server with the index's embedding "
+                "settings. Vector search disabled.",
+                file=sys.stderr
+            )
+            return False
+        return True
+
+    def _init_artifact(self):
+        """
+        Memory-map the index artifact and, on first use, the embedding model.
+        Returns (artifact, collection): collection is the artifact itself if
+        vector search is possible, else None (keyword search still uses the
+        artifact); both are None if the artifact cannot be opened. Blocking.
+        """
+        try:
+            # Imported here: it needs NumPy, which only artifact mode requires
+            from index_artifact import IndexArtifact
+            artifact = IndexArtifact(self.index_artifact)
+        except Exception as e:
+            print(f"WARNING: Could not open index artifact {self.index_artifact}: {e}",
+                  file=sys.stderr)
+            print("Run 'python index_skills.py --export PATH' to create it", file=sys.stderr)
+            return None, None
+        print(f"Mapped index artifact {self.index_artifact}: {artifact.count()} documents, "
+              f"generation {artifact.generation} (space: {artifact.space})", file=sys.stderr)
+
+        if not ONNX_AVAILABLE:
+            print("onnxruntime not available - vector search disabled", file=sys.stderr)
+            return artifact, None
+        try:
+            self.embedding_fn = self._load_embedder()
+        except Exception as e:
+            print(f"WARNING: Could not load embedding model: {e}", file=sys.stderr)
+            return artifact, None
+        if not self._embedding_matches(artifact.metadata):
+            return artifact, None
+        return artifact, artifact
+
+    def _parse_skills_dir(self) -> dict[str, dict]:
+        """
+        Build catalog entries straight from SKILL.md files (used when ChromaDB
+        is unavailable). Content is kept inline. Blocking.
+        """
+        catalog = {}
+        for filepath in find_skill_files(self.skills_dir):
+            skill = parse_skill_file(filepath)
+            if not skill:
+                continue
+            catalog[skill_id(filepath, self.skills_dir)] = {
+                **skill_metadata(skill),
+                "full_content": skill["full_content"],
+            }
+        return catalog
+
+    def _init_lexical_index(self, collection) -> tuple[dict[str, dict], BM25Index | None]:
+        """
+        Load the skill catalog (from the collection's metadata, else from the
+        skills directory) and build the BM25 index over it. Blocking.
+
+        Returns (catalog, lexical_index); the index is None on failure.
+        """
+        try:
+            if collection is not None:
+                result = collection.get(include=["metadatas"])
+                catalog = dict(zip(result["ids"], result["metadatas"]))
+                if self.backend == "chroma" and self.chroma_url:
+                    source = f"the Chroma server at {self.chroma_url}"
+                else:
+                    source = f"the {self.backend} index at {self.index_path}"
+            else:
+                catalog = self._parse_skills_dir()
+                source = self.skills_dir
+            lexical_index = BM25Index.from_metadata(catalog)
+            print(f"Built keyword index over {len(catalog)} skills from {source}", file=sys.stderr)
+            return catalog, lexical_index
+        except Exception as e:
+            print(f"WARNING: Could not build keyword index: {e}", file=sys.stderr)
+            return {}, None
+
+    def _load_index(self) -> IndexSnapshot:
+        """Build a complete snapshot of the current index generation. Blocking."""
+        # Stamp first: a re-index that lands mid-load is picked up next check
+        stamp = self._index_stamp()
+        if self.index_artifact:
+            artifact, collection = self._init_artifact()
+            if artifact is not None:
+                return IndexSnapshot(
+                    collection, artifact.catalog, artifact.lexical_index,
+                    generation=artifact.generation, stamp=stamp, artifact=artifact
+                )
+            # Unreadable artifact: fall back to keyword search over skills_dir
+            catalog, lexical_index = self._init_lexical_index(None)
+            return IndexSnapshot(None, catalog, lexical_index, stamp=stamp)
+        collection = self._init_chromadb()
+        catalog, lexical_index = self._init_lexical_index(collection)
+        if self._remote_generation:
+            generation = metadata_generation(collection.metadata or {}) if collection else 0
+        else:
+            generation = read_generation(self.index_path)
+        return IndexSnapshot(collection, catalog, lexical_index,
+                             generation=generation, stamp=stamp)
+
+    @property
+    def _remote_generation(self) -> bool:
+        """True if the generation lives in a Chroma server's collection metadata."""
+        return bool(self.backend == "chroma" and self.chroma_url and not self.index_artifact)
+
+    def _index_stamp(self) -> tuple | None:
+        """
+        Change-detection stamp of what this server serves: one stat(), or
+        with a Chroma server one metadata request (None if unreachable).
+        Blocking in the latter case.
+        """
+        if self.index_artifact:
+            return path_stamp(self.index_artifact)
+        if not self._remote_generation:
+            return generation_stamp(self.index_path)
+        try:
+            collection = open_collection(
+                self.backend, self.index_path, COLLECTION_NAME, None,
+                chroma_url=self.chroma_url, chroma_timeout=self.chroma_timeout,
+                chroma_pool_size=self.query_workers + 1
+            )
+        except Exception as e:
+            print(f"WARNING: Could not check index generation: {e}", file=sys.stderr)
+            return None
+        return metadata_stamp(collection.metadata or {})
+
+    def _embed_queries(self, queries: list[str]) -> list[Any]:
+        """
+        Return embeddings for queries, in order. LRU cache misses are looked
+        up in the embedding store, and the rest are embedded together in a
+        single model call.
+        """
+        keys = [normalize_query(q) for q in queries]
+        embeddings = [self.embedding_cache.get(key) for key in keys]
+
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            computed = embed_cached([queries[i] for i in missing], self.embedding_fn,
+                                    self.embedding_store)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+                self.embedding_cache.put(keys[i], embedding)
+        return embeddings
+
+    def _embed_query(self, query: str) -> Any:
+        """Return the embedding for query, running the model only on a cache miss."""
+        return self._embed_queries([query])[0]
+
+    def _warm_query(self):
+        """
+        Run one throwaway query so the ONNX session is compiled before the
+        first real search. Bypasses the embedding cache. Blocking.
+        """
+        collection = self.index.collection
+        if collection is None:
+            return
+        try:
+            collection.query(
+                query_embeddings=self.embedding_fn([WARMUP_QUERY]),
+                n_results=1,
+                include=[]
+            )
+        except Exception as e:
+            print(f"WARNING: Warm-up query failed: {e}", file=sys.stderr)
+
+    async def _warm_up(self):
+        """Load ChromaDB and the embedding model in the background, then warm up."""
+        loop = asyncio.get_running_loop()
+        try:
+            self.index = await loop.run_in_executor(self._executor, self._load_index)
+            self._seen_stamp = self.index.stamp
+            self._last_reload_check = time.monotonic()
+            # Sessions that listed while loading (and timed out) saw no skills
+            await self._notify_resource_changes(IndexSnapshot(), self.index)
+            await loop.run_in_executor(self._executor, self._warm_query)
+        finally:
+            self._ready.set()
+            elapsed = time.perf_counter() - _PROCESS_START
+            print(f"Time to ready: {elapsed * 1000:.0f} ms", file=sys.stderr)
+
+    def _maybe_reload(self):
+        """
+        Start a background reload if index_skills.py has bumped the index
+        generation (or replaced the index artifact). Costs one stat() at
+        most every reload_interval seconds; with a Chroma server, the
+        metadata request is made off the event loop.
+        """
+        if self.reload_interval <= 0 or not self._ready.is_set():
+            return  # (the initial load is still running)
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_interval:
+            return
+        self._last_reload_check = now
+
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        if self._remote_generation:
+            self._reload_task = asyncio.create_task(self._reload(check=True))
+            return
+        stamp = self._index_stamp()
+        # None: never indexed, or mid-rebuild after a wipe - keep serving
+        if stamp is None or stamp == self._seen_stamp:
+            return
+        self._reload_task = asyncio.create_task(self._reload())
+
+    async def _reload(self, check: bool = False):
+        """
+        Load the new index generation off the event loop and swap it in.
+        With check, first fetch the stamp (off the loop too) and stop if it
+        has not changed.
+        """
+        loop = asyncio.get_running_loop()
+        old = self.index
+        if check:
+            stamp = await loop.run_in_executor(self._executor, self._index_stamp)
+            if stamp is None or stamp == self._seen_stamp:
+                return
+        try:
+            snapshot = await loop.run_in_executor(self._executor, self._load_index)
+        except Exception as e:
+            print(f"WARNING: Index reload failed: {e}", file=sys.stderr)
+            return
+
+        self._seen_stamp = snapshot.stamp
+        if snapshot.collection is None and old.collection is not None:
+            print(
+                f"WARNING: Reload failed; still serving generation {old.generation}",
+                file=sys.stderr
+            )
+            return
+
+        # One reference assignment: requests already running keep `old`
+        self.index = snapshot
+        self.metrics.increment("index_reload")
+        # Responses are keyed by version already; clearing frees the memory.
+        # The index may also have been rebuilt with a different embedding model.
+        self.result_cache.clear()
+        self.embedding_cache.clear()
+        print(
+            f"Reloaded index: generation {old.generation} -> {snapshot.generation} "
+            f"({snapshot.count} documents)",
+            file=sys.stderr
+        )
+        await self._notify_resource_changes(old, snapshot)
+
+    async def _watch_generation(self):
+        """
+        Check for a new index generation every reload_interval while any
+        session follows resources, so change notifications go out without
+        waiting for the next tool call.
+        """
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if len(self._resource_sessions):
+                self._maybe_reload()
+
+    async def _notify_resource_changes(self, old: IndexSnapshot, new: IndexSnapshot):
+        """
+        Tell resource sessions that the skill list changed (skills added,
+        removed or edited), and subscribers which of their skills changed.
+        """
+        if not len(self._resource_sessions):
+            return
+        # Walks every ETag of both snapshots (decoded from an artifact): off the loop
+        loop = asyncio.get_running_loop()
+        changed = await loop.run_in_executor(self._executor, changed_skills, old, new)
+        if changed is None:
+            return
+        for session in list(self._resource_sessions):
+            try:
+                await session.send_resource_list_changed()
+                for path in sorted(self._subscriptions.get(session, set()) & changed):
+                    await session.send_resource_updated(AnyUrl(skill_uri(path)))
+            except Exception as e:
+                # Closed sessions linger until garbage-collected
+                print(f"WARNING: Dropping resource session: {e}", file=sys.stderr)
+                self._resource_sessions.discard(session)
+                self._subscriptions.pop(session, None)
+
+    async def _wait_ready(self) -> bool:
+        """Wait (up to query_timeout) for the background loader. False on timeout."""
+        if self._ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.query_timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    def _load_content(self, index: IndexSnapshot, path: str, metadata: dict) -> str:
+        """Read a skill body from the index artifact or the skill store. Blocking."""
+        if index.artifact is not None:
+            content = index.artifact.read(path)
+            return content if content is not None else "Content not available"
+        digest = metadata.get('content_sha256')
+        if digest:
+            try:
+                return self.store.read(digest)
+            except FileNotFoundError:
+                return "Content not available (missing from skill store; re-run index_skills.py)"
+        # Indexes built before the skill store kept content inline
+        return metadata.get('full_content', 'Content not available')
+
+    def _load_contents(self, index: IndexSnapshot, skills: dict[str, dict]) -> dict[str, str]:
+        """Read the bodies of {path: metadata} from the skill store. Blocking."""
+        with self.metrics.timer("content"):
+            return {path: self._load_content(index, path, m) for path, m in skills.items()}
+
+    def _candidate_count(self, index: IndexSnapshot, n_results: int,
+                         n_excluded: int = 0) -> int:
+        """
+        Number of candidates each ranker contributes before fusion, padded
+        so excluded paths cannot eat into the n_results actually returned.
+        """
+        n_candidates = n_results * CANDIDATE_MULTIPLIER + n_excluded
+        if index.count:
+            n_candidates = min(n_candidates, index.count)
+        return max(1, n_candidates)
+
+    def _fuse(self, index: IndexSnapshot, queries: list[str], n_results: int,
+              vector_rankings: list[list[str]], relevances: list[dict[str, float]],
+              skills: dict[str, dict], where: dict | None = None,
+              exclude: frozenset[str] = frozenset()) -> dict:
+        """
+        Merge per-query vector rankings (possibly empty) with BM25 rankings
+        via reciprocal rank fusion. The vector rankings are already filtered
+        by where; BM25 applies the same filter, and excluded paths are dropped.
+
+        Returns {"groups": [[(path, relevance_or_None), ...] per query],
+                 "skills": {path: metadata}} with each matched skill listed once.
+        """
+        n_candidates = self._candidate_count(index, n_results, len(exclude))
+        groups = []
+        used: dict[str, dict] = {}
+
+        doc_filter = path_filter(index.catalog, where, exclude)
+        for i, query in enumerate(queries):
+            rankings = [vector_rankings[i]] if vector_rankings else []
+            if index.lexical_index is not None:
+                with self.metrics.timer("bm25"):
+                    rankings.append([
+                        path for path, _ in index.lexical_index.search(query, n_candidates, doc_filter)
+                    ])
+
+            group = []
+            for path, _ in reciprocal_rank_fusion(rankings):
+                if len(group) >= n_results:
+                    break
+                if path in exclude:
+                    continue
+                metadata = skills.get(path) or index.catalog.get(path)
+                if metadata is None:
+                    continue
+                used[path] = metadata
+                group.append((path, relevances[i].get(path) if relevances else None))
+            groups.append(group)
+
+        return {"groups": groups, "skills": used}
+
+    def _search_blocking(self, index: IndexSnapshot, queries: list[str], n_results: int,
+                         with_content: bool = False, where: dict | None = None,
+                         exclude: frozenset[str] = frozenset()) -> dict:
+        """
+        Hybrid search: one embedding batch and one collection.query for all
+        queries, fused with BM25. Blocking; runs on a worker thread.
+
+        where is pushed down to the vector store, so filtered-out skills
+        never consume candidate slots.
+
+        With with_content, the matched skill bodies are read from the skill
+        store and returned under batch["contents"].
+        """
+        with self.metrics.timer("embed"):
+            embeddings = self._embed_queries(queries)
+        query_args = {"where": where} if where else {}
+        with self.metrics.timer("ann"):
+            results = index.collection.query(
+                query_embeddings=embeddings,
+                n_results=self._candidate_count(index, n_results, len(exclude)),
+                include=["metadatas", "distances"],
+                **query_args
+            )
+
+        skills: dict[str, dict] = {}
+        relevances = []
+        for ids, metadatas, distances in zip(
+            results["ids"], results["metadatas"], results["distances"]
+        ):
+            relevances.append({
+                path: distance_to_relevance(distance, index.space)
+                for path, distance in zip(ids, distances)
+            })
+            skills.update(zip(ids, metadatas))
+
+        batch = self._fuse(index, queries, n_results, results["ids"], relevances, skills,
+                           where, exclude)
+        if with_content:
+            batch["contents"] = self._load_contents(index, batch["skills"])
+        return batch
+
+    async def _search(self, queries: list[str], n_results: int,
+                      with_content: bool = False,
+                      index: IndexSnapshot | None = None,
+                      filters: dict | None = None,
+                      exclude: frozenset[str] = frozenset()) -> tuple[dict, str | None]:
+        """
+        Run a hybrid search, degrading to keyword-only BM25 when the vector
+        store is unavailable or misses its deadline.
+
+        Searches index if given (so callers can key caches on the snapshot
+        they searched), else the current snapshot. filters (normalized, see
+        parse_filters) and exclude restrict which skills can match.
+
+        Returns (batch, note); note explains a degraded result, else None.
+        Raises TimeoutError if the vector search times out and there is no
+        keyword index to fall back on.
+        """
+        if index is None:
+            index = self.index
+        where = build_where(filters or {})
+        note = None
+        if index.collection is not None:
+            try:
+                batch = await self._run_blocking(
+                    self._search_blocking, index, queries, n_results, with_content,
+                    where, exclude
+                )
+                return batch, None
+            except TimeoutError:
+                if index.lexical_index is None:
+                    raise
+                note = f"Vector search timed out after {self.query_timeout:g}s; showing keyword matches only."
+        else:
+            note = "ChromaDB unavailable; showing keyword matches only."
+
+        self.metrics.increment("lexical_fallback")
+        # BM25 alone is sub-millisecond, so it runs inline on the event loop
+        batch = self._fuse(index, queries, n_results, [], [], {}, where, exclude)
+        if with_content:
+            batch["contents"] = await asyncio.to_thread(self._load_contents, index, batch["skills"])
+        return batch, note
+
+    async def _run_blocking(self, fn, *args) -> Any:
+        """
+        Run a blocking call on the query pool, bounded by query_timeout.
+
+        The deadline covers both waiting for a free worker and the call itself,
+        so a backed-up queue turns into fast timeouts instead of unbounded latency.
+        Raises TimeoutError when the deadline passes.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.query_timeout
+
+        with self.metrics.timer("queue_wait"):
+            # Not wait_for(): its inner task can win the slot just as the wait
+            # times out or is cancelled, and the slot is lost. A cancelled
+            # acquire() gives back a slot it already won.
+            async with asyncio.timeout(self.query_timeout):
+                await self._query_slots.acquire()
+        try:
+            future = loop.run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self._query_slots.release()
+            raise
+
+        def _release(done: asyncio.Future):
+            self._query_slots.release()
+            if not done.cancelled():
+                done.exception()  # mark retrieved if the caller already timed out
+
+        future.add_done_callback(_release)
+        remaining = max(0.0, deadline - loop.time())
+        return await asyncio.wait_for(asyncio.shield(future), timeout=remaining)
+
+    def _get_skill_content(self, index: IndexSnapshot, path: str) -> str | None:
+        """Fetch one skill's content by id (its path). Blocking."""
+        metadata = index.catalog.get(path)
+        if metadata is None and index.collection is not None:
+            result = index.collection.get(ids=[path], include=["metadatas"])
+            if result["ids"]:
+                metadata = result["metadatas"][0]
+        if metadata is None:
+            return None
+        with self.metrics.timer("content"):
+            return self._load_content(index, path, metadata)
+
+    async def _check_available(self) -> list[TextContent] | None:
+        """Wait for the loader; return an error response if the index is unusable."""
+        if not await self._wait_ready():
+            return [TextContent(
+                type="text",
+                text=(
+                    f"Error: skill index still loading after {self.query_timeout:g}s. "
+                    "Retry shortly."
+                )
+            )]
+
+        self._maybe_reload()
+        if self.index.collection is None and self.index.lexical_index is None:
+            return [TextContent(
+                type="text",
+                text=(
+                    "Error: ChromaDB collection not available. "
+                    "Run 'python index_skills.py' to index skills first. "
+                    "Fallback: Use grep to search skills manually:\n"
+                    "  grep -r -l 'keyword' ~/.codex/skills/*/SKILL.md"
+                )
+            )]
+
+        return None
 
     def _init_mcp_server(self):
         """Initialize MCP server and register handlers."""
@@ -87,6 +1254,15 @@ class SkillSearchServer:
 
         self.server = Server("srecodex-skills")
 
+        async def on_initialized(_notification: InitializedNotification):
+            # Shared HTTP servers see one handshake per agent session
+            if "session" not in self.metrics.counters:
+                elapsed = time.perf_counter() - _PROCESS_START
+                print(f"Time to handshake: {elapsed * 1000:.0f} ms", file=sys.stderr)
+            self.metrics.increment("session")
+
+        self.server.notification_handlers[InitializedNotification] = on_initialized
+
         @self.server.list_tools()
         async def list_tools() -> list[Tool]:
             """Expose available tools to Codex."""
@@ -95,7 +1271,10 @@ class SkillSearchServer:
                     name="search_skills",
                     description=(
                         "Search the SREcodex skills library using natural language. "
-                        "Returns full skill definitions for the most relevant matches. "
+                        "Returns a compact summary (name, path, tags, intent, relevance) "
+                        "of the most relevant matches; load one with get_skill(path). "
+                        "Optional filters (tags, risk_level, languages, always_load, "
+                        "exclude_paths) are applied before ranking. "
                         "Use this when you need a capability you don't currently have loaded."
                     ),
                     inputSchema={
@@ -111,30 +1290,235 @@ class SkillSearchServer:
                             },
                             "n_results": {
                                 "type": "integer",
+                                "minimum": 1,
                                 "description": f"Number of results to return (default: {DEFAULT_RESULTS}, max: {MAX_RESULTS})",
                                 "default": DEFAULT_RESULTS
-                            }
+                            },
+                            "detail": {
+                                "type": "string",
+                                "enum": list(DETAIL_LEVELS),
+                                "description": (
+                                    "'summary' returns name, path, tags, intent and relevance; "
+                                    "'full' also inlines each complete SKILL.md "
+                                    f"(default: {DEFAULT_DETAIL})"
+                                ),
+                                "default": DEFAULT_DETAIL
+                            },
+                            "max_tokens": MAX_TOKENS_PROPERTY,
+                            **FILTER_PROPERTIES
                         },
                         "required": ["query"]
                     }
+                ),
+                Tool(
+                    name="search_skills_batch",
+                    description=(
+                        "Search for several capabilities in one call (e.g., one query per "
+                        "sub-task of a plan). Results are grouped per query; skills matched "
+                        "by more than one query are described only once."
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "queries": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": f"Natural language queries (max: {MAX_BATCH_QUERIES})"
+                            },
+                            "n_results": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "description": f"Results per query (default: {DEFAULT_RESULTS}, max: {MAX_RESULTS})",
+                                "default": DEFAULT_RESULTS
+                            },
+                            "detail": {
+                                "type": "string",
+                                "enum": list(DETAIL_LEVELS),
+                                "description": f"Same as search_skills (default: {DEFAULT_DETAIL})",
+                                "default": DEFAULT_DETAIL
+                            },
+                            "max_tokens": {
+                                **MAX_TOKENS_PROPERTY,
+                                "description": "Same as search_skills; shared by all inlined skills"
+                            },
+                            **FILTER_PROPERTIES
+                        },
+                        "required": ["queries"]
+                    }
+                ),
+                Tool(
+                    name="get_skill",
+                    description=(
+                        "Fetch a skill's SKILL.md by the path returned from search_skills. "
+                        "Optionally restrict to named sections (e.g., ['Usage', 'Examples']) "
+                        "or section ids, or cap the size with max_tokens."
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "path": {
+                                "type": "string",
+                                "description": "Skill path as shown in search results (e.g., 'skills/uv-python/SKILL.md')"
+                            },
+                            "sections": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Section titles or ids to return (default: whole file)"
+                            },
+                            "max_tokens": {
+                                **MAX_TOKENS_PROPERTY,
+                                "description": (
+                                    "Token budget for the whole file, filled by section "
+                                    "priority (ignored with sections)"
+                                )
+                            }
+                        },
+                        "required": ["path"]
+                    }
+                ),
+                Tool(
+                    name="server_stats",
+                    description=(
+                        "Report skill server health: per-tool request counts, errors and "
+                        "latency percentiles, per-phase latencies and cache hit rates."
+                    ),
+                    inputSchema={"type": "object", "properties": {}}
                 )
             ]
 
+        handlers = {
+            "search_skills": self._search_skills,
+            "search_skills_batch": self._search_skills_batch,
+            "get_skill": self._get_skill,
+            "server_stats": self._server_stats,
+        }
+
         @self.server.call_tool()
         async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             """Handle tool calls from Codex."""
-            if name != "search_skills":
+            handler = handlers.get(name)
+            if handler is None:
                 return [TextContent(
                     type="text",
                     text=f"Unknown tool: {name}"
                 )]
 
-            return await self._search_skills(arguments)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await handler(arguments)
+                # Tools report failures as text starting with "Error"
+                error = bool(result) and result[0].text.startswith("Error")
+                return result
+            finally:
+                self.metrics.record_request(name, time.perf_counter() - start, error)
+
+        async def resource_request(name: str, handler, request) -> ServerResult:
+            """Run a resources/* handler, with metrics; the session then follows changes."""
+            start = time.perf_counter()
+            error = True
+            try:
+                result = ServerResult(await handler(request))
+                error = False
+                self._resource_sessions.add(self.server.request_context.session)
+                return result
+            finally:
+                self.metrics.record_request(name, time.perf_counter() - start, error)
+
+        # Registered directly rather than via the decorators, which cannot
+        # return pagination cursors or _meta on read results
+        self.server.request_handlers[ListResourcesRequest] = (
+            lambda request: resource_request("resources/list", self._list_resources, request)
+        )
+        self.server.request_handlers[ReadResourceRequest] = (
+            lambda request: resource_request("resources/read", self._read_resource, request)
+        )
+
+        @self.server.subscribe_resource()
+        async def subscribe_resource(uri: AnyUrl):
+            path = self._resource_path(uri)
+            session = self.server.request_context.session
+            self._resource_sessions.add(session)
+            self._subscriptions.setdefault(session, set()).add(path)
+
+        @self.server.unsubscribe_resource()
+        async def unsubscribe_resource(uri: AnyUrl):
+            path = self._resource_path(uri)
+            self._subscriptions.get(self.server.request_context.session, set()).discard(path)
+
+    @staticmethod
+    def _resource_path(uri) -> str:
+        """Skill path of a skill:// URI; McpError for other URIs."""
+        try:
+            return parse_skill_uri(uri)[0]
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+
+    async def _list_resources(self, request: ListResourcesRequest) -> ListResourcesResult:
+        """
+        One page of skill:// resources in path order. The cursor is the last
+        path of the previous page, so paging survives a reload.
+        """
+        await self._wait_ready()
+        self._maybe_reload()
+        index = self.index
+        cursor = request.params.cursor if request.params else None
+        start = bisect.bisect_right(index.paths, cursor) if cursor else 0
+        page = index.paths[start:start + RESOURCE_PAGE_SIZE]
+        resources = [
+            Resource(
+                uri=skill_uri(path),
+                name=index.catalog[path].get("name") or path,
+                description=index.catalog[path].get("intent") or None,
+                mimeType=SKILL_MIME_TYPE,
+                _meta={"etag": index.etags[path], "version": index.catalog[path].get("version", "")},
+            )
+            for path in page
+        ]
+        more = start + len(page) < len(index.paths)
+        return ListResourcesResult(resources=resources, nextCursor=page[-1] if more else None)
+
+    async def _read_resource(self, request: ReadResourceRequest) -> ReadResourceResult:
+        """
+        A skill's full SKILL.md, with its ETag in _meta. With
+        ?if-none-match=<etag> and an unchanged skill, no contents are sent
+        and _meta has notModified: true.
+        """
+        try:
+            path, if_none_match = parse_skill_uri(request.params.uri)
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+        if not await self._wait_ready():
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message="Skill index still loading. Retry shortly."))
+        self._maybe_reload()
+        index = self.index
+
+        etag = index.etags.get(path)
+        if etag is not None and etag == if_none_match:
+            return ReadResourceResult(contents=[], _meta={"etag": etag, "notModified": True})
+
+        try:
+            content = await self._run_blocking(self._get_skill_content, index, path)
+        except TimeoutError:
+            raise McpError(ErrorData(code=INTERNAL_ERROR,
+                                     message=f"Read timed out after {self.query_timeout:g}s (server busy). Retry."))
+        if content is None:
+            raise McpError(ErrorData(code=RESOURCE_NOT_FOUND, message=f"Skill not found: '{path}'",
+                                     data={"uri": str(request.params.uri)}))
+
+        etag = etag or content_hash(content.encode('utf-8'))
+        if etag == if_none_match:
+            return ReadResourceResult(contents=[], _meta={"etag": etag, "notModified": True})
+        return ReadResourceResult(
+            contents=[TextResourceContents(uri=skill_uri(path), mimeType=SKILL_MIME_TYPE,
+                                           text=content, _meta={"etag": etag})],
+            _meta={"etag": etag},
+        )
 
     async def _search_skills(self, arguments: dict) -> list[TextContent]:
         """Execute skill search and format results."""
         query = arguments.get("query", "")
-        n_results = min(arguments.get("n_results", DEFAULT_RESULTS), MAX_RESULTS)
+        detail = arguments.get("detail", DEFAULT_DETAIL)
 
         if not query:
             return [TextContent(
@@ -142,60 +1526,125 @@ class SkillSearchServer:
                 text="Error: 'query' parameter is required"
             )]
 
-        if not self.collection:
+        if detail not in DETAIL_LEVELS:
             return [TextContent(
                 type="text",
-                text=(
-                    "Error: ChromaDB collection not available. "
-                    "Run 'python index_skills.py' to index skills first. "
-                    "Fallback: Use grep to search skills manually:\n"
-                    "  grep -r -l 'keyword' ~/.codex/skills/*/SKILL.md"
-                )
+                text=f"Error: 'detail' must be one of: {', '.join(DETAIL_LEVELS)}"
             )]
 
         try:
-            # Query ChromaDB
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                include=["metadatas", "distances"]
+            n_results = parse_n_results(arguments)
+            filters, exclude = parse_filters(arguments)
+            max_tokens = parse_max_tokens(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+
+        error = await self._check_available()
+        if error:
+            return error
+
+        # The header echoes the query as typed; the rest depends only on the key
+        header = f"# Search Results for: '{query}'\n"
+        index = self.index
+        cache_key = (
+            normalize_query(query), n_results, detail,
+            max_tokens if detail == "full" else None, index.version,
+            tuple((name, tuple(v) if isinstance(v, list) else v) for name, v in filters.items()),
+            tuple(sorted(exclude)),
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return [TextContent(type="text", text=header + "\n" + cached)]
+
+        try:
+            # Hybrid vector + keyword search, off the event loop
+            batch, note = await self._search(
+                [query], n_results, detail == "full", index, filters, exclude
             )
+            matches = batch["groups"][0]
+            active_filters = describe_filters(filters, exclude)
 
-            if not results["ids"][0]:
+            if not matches:
+                suffix = f" (filters: {active_filters})" if active_filters else ""
                 return [TextContent(
                     type="text",
-                    text=f"No skills found matching: '{query}'"
+                    text=f"No skills found matching: '{query}'{suffix}"
                 )]
 
             # Format response
-            output = [f"# Search Results for: '{query}'\n"]
+            format_start = time.perf_counter()
+            output = []
+            if active_filters:
+                output.append(f"Filters: {active_filters}\n")
+            if note:
+                output.append(f"_{note}_\n")
+
+            def heading(i: int, id: str, relevance: float | None) -> str:
+                name = batch["skills"][id].get('name', 'Unknown')
+                return f"Match {i+1}: {name} ({format_relevance(relevance)})"
+
+            contents = batch.get("contents", {})
+            if detail == "full" and max_tokens:
+                # max_tokens covers the whole response: lower-ranked matches whose
+                # frame and note don't fit are dropped, then the frame comes off
+                frames = [
+                    "\n" + format_full_skill(heading(i, id, relevance), id, batch["skills"][id], "")
+                    for i, (id, relevance) in enumerate(matches)
+                ]
+                base = count_tokens("\n".join([header, *output]))
+                kept = inline_count([
+                    count_tokens(frame) + omitted_note_tokens(
+                        id, load_outline(batch["skills"][id], contents[id]))
+                    for frame, (id, _) in zip(frames, matches)
+                ], max_tokens - base - count_tokens(format_dropped(len(matches), "lower-ranked matches dropped")))
+                if kept < len(matches):
+                    output.append(format_dropped(len(matches) - kept, "lower-ranked matches dropped"))
+                    matches, frames = matches[:kept], frames[:kept]
+                frame = "\n".join([header, *output, *frames])
+                contents = budget_contents(
+                    [id for id, _ in matches], batch["skills"], contents,
+                    max_tokens - count_tokens(frame)
+                )
 
-            for i, (id, metadata, distance) in enumerate(zip(
-                results["ids"][0],
-                results["metadatas"][0],
-                results["distances"][0]
-            )):
-                # Convert distance to similarity score (lower distance = higher similarity)
-                # ChromaDB uses L2 distance by default
-                relevance = max(0, 1 - (distance / 2))  # Normalize to 0-1 range
+            for i, (id, relevance) in enumerate(matches):
+                metadata = batch["skills"][id]
 
-                output.append(f"""
-## Match {i+1}: {metadata.get('name', 'Unknown')} (relevance: {relevance:.2f})
+                if detail == "summary":
+                    output.append(f"""
+## Match {i+1}: {metadata.get('name', 'Unknown')} ({format_relevance(relevance)})
 
 **Path**: {id}
 **Tags**: {metadata.get('tags', 'none')}
-**Version**: {metadata.get('version', 'unknown')}
+**Intent**: {metadata.get('intent') or 'not indexed'}
+""")
+                    continue
 
-### Full Skill Content:
+                output.append("\n" + format_full_skill(heading(i, id, relevance), id, metadata,
+                                                       contents[id]))
 
-{metadata.get('full_content', 'Content not available')}
+            if detail == "summary":
+                output.append(
+                    "\nLoad a skill with get_skill(path), optionally with "
+                    "sections=['Usage', 'Examples']."
+                )
 
----
-""")
+            body = "\n".join(output)
+            self.metrics.observe("format", time.perf_counter() - format_start)
+            # Degraded (keyword-only) answers are temporary; don't pin them
+            if not note:
+                self.result_cache.put(cache_key, body)
+            return [TextContent(
+                type="text",
+                text=header + "\n" + body
+            )]
 
+        except TimeoutError:
             return [TextContent(
                 type="text",
-                text="\n".join(output)
+                text=(
+                    f"Error: skill search timed out after {self.query_timeout:g}s "
+                    "(server busy). Retry, or narrow the query."
+                )
             )]
 
         except Exception as e:
@@ -204,8 +1653,305 @@ class SkillSearchServer:
                 text=f"Error searching skills: {e}"
             )]
 
-    async def run(self):
-        """Run the MCP server."""
+    async def _search_skills_batch(self, arguments: dict) -> list[TextContent]:
+        """Execute several skill searches in one round trip and format grouped results."""
+        queries = [q for q in arguments.get("queries") or [] if q]
+        detail = arguments.get("detail", DEFAULT_DETAIL)
+
+        if not queries:
+            return [TextContent(
+                type="text",
+                text="Error: 'queries' parameter is required"
+            )]
+
+        if len(queries) > MAX_BATCH_QUERIES:
+            return [TextContent(
+                type="text",
+                text=f"Error: at most {MAX_BATCH_QUERIES} queries per batch"
+            )]
+
+        if detail not in DETAIL_LEVELS:
+            return [TextContent(
+                type="text",
+                text=f"Error: 'detail' must be one of: {', '.join(DETAIL_LEVELS)}"
+            )]
+
+        try:
+            n_results = parse_n_results(arguments)
+            filters, exclude = parse_filters(arguments)
+            max_tokens = parse_max_tokens(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+
+        error = await self._check_available()
+        if error:
+            return error
+
+        try:
+            batch, note = await self._search(
+                queries, n_results, detail == "full", filters=filters, exclude=exclude
+            )
+        except TimeoutError:
+            return [TextContent(
+                type="text",
+                text=(
+                    f"Error: batch skill search timed out after {self.query_timeout:g}s "
+                    "(server busy). Retry with fewer queries."
+                )
+            )]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error searching skills: {e}"
+            )]
+
+        format_start = time.perf_counter()
+        skills = batch["skills"]
+        output = [f"# Batch Search Results ({len(queries)} queries, {len(skills)} unique skills)\n"]
+        active_filters = describe_filters(filters, exclude)
+        if active_filters:
+            output.append(f"Filters: {active_filters}\n")
+        if note:
+            output.append(f"_{note}_\n")
+
+        for i, (query, group) in enumerate(zip(queries, batch["groups"])):
+            output.append(f"## Query {i+1}: '{query}'\n")
+            if not group:
+                output.append("No skills found.\n")
+                continue
+            for rank, (path, relevance) in enumerate(group, start=1):
+                name = skills[path].get('name', 'Unknown')
+                output.append(f"{rank}. {name} - `{path}` ({format_relevance(relevance)})")
+            output.append("")
+
+        output.append("# Skills\n")
+        contents = batch.get("contents", {})
+        if detail == "full" and max_tokens:
+            # max_tokens covers the whole response: skills whose frame and note
+            # don't fit are left to the ranked lists above, then the frame comes off
+            frames = [format_full_skill(metadata.get('name', 'Unknown'), path, metadata, "")
+                      for path, metadata in skills.items()]
+            base = count_tokens("\n".join(output))
+            kept = inline_count([
+                count_tokens(frame) + omitted_note_tokens(
+                    path, load_outline(skills[path], contents[path]))
+                for frame, path in zip(frames, skills)
+            ], max_tokens - base - count_tokens(format_dropped(len(skills), "skills not inlined (paths listed above)")))
+            if kept < len(skills):
+                output.append(format_dropped(len(skills) - kept, "skills not inlined (paths listed above)"))
+                skills = dict(list(skills.items())[:kept])
+                frames = frames[:kept]
+            frame = "\n".join(output + frames)
+            contents = budget_contents(list(skills), skills, contents,
+                                       max_tokens - count_tokens(frame))
+
+        for path, metadata in skills.items():
+            if detail == "summary":
+                output.append(f"""## {metadata.get('name', 'Unknown')}
+
+**Path**: {path}
+**Tags**: {metadata.get('tags', 'none')}
+**Intent**: {metadata.get('intent') or 'not indexed'}
+""")
+                continue
+
+            output.append(format_full_skill(metadata.get('name', 'Unknown'), path, metadata,
+                                            contents[path]))
+
+        if detail == "summary":
+            output.append(
+                "Load a skill with get_skill(path), optionally with "
+                "sections=['Usage', 'Examples']."
+            )
+
+        text = "\n".join(output)
+        self.metrics.observe("format", time.perf_counter() - format_start)
+        return [TextContent(
+            type="text",
+            text=text
+        )]
+
+    async def _get_skill(self, arguments: dict) -> list[TextContent]:
+        """Return a skill's full content, or only the requested sections."""
+        path = arguments.get("path", "")
+        sections = arguments.get("sections") or []
+
+        if not path:
+            return [TextContent(
+                type="text",
+                text="Error: 'path' parameter is required"
+            )]
+
+        try:
+            max_tokens = parse_max_tokens(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+
+        error = await self._check_available()
+        if error:
+            return error
+
+        index = self.index
+        try:
+            content = await self._run_blocking(self._get_skill_content, index, path)
+        except TimeoutError:
+            return [TextContent(
+                type="text",
+                text=f"Error: get_skill timed out after {self.query_timeout:g}s (server busy). Retry."
+            )]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error fetching skill: {e}"
+            )]
+
+        if content is None:
+            return [TextContent(
+                type="text",
+                text=f"Skill not found: '{path}'. Use search_skills to find valid paths."
+            )]
+
+        metadata = index.catalog.get(path, {})
+        if not sections:
+            if max_tokens:
+                content = budget_contents([path], {path: metadata}, {path: content}, max_tokens)[path]
+            return [TextContent(type="text", text=content)]
+
+        outline = load_outline(metadata, content)
+        text, missing = extract_sections(content, sections, outline)
+        if missing:
+            available = ", ".join(f"{s['title']} ({s['id']})" for s in outline)
+            text += (
+                f"\n\n---\nSections not found: {', '.join(missing)}\n"
+                f"Available sections: {available}"
+            )
+        return [TextContent(type="text", text=text)]
+
+    def _index_gauges(self) -> dict[str, float]:
+        """Index state exported alongside the metrics."""
+        return {
+            "index_generation": self.index.generation,
+            "index_documents": self.index.count,
+        }
+
+    async def _server_stats(self, arguments: dict) -> list[TextContent]:
+        """Render the metrics snapshot as markdown tables."""
+        snapshot = self.metrics.snapshot()
+        index = self.index
+        source = "artifact" if index.artifact is not None else self.backend
+        output = [
+            "# Skill Server Stats\n",
+            f"**Uptime**: {snapshot['uptime_s']:.0f}s",
+            f"**Index**: {source}, generation {index.generation}, {index.count} documents",
+            f"**Ready**: {'yes' if self._ready.is_set() else 'loading'}\n",
+            "## Tools\n",
+            "| tool | requests | errors | p50 ms | p90 ms | p99 ms | max ms |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        for tool, s in sorted(snapshot["tools"].items()):
+            output.append(
+                f"| {tool} | {s['count']} | {s['errors']} | {s['p50'] * 1000:.2f} | "
+                f"{s['p90'] * 1000:.2f} | {s['p99'] * 1000:.2f} | {s['max'] * 1000:.2f} |"
+            )
+
+        output += [
+            "\n## Phases\n",
+            "| phase | count | p50 ms | p90 ms | p99 ms | max ms |",
+            "|---|---:|---:|---:|---:|---:|",
+        ]
+        for phase, s in sorted(snapshot["phases"].items()):
+            output.append(
+                f"| {phase} | {s['count']} | {s['p50'] * 1000:.3f} | "
+                f"{s['p90'] * 1000:.3f} | {s['p99'] * 1000:.3f} | {s['max'] * 1000:.3f} |"
+            )
+
+        output += [
+            "\n## Caches\n",
+            "| cache | size | hits | misses | hit rate |",
+            "|---|---:|---:|---:|---:|",
+        ]
+        for cache, s in sorted(snapshot["caches"].items()):
+            output.append(
+                f"| {cache} | {s.get('size', 0)} | {s['hits']} | {s['misses']} | {s['hit_rate']:.1%} |"
+            )
+
+        if snapshot["counters"]:
+            output.append("\n## Events\n")
+            for counter, value in sorted(snapshot["counters"].items()):
+                output.append(f"- {counter}: {value}")
+
+        return [TextContent(type="text", text="\n".join(output))]
+
+    async def _write_metrics_periodically(self):
+        """Rewrite the Prometheus text file every metrics_interval seconds."""
+        while True:
+            try:
+                await asyncio.to_thread(
+                    self.metrics.write_prometheus, self.metrics_file, self._index_gauges()
+                )
+            except OSError as e:
+                print(f"WARNING: Could not write metrics file {self.metrics_file}: {e}", file=sys.stderr)
+            await asyncio.sleep(self.metrics_interval)
+
+    async def _serve_http(self, transport: str, bind: str, init_options):
+        """
+        Serve MCP over HTTP until interrupted: SSE (GET /sse + POST /messages/)
+        or streamable HTTP (/mcp). Every session shares this process's index,
+        embedding model, caches and query pool.
+        """
+        import uvicorn
+        from starlette.applications import Starlette
+        from starlette.responses import Response
+        from starlette.routing import Mount, Route
+
+        host, port = parse_bind(bind)
+
+        if transport == "sse":
+            from mcp.server.sse import SseServerTransport
+
+            sse = SseServerTransport(SSE_MESSAGES_PATH)
+
+            async def handle_sse(request):
+                async with sse.connect_sse(
+                    request.scope, request.receive, request._send
+                ) as (read_stream, write_stream):
+                    await self.server.run(read_stream, write_stream, init_options)
+                return Response()
+
+            app = Starlette(routes=[
+                Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+                Mount(SSE_MESSAGES_PATH, app=sse.handle_post_message),
+            ])
+            endpoint = SSE_PATH
+        else:
+            from contextlib import asynccontextmanager
+
+            from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+            manager = StreamableHTTPSessionManager(app=self.server)
+
+            class StreamableHTTPEndpoint:
+                # A class instance, so Starlette routes raw ASGI calls to it
+                async def __call__(self, scope, receive, send):
+                    await manager.handle_request(scope, receive, send)
+
+            @asynccontextmanager
+            async def lifespan(_app):
+                async with manager.run():
+                    yield
+
+            app = Starlette(
+                routes=[Route(STREAMABLE_HTTP_PATH, endpoint=StreamableHTTPEndpoint())],
+                lifespan=lifespan
+            )
+            endpoint = STREAMABLE_HTTP_PATH
+
+        print(f"Serving MCP ({transport}) on http://{bind}{endpoint}", file=sys.stderr)
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        await uvicorn.Server(config).serve()
+
+    async def run(self, transport: str = DEFAULT_TRANSPORT, bind: str = DEFAULT_BIND):
+        """Run the MCP server on stdio, or as a shared HTTP server."""
         if not MCP_AVAILABLE:
             print("ERROR: MCP library not available. Install with: pip install mcp", file=sys.stderr)
             sys.exit(1)
@@ -220,11 +1966,31 @@ class SkillSearchServer:
         init_options = InitializationOptions(
             server_name="srecodex-skills",
             server_version="0.1.0",
-            capabilities=ServerCapabilities(tools={})
+            capabilities=ServerCapabilities(tools={}, resources={"subscribe": True, "listChanged": True})
         )
 
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(read_stream, write_stream, init_options)
+        # Load ChromaDB + the embedding model while the handshake proceeds
+        self._warm_up_task = asyncio.create_task(self._warm_up())
+        if self.reload_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch_generation())
+        if self.metrics_file:
+            self._metrics_task = asyncio.create_task(self._write_metrics_periodically())
+
+        try:
+            if transport == "stdio":
+                async with stdio_server() as (read_stream, write_stream):
+                    await self.server.run(read_stream, write_stream, init_options)
+            else:
+                await self._serve_http(transport, bind, init_options)
+        finally:
+            self._warm_up_task.cancel()
+            if self._reload_task is not None:
+                self._reload_task.cancel()
+            if self._watch_task is not None:
+                self._watch_task.cancel()
+            if self._metrics_task is not None:
+                self._metrics_task.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 def main():
@@ -250,15 +2016,159 @@ Example config.toml:
         default=DEFAULT_CHROMA_PATH,
         help=f"Path to ChromaDB data directory (default: {DEFAULT_CHROMA_PATH})"
     )
+    parser.add_argument(
+        "--chroma-url",
+        help="Query a Chroma server (e.g. http://localhost:8000) instead of --chroma-path"
+    )
+    parser.add_argument(
+        "--chroma-timeout",
+        type=float,
+        default=DEFAULT_CHROMA_TIMEOUT,
+        help=f"Per-request timeout in seconds for --chroma-url (default: {DEFAULT_CHROMA_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--embedding-cache-size",
+        type=int,
+        default=DEFAULT_EMBEDDING_CACHE_SIZE,
+        help=f"Max cached query embeddings, 0 disables (default: {DEFAULT_EMBEDDING_CACHE_SIZE})"
+    )
+    parser.add_argument(
+        "--embedding-cache-ttl",
+        type=float,
+        default=DEFAULT_EMBEDDING_CACHE_TTL,
+        help=f"Seconds before a cached embedding expires, 0 = never (default: {DEFAULT_EMBEDDING_CACHE_TTL:g})"
+    )
+    parser.add_argument(
+        "--embedding-store",
+        default=DEFAULT_EMBEDDING_STORE_PATH,
+        help="SQLite cache of computed embeddings, shared with the indexer; '' disables "
+             f"(default: {DEFAULT_EMBEDDING_STORE_PATH})"
+    )
+    parser.add_argument(
+        "--embedding-store-max-queries",
+        type=int,
+        default=DEFAULT_MAX_QUERY_ROWS,
+        help=f"Query vectors kept in the embedding store; the oldest are pruned past this "
+             f"(default: {DEFAULT_MAX_QUERY_ROWS})"
+    )
+    parser.add_argument(
+        "--result-cache-bytes",
+        type=int,
+        default=DEFAULT_RESULT_CACHE_BYTES,
+        help=f"Max total size of cached search responses, 0 disables (default: {DEFAULT_RESULT_CACHE_BYTES})"
+    )
+    parser.add_argument(
+        "--query-workers",
+        type=int,
+        default=DEFAULT_QUERY_WORKERS,
+        help=f"Max concurrent ChromaDB queries (default: {DEFAULT_QUERY_WORKERS})"
+    )
+    parser.add_argument(
+        "--query-timeout",
+        type=float,
+        default=DEFAULT_QUERY_TIMEOUT,
+        help=f"Per-call search deadline in seconds, including queueing (default: {DEFAULT_QUERY_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=DEFAULT_RELOAD_INTERVAL,
+        help=f"Seconds between checks for a re-indexed collection, 0 disables (default: {DEFAULT_RELOAD_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=DEFAULT_TRANSPORT,
+        help=f"MCP transport; sse/streamable-http serve many sessions from one process (default: {DEFAULT_TRANSPORT})"
+    )
+    parser.add_argument(
+        "--bind",
+        default=DEFAULT_BIND,
+        help=f"HOST:PORT to listen on for sse/streamable-http (default: {DEFAULT_BIND})"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Periodically rewrite Prometheus text-format metrics to this file (default: disabled)"
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_METRICS_INTERVAL,
+        help=f"Seconds between metrics file rewrites (default: {DEFAULT_METRICS_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--store-path",
+        default=DEFAULT_STORE_PATH,
+        help=f"Path to content-addressed skill store (default: {DEFAULT_STORE_PATH})"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help=f"Vector backend to serve (default: {DEFAULT_BACKEND})"
+    )
+    parser.add_argument(
+        "--numpy-path",
+        default=DEFAULT_NUMPY_PATH,
+        help=f"Path to NumPy index directory (default: {DEFAULT_NUMPY_PATH})"
+    )
+    parser.add_argument(
+        "--index-artifact",
+        metavar="PATH",
+        help="Serve an artifact written by index_skills.py --export instead of --backend's index"
+    )
+    parser.add_argument(
+        "--skills-dir",
+        default=DEFAULT_SKILLS_DIR,
+        help=f"Skills directory for keyword search when ChromaDB is unavailable (default: {DEFAULT_SKILLS_DIR})"
+    )
+    EmbeddingConfig.add_arguments(parser)
 
     args = parser.parse_args()
+    try:
+        parse_bind(args.bind)
+    except ValueError as e:
+        parser.error(f"--bind: {e}")
+    if args.chroma_url:
+        try:
+            parse_chroma_url(args.chroma_url)
+        except ValueError as e:
+            parser.error(f"--chroma-url: {e}")
 
-    # Resolve path relative to script location
+    # Resolve paths relative to script location
     script_dir = os.path.dirname(os.path.abspath(__file__))
     chroma_path = os.path.join(script_dir, args.chroma_path) if not os.path.isabs(args.chroma_path) else args.chroma_path
+    store_path = os.path.join(script_dir, args.store_path) if not os.path.isabs(args.store_path) else args.store_path
+    skills_dir = os.path.join(script_dir, args.skills_dir) if not os.path.isabs(args.skills_dir) else args.skills_dir
+    numpy_path = os.path.join(script_dir, args.numpy_path) if not os.path.isabs(args.numpy_path) else args.numpy_path
+    embedding_store_path = os.path.join(script_dir, args.embedding_store) if args.embedding_store else None
+    index_artifact = os.path.join(script_dir, args.index_artifact) if args.index_artifact else None
 
-    server = SkillSearchServer(chroma_path)
-    asyncio.run(server.run())
+    server = SkillSearchServer(
+        chroma_path,
+        store_path=store_path,
+        skills_dir=skills_dir,
+        backend=args.backend,
+        numpy_path=numpy_path,
+        embedding_cache_size=args.embedding_cache_size,
+        embedding_cache_ttl=args.embedding_cache_ttl,
+        query_workers=args.query_workers,
+        query_timeout=args.query_timeout,
+        reload_interval=args.reload_interval,
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        chroma_url=args.chroma_url,
+        chroma_timeout=args.chroma_timeout,
+        result_cache_bytes=args.result_cache_bytes,
+        embedding_config=EmbeddingConfig.from_args(args),
+        embedding_store_path=embedding_store_path,
+        embedding_store_max_queries=args.embedding_store_max_queries,
+        index_artifact=index_artifact,
+    )
+    try:
+        asyncio.run(server.run(args.transport, args.bind))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
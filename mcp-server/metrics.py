@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+In-Process Metrics for the SREcodex MCP Server
+
+Latency histograms per request phase and per tool, request/error counters
+and cache hit rates. Read them with the server_stats MCP tool, or have the
+server rewrite a Prometheus text-format file periodically
+(--metrics-file) for node_exporter's textfile collector.
+
+Key Design:
+- HDR-style histograms: logarithmic buckets with a fixed relative error
+  (~2%), so p50/p90/p99 stay accurate from microseconds to a minute in a
+  few hundred integer counters and recording is O(1)
+- No dependencies; safe to record from the query worker threads
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from atomic_files import atomic_write
+
+
+QUANTILES = (0.5, 0.9, 0.99)
+METRIC_PREFIX = "srecodex"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of durations in seconds.
+
+    Bucket i covers [min_value * growth**i, min_value * growth**(i + 1));
+    quantiles report the bucket's geometric midpoint, clamped to the
+    observed min/max. Not thread-safe on its own (ServerMetrics locks).
+    """
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 60.0,
+                 growth: float = 1.04):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        n_buckets = int(math.log(max_value / min_value) / self._log_growth) + 1
+        self.counts = [0] * n_buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        value = min(max(seconds, self.min_value), self.max_value)
+        bucket = int(math.log(value / self.min_value) / self._log_growth)
+        self.counts[min(bucket, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Return the q-quantile (0-1) in seconds, or 0.0 if empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                midpoint = self.min_value * self.growth ** (bucket + 0.5)
+                return min(max(midpoint, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Count, sum, mean, max and the QUANTILES, in seconds."""
+        summary = {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        return summary
+
+
+class ServerMetrics:
+    """Registry of phase/tool latencies, counters and cache stats."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.phases: dict[str, LatencyHistogram] = {}
+        self.tools: dict[str, LatencyHistogram] = {}
+        self.errors: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self._caches: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase: str, seconds: float):
+        """Record one duration for a request phase (embed, ann, bm25, ...)."""
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, phase: str):
+        """Time the enclosed block as one observation of phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def record_request(self, tool: str, seconds: float, error: bool = False):
+        """Record one tool call's end-to-end latency and outcome."""
+        with self._lock:
+            histogram = self.tools.get(tool)
+            if histogram is None:
+                histogram = self.tools[tool] = LatencyHistogram()
+            histogram.record(seconds)
+            if error:
+                self.errors[tool] = self.errors.get(tool, 0) + 1
+
+    def increment(self, counter: str, n: int = 1):
+        """Bump a named event counter (e.g. lexical_fallback)."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def register_cache(self, name: str, stats: Callable[[], dict[str, Any]]):
+        """Report a cache's stats() (must include hits, misses, hit_rate)."""
+        self._caches[name] = stats
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return all metrics as plain data."""
+        with self._lock:
+            snapshot = {
+                "uptime_s": time.time() - self.started_at,
+                "tools": {
+                    tool: dict(h.summary(), errors=self.errors.get(tool, 0))
+                    for tool, h in self.tools.items()
+                },
+                "phases": {phase: h.summary() for phase, h in self.phases.items()},
+                "counters": dict(self.counters),
+            }
+        snapshot["caches"] = {name: stats() for name, stats in self._caches.items()}
+        return snapshot
+
+    def to_prometheus(self, extra_gauges: dict[str, float] | None = None) -> str:
+        """Render the snapshot in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_uptime_seconds Seconds since the server started.",
+            f"# TYPE {p}_uptime_seconds gauge",
+            f"{p}_uptime_seconds {snapshot['uptime_s']:.3f}",
+        ]
+
+        for family, label, summaries, help_text in (
+            ("request", "tool", snapshot["tools"], "End-to-end MCP tool call latency."),
+            ("phase", "phase", snapshot["phases"], "Latency of one search phase."),
+        ):
+            name = f"{p}_{family}_latency_seconds"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for key, s in summaries.items():
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{label}="{key}",quantile="{q:g}"}} {s[f"p{q * 100:g}"]:.6f}')
+                lines.append(f'{name}_sum{{{label}="{key}"}} {s["sum"]:.6f}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {s["count"]}')
+
+        lines += [f"# HELP {p}_request_errors_total Tool calls that returned an error.",
+                  f"# TYPE {p}_request_errors_total counter"]
+        for tool, s in snapshot["tools"].items():
+            lines.append(f'{p}_request_errors_total{{tool="{tool}"}} {s["errors"]}')
+
+        lines += [f"# HELP {p}_events_total Server events (fallbacks, reloads, ...).",
+                  f"# TYPE {p}_events_total counter"]
+        for counter, value in snapshot["counters"].items():
+            lines.append(f'{p}_events_total{{event="{counter}"}} {value}')
+
+        for stat, kind in (("hits", "counter"), ("misses", "counter"), ("size", "gauge")):
+            name = f"{p}_cache_{stat}" + ("_total" if kind == "counter" else "")
+            lines += [f"# TYPE {name} {kind}"]
+            for cache, stats in snapshot["caches"].items():
+                lines.append(f'{name}{{cache="{cache}"}} {stats.get(stat, 0)}')
+
+        for gauge, value in (extra_gauges or {}).items():
+            lines += [f"# TYPE {p}_{gauge} gauge", f"{p}_{gauge} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, extra_gauges: dict[str, float] | None = None):
+        """Atomically rewrite path with to_prometheus() (textfile collector safe)."""
+        data = self.to_prometheus(extra_gauges).encode('utf-8')
+        atomic_write(path, lambda f: f.write(data))
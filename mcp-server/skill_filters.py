@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Filterable Skill Metadata for SREcodex
+
+Vector stores filter on scalar metadata, but tags and languages are lists.
+The indexer therefore flattens them into one boolean field per value:
+
+    tags: [python, pytest]      ->  {"tag:python": True, "tag:pytest": True}
+    languages: [python, bash]   ->  {"lang:python": True, "lang:bash": True}
+    languages: all              ->  {"lang:all": True}
+
+so search filters become plain equality tests that ChromaDB evaluates as a
+`where` clause and the NumPy backend turns into a cached row bitmask.
+Stored values and filter values are both lowercased, so `risk_level: Low`
+in a SKILL.md matches `risk_level=["low"]` (and `tags=["RAG"]` a `rag` tag).
+
+Filter semantics (all optional, combined with AND):
+- tags:        skill has every listed tag
+- risk_level:  skill's risk_level is one of the listed levels (RISK_LEVELS;
+               others are rejected, as they could never match)
+- languages:   skill supports any listed language (or declares "all")
+- always_load: skill's always_load flag equals the given boolean
+"""
+
+
+TAG_FIELD_PREFIX = "tag:"
+LANGUAGE_FIELD_PREFIX = "lang:"
+ALL_LANGUAGES = "all"
+UNKNOWN_RISK_LEVEL = "unknown"  # stored when a skill declares none
+RISK_LEVELS = ("low", "medium", "high", UNKNOWN_RISK_LEVEL)  # per docs/SKILL-SCHEMA.md
+
+
+def _as_list(value) -> list[str]:
+    """Accept a list, a comma-joined string, or None; return stripped lowercase values."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+
+def filter_fields(tags, languages, risk_level=None, always_load: bool = False) -> dict:
+    """Return the scalar metadata fields the indexer stores for filtering."""
+    risk_level = str(risk_level).strip().lower() if risk_level is not None else ""
+    fields = {
+        "risk_level": risk_level or UNKNOWN_RISK_LEVEL,
+        "always_load": bool(always_load),
+    }
+    for tag in _as_list(tags):
+        fields[f"{TAG_FIELD_PREFIX}{tag}"] = True
+    for language in _as_list(languages) or [ALL_LANGUAGES]:
+        fields[f"{LANGUAGE_FIELD_PREFIX}{language}"] = True
+    return fields
+
+
+def normalize_filters(tags=None, risk_level=None, languages=None,
+                      always_load=None) -> dict:
+    """
+    Canonicalize filter arguments (lists sorted and deduplicated, empty
+    filters dropped) so equal filters compare and hash equal.
+    Raises ValueError on an unknown risk level or a non-boolean always_load.
+    """
+    filters = {}
+    for name, value in (("tags", tags), ("risk_level", risk_level), ("languages", languages)):
+        values = sorted(set(_as_list(value)))
+        if values:
+            filters[name] = values
+    unknown = [level for level in filters.get("risk_level", []) if level not in RISK_LEVELS]
+    if unknown:
+        raise ValueError(f"unknown risk_level {', '.join(unknown)} "
+                         f"(expected any of: {', '.join(RISK_LEVELS)})")
+    if always_load is not None:
+        if not isinstance(always_load, bool):
+            raise ValueError("'always_load' must be true or false")
+        filters["always_load"] = always_load
+    return filters
+
+
+def build_where(filters: dict) -> dict | None:
+    """Translate normalized filters into a ChromaDB `where` clause (None if empty)."""
+    clauses = [{f"{TAG_FIELD_PREFIX}{tag}": True} for tag in filters.get("tags", [])]
+
+    if filters.get("risk_level"):
+        clauses.append({"risk_level": {"$in": filters["risk_level"]}})
+
+    if filters.get("languages"):
+        options = [{f"{LANGUAGE_FIELD_PREFIX}{language}": True}
+                   for language in [ALL_LANGUAGES] + filters["languages"]]
+        clauses.append({"$or": options})
+
+    if "always_load" in filters:
+        clauses.append({"always_load": filters["always_load"]})
+
+    if not clauses:
+        return None
+    # ChromaDB requires $and to have at least two operands
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_where(metadata: dict, where: dict | None) -> bool:
+    """
+    Evaluate the subset of ChromaDB's `where` syntax that build_where emits
+    ($and, $or, $eq, $ne, $in, $nin and bare equality) against one metadata dict.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq":
+                    ok = value == operand
+                elif op == "$ne":
+                    ok = value != operand
+                elif op == "$in":
+                    ok = value in operand
+                elif op == "$nin":
+                    ok = value not in operand
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not ok:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Skill Section Outlines and Token Budgets for SREcodex
+
+Splits a SKILL.md into the same section tree as the document-parser skill
+(dotcodex/skills/document-parser/scripts/parse_document_structure.py):
+one node per markdown header, owning the lines up to the next header, with
+ids built from the header line number and sibling position
+("section-12", "section-12.3"). Unlike that script, headers inside fenced
+code blocks (e.g. '# comment' lines in bash examples) and the YAML
+frontmatter are ignored, since nearly every skill has both.
+
+The indexer stores each skill's outline (ids, titles, line ranges and token
+counts) in its metadata, so the MCP server can pack the most useful
+sections into a caller's max_tokens budget without re-parsing, and list
+what it left out for a follow-up get_skill(path, sections=[...]).
+"""
+
+import json
+import math
+import re
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+HEADER_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+
+# Packed first, in this order (matched case-insensitively, with subsections)
+PRIORITY_SECTIONS = ("usage", "examples", "script-first directive")
+
+_ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken's cl100k_base encoding, like the
+    document-parser skill. Without tiktoken, estimate 4 characters per
+    token (the parser's 0.75 tokens/word undercounts code-heavy text,
+    which would overrun budgets).
+    """
+    global _ENCODING
+    if TIKTOKEN_AVAILABLE:
+        if _ENCODING is None:
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _body_start(lines: list[str]) -> int:
+    """Index of the first line after the YAML frontmatter (0 if none)."""
+    if lines and lines[0].strip() == '---':
+        for i in range(1, len(lines)):
+            if lines[i].strip() == '---':
+                return i + 1
+    return 0
+
+
+def list_sections(content: str) -> list[tuple[int, str, int]]:
+    """
+    Return (level, title, line_index) for every markdown header in content.
+
+    Headers inside fenced code blocks and inside the YAML frontmatter are
+    ignored.
+    """
+    lines = content.split('\n')
+    headers = []
+    in_fence = False
+    for i in range(_body_start(lines), len(lines)):
+        line = lines[i]
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADER_PATTERN.match(line)
+        if match:
+            headers.append((len(match.group(1)), match.group(2).strip(), i))
+    return headers
+
+
+def section_outline(content: str) -> list[dict]:
+    """
+    Return the flat section tree of content in document order.
+
+    Each entry is {"id", "title", "level", "start", "end", "tokens"}:
+    start/end are the line slice the section owns (its header line up to the
+    next header of any level), and tokens counts that slice only, so the
+    entries' tokens add up to the body size. Text between the frontmatter
+    and the first header is entry id "preamble" (level 0), if non-empty.
+    """
+    lines = content.split('\n')
+    headers = list_sections(content)
+    outline = []
+
+    body_start = _body_start(lines)
+    preamble_end = headers[0][2] if headers else len(lines)
+    preamble = '\n'.join(lines[body_start:preamble_end]).strip()
+    if preamble:
+        outline.append({
+            "id": "preamble", "title": "(preamble)", "level": 0,
+            "start": body_start, "end": preamble_end, "tokens": count_tokens(preamble),
+        })
+
+    # Stack of (level, id, children_so_far), as in parse_markdown_structure()
+    stack: list[list] = []
+    for n, (level, title, line_index) in enumerate(headers):
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        if stack:
+            stack[-1][2] += 1
+            section_id = f"{stack[-1][1]}.{stack[-1][2]}"
+        else:
+            section_id = f"section-{line_index + 1}"
+        stack.append([level, section_id, 0])
+
+        end = headers[n + 1][2] if n + 1 < len(headers) else len(lines)
+        text = '\n'.join(lines[line_index:end]).rstrip()
+        outline.append({
+            "id": section_id, "title": title, "level": level,
+            "start": line_index, "end": end, "tokens": count_tokens(text),
+        })
+    return outline
+
+
+def outline_json(content: str) -> str:
+    """Serialize section_outline() compactly for scalar index metadata."""
+    return json.dumps(section_outline(content), separators=(',', ':'))
+
+
+def load_outline(metadata: dict, content: str) -> list[dict]:
+    """Return the outline stored in metadata, computing it for older indexes."""
+    stored = metadata.get("sections")
+    if stored:
+        try:
+            return json.loads(stored)
+        except ValueError:
+            pass
+    return section_outline(content)
+
+
+def _subtree_end(outline: list[dict], n: int) -> int:
+    """Outline index just past entry n's last descendant."""
+    level = outline[n]["level"]
+    if level == 0:
+        return n + 1  # the preamble has no subsections
+    end = n + 1
+    while end < len(outline) and outline[end]["level"] > level:
+        end += 1
+    return end
+
+
+def extract_sections(content: str, names: list[str],
+                     outline: list[dict] | None = None) -> tuple[str, list[str]]:
+    """
+    Extract the named sections (matched on section id, or case-insensitively
+    on header title; including their subsections) from markdown content, in
+    document order.
+
+    Returns (extracted_text, names_not_found).
+    """
+    lines = content.split('\n')
+    if outline is None:
+        outline = section_outline(content)
+    wanted = {name.strip().lower() for name in names}
+    found = set()
+    chunks = []
+    covered_until = 0
+
+    for n, section in enumerate(outline):
+        keys = {section["id"].lower(), section["title"].lower()} & wanted
+        if not keys or n < covered_until:
+            continue
+        found |= keys
+        covered_until = _subtree_end(outline, n)
+        end = outline[covered_until - 1]["end"]
+        chunks.append('\n'.join(lines[section["start"]:end]).rstrip())
+
+    missing = [name for name in names if name.strip().lower() not in found]
+    return '\n\n'.join(chunks), missing
+
+
+def _priority(outline: list[dict]) -> list[int]:
+    """Rank of each entry: its (or its nearest ranked ancestor's) PRIORITY_SECTIONS index."""
+    ranks = []
+    stack: list[tuple[int, int]] = []  # (level, rank)
+    for section in outline:
+        while stack and stack[-1][0] >= section["level"]:
+            stack.pop()
+        title = section["title"].lower()
+        if title in PRIORITY_SECTIONS:
+            rank = PRIORITY_SECTIONS.index(title)
+        else:
+            rank = stack[-1][1] if stack else len(PRIORITY_SECTIONS)
+        stack.append((section["level"], rank))
+        ranks.append(rank)
+    return ranks
+
+
+def select_sections(outline: list[dict], max_tokens: int, chosen: set[int] | None = None,
+                    priority_only: bool = False) -> tuple[set[int], int]:
+    """
+    Add outline entries (by index) to chosen, greedily by value, within
+    max_tokens: PRIORITY_SECTIONS first (in that order), then unless
+    priority_only the rest in document order. A section that does not fit
+    is skipped while smaller later ones may still be taken.
+
+    Returns (chosen, tokens used by the entries added).
+    """
+    chosen = set(chosen or ())
+    ranks = _priority(outline)
+    order = sorted(range(len(outline)), key=lambda n: (ranks[n], n))
+
+    used = 0
+    for n in order:
+        if n in chosen or (priority_only and ranks[n] >= len(PRIORITY_SECTIONS)):
+            continue
+        if used + outline[n]["tokens"] <= max_tokens:
+            chosen.add(n)
+            used += outline[n]["tokens"]
+    return chosen, used
+
+
+def render_sections(content: str, outline: list[dict],
+                    chosen: set[int]) -> tuple[str, list[dict]]:
+    """
+    Emit the chosen outline entries in document order, each with its own
+    header line. Returns (text, omitted_outline_entries).
+    """
+    lines = content.split('\n')
+    # Merge adjacent sections into one line range to keep original spacing
+    ranges: list[list[int]] = []
+    for n in sorted(chosen):
+        start, end = outline[n]["start"], outline[n]["end"]
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    chunks = ['\n'.join(lines[start:end]).rstrip() for start, end in ranges]
+
+    omitted = [section for n, section in enumerate(outline) if n not in chosen]
+    return '\n\n'.join(chunks), omitted
+
+
+def pack_sections(content: str, outline: list[dict],
+                  max_tokens: int) -> tuple[str, list[dict], int]:
+    """
+    Fit a skill into max_tokens by whole sections (see select_sections()).
+
+    Returns (text, omitted_outline_entries, tokens_used).
+    """
+    chosen, used = select_sections(outline, max_tokens)
+    text, omitted = render_sections(content, outline, chosen)
+    return text, omitted, used
+
+
+def omitted_roots(outline: list[dict], omitted: list[dict]) -> list[dict]:
+    """
+    The omitted entries not inside another omitted section: fetching
+    these by name (with their subsections) returns everything left out.
+    """
+    omitted_ids = {section["id"] for section in omitted}
+    roots = []
+    stack: list[tuple[int, bool]] = []  # (level, omitted) of enclosing headers
+    for section in outline:
+        while stack and stack[-1][0] >= section["level"]:
+            stack.pop()
+        is_omitted = section["id"] in omitted_ids
+        if is_omitted and not any(inside for _, inside in stack):
+            roots.append(section)
+        if section["level"] > 0:  # the preamble encloses nothing
+            stack.append((section["level"], is_omitted))
+    return roots
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Skill Store for SREcodex
+
+Holds the full text of every indexed SKILL.md outside the vector database.
+Each blob is named by the SHA-256 of its bytes, so the vector store only
+needs to keep the hash and the MCP server reads a skill body only when it
+actually returns it.
+
+Layout:
+    <root>/<first 2 hex chars>/<sha256 hex>
+    <root>/refs/<owner hash>.json   blobs each index references
+
+Blobs are immutable: writes go to a temp file and are renamed into place,
+so readers never observe a partial file and re-indexing an unchanged skill
+is a no-op. After each successful index write the indexer records which
+blobs that index references and deletes the ones nothing references any
+more (see SkillStore.retain).
+"""
+
+import hashlib
+import json
+import os
+from typing import Iterable
+
+from atomic_files import atomic_write
+
+
+DEFAULT_STORE_PATH = "./skill_store"
+REFS_DIR = "refs"  # one refs file per index sharing the store
+
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest used as a blob key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class SkillStore:
+    """Content-addressed blob store for SKILL.md bodies."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        """Return the on-disk path of a blob."""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, digest: str) -> bool:
+        """Check whether a blob exists."""
+        return os.path.exists(self.path_for(digest))
+
+    def put(self, content: str) -> str:
+        """
+        Store content and return its digest.
+
+        Safe to call repeatedly and from concurrent indexers: an existing
+        blob is never rewritten.
+        """
+        data = content.encode('utf-8')
+        digest = content_hash(data)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return digest
+
+        atomic_write(path, lambda f: f.write(data))
+        return digest
+
+    def read(self, digest: str) -> str:
+        """
+        Read a blob with a single pread. Raises FileNotFoundError if missing.
+        """
+        fd = os.open(self.path_for(digest), os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            data = os.pread(fd, size, 0)
+        finally:
+            os.close(fd)
+        return data.decode('utf-8')
+
+    def _refs_path(self, owner: str) -> str:
+        name = hashlib.sha256(owner.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.root, REFS_DIR, f"{name}.json")
+
+    def _read_refs(self, path: str) -> dict:
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def retain(self, owner: str, digests: Iterable[str]) -> int:
+        """
+        Record the blobs an index (owner: its path or server URL) references
+        and delete those that no index references any more. Returns the
+        number of blobs deleted.
+
+        The previous set is kept for one more run, so servers still on the
+        previous generation can read their bodies until they reload. Only
+        blobs dropping out of this owner's refs are candidates, and one
+        listed by any other owner's refs is kept: blobs of indexes that
+        never recorded refs are left alone (`make clean` removes those).
+        """
+        path = self._refs_path(owner)
+        old = self._read_refs(path)
+        old_current = set(old.get("current", []))
+        current = set(digests)
+        # A run that changed nothing keeps the previous set it had
+        previous = set(old.get("previous", [])) if current == old_current else old_current
+        atomic_write(path, lambda f: f.write(json.dumps({
+            "owner": owner, "current": sorted(current), "previous": sorted(previous),
+        }).encode('utf-8')))
+
+        dropped = (old_current | set(old.get("previous", []))) - current - previous
+        if not dropped:
+            return 0
+        refs_dir = os.path.dirname(path)
+        for name in os.listdir(refs_dir):
+            other = os.path.join(refs_dir, name)
+            if other != path and name.endswith(".json"):
+                refs = self._read_refs(other)
+                dropped -= set(refs.get("current", [])) | set(refs.get("previous", []))
+
+        removed = 0
+        for digest in dropped:
+            try:
+                os.unlink(self.path_for(digest))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
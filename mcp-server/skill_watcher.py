@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Skills Directory Watcher for `index_skills.py --watch`
+
+Reports which SKILL.md files changed under the skills root, so the indexer
+can re-index just those. On Linux it uses inotify (through libc, no extra
+package); elsewhere, or when inotify watches run out, it polls with stat().
+
+- Watches are placed on directories, not files. An editor's atomic save
+  (write a temp file, rename it over SKILL.md) arrives as a rename into
+  the directory and is reported like any other write.
+- A burst of events (a save, a `git checkout`, a bulk copy) is coalesced:
+  watch() waits until no event has arrived for the debounce window, then
+  hands over the whole batch once.
+- Changes the watcher cannot attribute to SKILL.md files (a directory
+  created, moved or deleted, or a kernel queue overflow) are reported as
+  None, meaning "rescan everything".
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Callable
+
+
+SKILL_FILE = "SKILL.md"
+DEFAULT_DEBOUNCE = 1.0       # seconds without events before re-indexing
+DEFAULT_POLL_INTERVAL = 2.0  # seconds between scans when polling
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+READ_SIZE = 64 * 1024
+
+
+def _merge(pending: set[str] | None, changes: set[str] | None) -> set[str] | None:
+    """Union of two change sets, where None (rescan) absorbs everything."""
+    if pending is None or changes is None:
+        return None
+    return pending | changes
+
+
+class InotifyWatcher:
+    """Recursive inotify watch on a skills root (Linux only)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self._dirs: dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _watch_tree(self, top: str):
+        """Watch top and every directory below it."""
+        for directory, _, _ in os.walk(top):
+            wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached "
+                                       "(raise fs.inotify.max_user_watches)")
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # removed while walking
+                raise OSError(err, f"{directory}: {os.strerror(err)}")
+            self._dirs[wd] = directory
+
+    def wait(self, timeout: float | None) -> set[str] | None:
+        """
+        Block until SKILL.md files change or timeout (None = forever) passes.
+        Returns the changed paths (empty on timeout), or None to rescan.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+            changes = self._read()
+            if changes is None or changes:
+                return changes
+
+    def _read(self) -> set[str] | None:
+        """Drain pending events into changed SKILL.md paths (None: rescan)."""
+        changes: set[str] | None = set()
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except BlockingIOError:
+            return changes
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0"))
+            offset += EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                changes = None
+            elif mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changes = None
+            elif mask & IN_ISDIR:
+                # Skills may have arrived or left with the directory
+                if mask & (IN_CREATE | IN_MOVED_TO) and wd in self._dirs:
+                    try:
+                        self._watch_tree(os.path.join(self._dirs[wd], name))
+                    except OSError as e:
+                        print(f"WARNING: {e}", file=sys.stderr)
+                changes = None
+            elif name == SKILL_FILE and wd in self._dirs and changes is not None:
+                changes.add(os.path.join(self._dirs[wd], name))
+        return changes
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback watcher: compares stat() of every SKILL.md each interval."""
+
+    def __init__(self, root: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._stamps = self._scan()
+
+    def _scan(self) -> dict[str, tuple]:
+        stamps = {}
+        for directory, _, files in os.walk(self.root):
+            if SKILL_FILE in files:
+                path = os.path.join(directory, SKILL_FILE)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamps[path] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        return stamps
+
+    def wait(self, timeout: float | None) -> set[str] | None:
+        """Same contract as InotifyWatcher.wait(); never asks for a rescan."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else deadline - time.monotonic()
+            time.sleep(max(0.0, min(self.interval, remaining)))
+            stamps = self._scan()
+            changes = {path for path in stamps.keys() | self._stamps.keys()
+                       if stamps.get(path) != self._stamps.get(path)}
+            self._stamps = stamps
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+
+    def close(self):
+        pass
+
+
+def open_watcher(root: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """Return an InotifyWatcher on root, or a PollingWatcher if inotify is unavailable."""
+    if sys.platform.startswith("linux") and os.path.isdir(root):
+        try:
+            watcher = InotifyWatcher(root)
+            print(f"Watching {root} with inotify ({len(watcher._dirs)} directories)")
+            return watcher
+        except (OSError, AttributeError) as e:
+            print(f"WARNING: inotify unavailable ({e}); polling instead", file=sys.stderr)
+    print(f"Polling {root} every {poll_interval:g}s")
+    return PollingWatcher(root, poll_interval)
+
+
+def watch(root: str, on_change: Callable[[set[str] | None], None],
+          debounce: float = DEFAULT_DEBOUNCE,
+          poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    Call on_change(paths) after each burst of changes under root, once
+    debounce seconds pass without another event. paths is the set of
+    SKILL.md files that were written, created, renamed or deleted, or None
+    if everything must be rescanned. Runs until interrupted.
+    """
+    root = os.path.realpath(root)
+    watcher = open_watcher(root, poll_interval)
+    try:
+        while True:
+            pending = watcher.wait(None)
+            while True:
+                more = watcher.wait(debounce)
+                if more is not None and not more:
+                    break
+                pending = _merge(pending, more)
+            on_change(pending)
+    finally:
+        watcher.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+stdio-to-HTTP Shim for a Shared SREcodex MCP Server
+
+For MCP clients that can only launch a command: speaks MCP on stdio and
+relays every message to a long-lived mcp_server.py started with
+--transport streamable-http (or sse). The shim is a few MB of Python and
+starts instantly; the embedding model and index stay loaded in the one
+shared server process.
+
+Messages are forwarded verbatim in both directions, so the client's own
+handshake, tool calls and notifications reach the server unchanged.
+
+Usage:
+    python stdio_shim.py                                     # default URL
+    python stdio_shim.py --url http://127.0.0.1:8765/mcp
+    python stdio_shim.py --url http://127.0.0.1:8765/sse --transport sse
+"""
+
+import argparse
+import sys
+
+import anyio
+
+from transport_config import DEFAULT_BIND, SSE_PATH, STREAMABLE_HTTP_PATH
+
+try:
+    from mcp.client.sse import sse_client
+    from mcp.client.streamable_http import streamablehttp_client
+    from mcp.server.stdio import stdio_server
+    MCP_AVAILABLE = True
+except ImportError:
+    MCP_AVAILABLE = False
+    print("WARNING: mcp not installed. Install with: pip install mcp", file=sys.stderr)
+
+
+SHIM_TRANSPORTS = ("streamable-http", "sse")
+DEFAULT_SHIM_TRANSPORT = "streamable-http"
+DEFAULT_URL = f"http://{DEFAULT_BIND}{STREAMABLE_HTTP_PATH}"
+
+
+async def pump(source, sink, label: str):
+    """Copy messages from source to sink until source closes."""
+    async with sink:
+        async for message in source:
+            if isinstance(message, Exception):
+                # Transport-level parse/connection errors; not for the client
+                print(f"WARNING: {label}: {message}", file=sys.stderr)
+                continue
+            await sink.send(message)
+
+
+async def relay(url: str, transport: str):
+    """Bridge this process's stdio to the shared server at url."""
+    if transport == "sse":
+        client = sse_client(url)
+    else:
+        client = streamablehttp_client(url)
+
+    async with client as streams:
+        remote_read, remote_write = streams[0], streams[1]
+        async with stdio_server() as (local_read, local_write):
+            async with anyio.create_task_group() as tg:
+                async def client_to_server():
+                    await pump(local_read, remote_write, "client")
+                    # stdin closed: the client is gone, so tear down the session
+                    tg.cancel_scope.cancel()
+
+                tg.start_soon(client_to_server)
+                tg.start_soon(pump, remote_read, local_write, "server")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Relay MCP stdio to a shared SREcodex skills server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Start the shared server first:
+    python mcp_server.py --transport streamable-http --bind {DEFAULT_BIND}
+
+Example config.toml:
+    [mcp.servers.srecodex-skills]
+    command = "python"
+    args = ["mcp-server/stdio_shim.py"]
+
+For an SSE server use --transport sse --url http://{DEFAULT_BIND}{SSE_PATH}
+        """
+    )
+    parser.add_argument(
+        "--url",
+        default=DEFAULT_URL,
+        help=f"Shared server endpoint (default: {DEFAULT_URL})"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=SHIM_TRANSPORTS,
+        default=DEFAULT_SHIM_TRANSPORT,
+        help=f"Transport the shared server speaks (default: {DEFAULT_SHIM_TRANSPORT})"
+    )
+    args = parser.parse_args()
+
+    if not MCP_AVAILABLE:
+        print("ERROR: MCP library not available. Install with: pip install mcp", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        anyio.run(relay, args.url, args.transport)
+    except Exception as e:
+        print(f"ERROR: Could not relay to {args.url}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""max_tokens budget tests: run with `python -m pytest test_budget.py`."""
+
+from pathlib import Path
+
+from mcp_server import budget_contents
+from skill_sections import count_tokens, outline_json
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent / "dotcodex" / "skills"
+
+
+def _skills() -> tuple[list[str], dict[str, dict], dict[str, str]]:
+    """The bundled skills, keyed by path, with their outlines as the indexer stores them."""
+    paths, skills, contents = [], {}, {}
+    for skill_file in sorted(SKILLS_DIR.rglob("SKILL.md")):
+        path = str(skill_file.relative_to(SKILLS_DIR.parent))
+        content = skill_file.read_text(encoding="utf-8")
+        paths.append(path)
+        skills[path] = {"sections": outline_json(content)}
+        contents[path] = content
+    return paths, skills, contents
+
+
+def _total(packed: dict[str, str]) -> int:
+    # Bodies are joined with "\n" in responses
+    return count_tokens("\n".join(packed.values()))
+
+
+def test_budget_caps_bodies_and_notes():
+    paths, skills, contents = _skills()
+    full = _total(contents)
+    floor = _total(budget_contents(paths, skills, contents, 1))
+    for max_tokens in (floor, 300, 800, 2000, full // 2):
+        packed = budget_contents(paths, skills, contents, max_tokens)
+        assert _total(packed) <= max_tokens, max_tokens
+
+
+def test_budget_names_omitted_sections():
+    path = "skills/demo/SKILL.md"
+    content = "# Demo\n\n## Usage\n\nRun it.\n\n## Reference\n\n" + "x " * 2000
+    skills = {path: {"sections": outline_json(content)}}
+    text = budget_contents([path], skills, {path: content}, 200)[path]
+    assert count_tokens(text) <= 200
+    assert "Run it." in text
+    assert text.endswith(f'get_skill(path="{path}", sections=["Reference"])_')
+
+
+def test_budget_keeps_whole_skill_when_it_fits():
+    paths, skills, contents = _skills()
+    path = paths[0]
+    text = budget_contents([path], skills, contents, count_tokens(contents[path]))[path]
+    assert "omitted" not in text
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Query embedding cache tests: run with `python -m pytest test_embedding_cache.py`."""
+
+import mcp_server
+from mcp_server import EmbeddingCache, SkillSearchServer, normalize_query
+
+
+def test_normalize_query_collapses_whitespace_keeps_case():
+    assert normalize_query("  fix \t redis\ntimeouts  ") == "fix redis timeouts"
+    assert normalize_query("Fix PR") != normalize_query("fix pr")
+
+
+def test_embedding_cache_lru_eviction():
+    cache = EmbeddingCache(max_size=2, ttl=0)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]  # b is now least recently used
+    cache.put("c", [3.0])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
+    assert cache.stats()["size"] == 2
+
+
+def test_embedding_cache_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(mcp_server.time, "monotonic", lambda: now[0])
+    cache = EmbeddingCache(max_size=10, ttl=60)
+    cache.put("q", [1.0])
+    now[0] += 59
+    assert cache.get("q") == [1.0]
+    now[0] += 2
+    assert cache.get("q") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 1, 1)
+
+
+def test_query_embeddings_keyed_on_whitespace_not_case(tmp_path):
+    embedded = []
+
+    def embed(texts: list[str]) -> list:
+        embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    server = SkillSearchServer(str(tmp_path), store_path=str(tmp_path))
+    server.embedding_fn = embed
+    server._embed_queries(["Run  pytest"])
+    server._embed_queries(["run pytest", " Run pytest "])
+    assert embedded == ["Run  pytest", "run pytest"]
+    assert server.embedding_cache.stats()["hits"] == 1
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Embedding store tests: run with `python -m pytest test_embedding_store.py`."""
+
+import numpy as np
+
+from embedding_store import PRUNE_TO, QUERY_SCOPE, EmbeddingStore, embed_cached, text_digest
+
+MODEL_ID = "model:0123456789abcdef:256"
+
+
+def _stored(store: EmbeddingStore, model_id: str) -> set[str]:
+    return {digest for (digest,) in store._db.execute(
+        "SELECT text_sha256 FROM embeddings WHERE model = ?", (model_id,))}
+
+
+def test_max_rows_keeps_newest_and_counts_rarely(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store.db"), MODEL_ID + QUERY_SCOPE, max_rows=100)
+    counts = []
+    store._db.set_trace_callback(lambda sql: "COUNT(*)" in sql and counts.append(sql))
+
+    for i in range(250):
+        store.put_many([(f"q{i}", np.full(4, i))])
+        assert len(_stored(store, store.model_id)) <= 100
+
+    kept = _stored(store, store.model_id)
+    assert {f"q{i}" for i in range(240, 250)} <= kept
+    assert len(kept) >= int(100 * PRUNE_TO)
+    assert len(counts) < 25  # one recount per pruning, not one per write
+
+
+def test_indexer_and_server_share_the_file(tmp_path):
+    path = str(tmp_path / "store.db")
+    embedded = []
+
+    def embed(texts: list[str]) -> list:
+        embedded.extend(texts)
+        return [np.full(4, len(text), dtype=np.float32) for text in texts]
+
+    indexer = EmbeddingStore(path, MODEL_ID)
+    server = EmbeddingStore(path, MODEL_ID + QUERY_SCOPE, max_rows=2)
+    skills = ["# alpha skill", "# beta skill", "# gamma skill"]
+    embed_cached(skills, embed, indexer)
+
+    # The server's query rows are capped; the indexer's are untouched
+    for query in ("alpha", "beta", "gamma", "delta"):
+        embed_cached([query], embed, server)
+    assert _stored(server, MODEL_ID) == {text_digest(s) for s in skills}
+    assert len(_stored(server, MODEL_ID + QUERY_SCOPE)) <= 2
+
+    # A later process (e.g. a rebuild) reads every vector back without embedding
+    indexer.close()
+    rebuild = EmbeddingStore(path, MODEL_ID)
+    embedded.clear()
+    vectors = embed_cached(skills, embed, rebuild)
+    assert embedded == []
+    assert [float(v[0]) for v in vectors] == [float(len(s)) for s in skills]
+    assert rebuild.stats()["hits"] == 3
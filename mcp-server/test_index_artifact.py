@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Index artifact export/open round trip: run with `python -m pytest test_index_artifact.py`."""
+
+import os
+import tempfile
+
+import numpy as np
+
+from index_artifact import IndexArtifact, write_artifact
+from lexical_index import BM25Index
+from skill_filters import build_where, filter_fields, normalize_filters
+from vector_backends import NumpyBackend
+
+SKILLS = {
+    "skills/uv-python/SKILL.md": ("UV Python Workflow", "uv,python,pytest", ["python"], "low"),
+    "skills/doc-parser/SKILL.md": ("Document Parser", "document,parse,RAG", None, "Medium"),
+    "skills/time-awareness/SKILL.md": ("Time Awareness", "date,time", ["bash"], None),
+}
+
+
+def _export(tmp: str) -> tuple[NumpyBackend, str]:
+    """A NumPy index of SKILLS with random vectors, exported to an artifact."""
+    collection = NumpyBackend(os.path.join(tmp, "numpy"), space="cosine")
+    ids, metadatas = list(SKILLS), []
+    for name, tags, languages, risk_level in SKILLS.values():
+        metadatas.append({
+            "name": name, "tags": tags, "intent": f"Use {name.lower()}",
+            **filter_fields(tags, languages, risk_level),
+        })
+    embeddings = np.random.default_rng(0).standard_normal((len(ids), 8))
+    collection.upsert(ids=ids, metadatas=metadatas, embeddings=embeddings)
+
+    path = os.path.join(tmp, "skills.idx")
+    count = write_artifact(path, collection, lambda m: f"# {m['name']}\n", generation=3)
+    assert count == len(SKILLS)
+    return collection, path
+
+
+def test_round_trip_metadata_and_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        collection, path = _export(tmp)
+        artifact = IndexArtifact(path)
+
+        assert artifact.generation == 3
+        assert artifact.count() == len(SKILLS)
+        assert list(artifact.ids) == sorted(SKILLS)
+        assert artifact.space == "cosine"
+        for skill_id in SKILLS:
+            assert artifact.catalog[skill_id] == collection.get(ids=[skill_id])["metadatas"][0]
+            assert artifact.read(skill_id) == f"# {artifact.catalog[skill_id]['name']}\n"
+            assert len(artifact.etags[skill_id]) == 64
+        assert artifact.read("skills/missing/SKILL.md") is None
+        assert artifact.get(ids=["skills/doc-parser/SKILL.md", "nope"])["ids"] == [
+            "skills/doc-parser/SKILL.md"
+        ]
+
+
+def test_round_trip_search_matches_source():
+    with tempfile.TemporaryDirectory() as tmp:
+        collection, path = _export(tmp)
+        artifact = IndexArtifact(path)
+        queries = np.random.default_rng(1).standard_normal((4, 8))
+
+        for filters in ({}, {"tags": ["PYTHON"]}, {"risk_level": ["medium"]},
+                        {"languages": ["bash"]}, {"risk_level": ["unknown"]}):
+            where = build_where(normalize_filters(**filters))
+            expected = collection.query(query_embeddings=queries, n_results=2, where=where)
+            result = artifact.query(query_embeddings=queries, n_results=2, where=where)
+            assert result["ids"] == expected["ids"], filters
+            assert np.allclose(result["distances"], expected["distances"])
+
+        result = collection.get()
+        catalog = dict(zip(result["ids"], result["metadatas"]))
+        reference = BM25Index.from_metadata(catalog)
+        for query in ("python tests", "parse documents", "what time is it"):
+            assert artifact.lexical_index.search(query, 3) == reference.search(query, 3)
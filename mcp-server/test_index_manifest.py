@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Incremental indexing (manifest) tests: run with `python -m pytest test_index_manifest.py`.
+
+Uses the library fixture (conftest.py): a temporary NumPy index built with
+a stub embedder.
+"""
+
+import json
+import os
+
+import pytest
+
+from embeddings import EmbeddingConfig
+from index_generation import read_generation
+from index_manifest import manifest_path
+from vector_backends import NumpyBackend
+
+
+def _index(library, config: EmbeddingConfig | None = None) -> tuple[int, dict, NumpyBackend]:
+    """Run the indexer; return (count, manifest skills, collection)."""
+    count = library.index(config)
+    with open(manifest_path(library.numpy_path), encoding="utf-8") as f:
+        skills = json.load(f)["skills"]
+    return count, skills, NumpyBackend(library.numpy_path)
+
+
+def test_manifest_add_change_delete(library):
+    library.write("alpha", "Use for alpha work")
+    library.write("beta", "Use for beta work")
+
+    count, first, collection = _index(library)
+    assert count == 2
+    assert set(first) == set(collection.ids) == {"skills/alpha/SKILL.md", "skills/beta/SKILL.md"}
+    assert read_generation(library.numpy_path) == 1
+
+    # Nothing changed: no new generation
+    _index(library)
+    assert read_generation(library.numpy_path) == 1
+
+    # Add gamma, change alpha, delete beta
+    library.write("gamma", "Use for gamma work")
+    library.write("alpha", "Use for alpha work, revised")
+    library.remove("beta")
+
+    count, second, collection = _index(library)
+    assert count == 2
+    assert set(second) == set(collection.ids) == {"skills/alpha/SKILL.md", "skills/gamma/SKILL.md"}
+    assert second["skills/alpha/SKILL.md"]["sha256"] != first["skills/alpha/SKILL.md"]["sha256"]
+    intent = collection.get(ids=["skills/alpha/SKILL.md"])["metadatas"][0]["intent"]
+    assert intent == "Use for alpha work, revised"
+    assert read_generation(library.numpy_path) == 2
+
+    # Every skill removed: the index empties rather than keeping stale ids
+    library.remove("alpha")
+    library.remove("gamma")
+    count, third, collection = _index(library)
+    assert count == 0
+    assert third == {} and collection.ids == []
+    assert read_generation(library.numpy_path) == 3
+
+
+def test_unchanged_run_skips_model_hash_and_download(library, monkeypatch):
+    library.write("alpha", "Use for alpha work")
+    library.index()
+
+    hashed = []
+    real_hash = EmbeddingConfig.hash_model_file
+    monkeypatch.setattr(EmbeddingConfig, "hash_model_file",
+                        lambda self: hashed.append(1) or real_hash(self))
+    monkeypatch.setattr(EmbeddingConfig, "ensure_model",
+                        lambda self: pytest.fail("model fetched for an unchanged index"))
+    assert library.index() == 1
+    assert not hashed
+
+    # A missing model is not fetched while nothing needs embedding
+    config = library.config()
+    os.remove(config.model_file)
+    assert library.index(config) == 1
+    assert read_generation(library.numpy_path) == 1
+
+    # A rewritten model file is hashed again (same bytes: still up to date)
+    monkeypatch.setattr(EmbeddingConfig, "ensure_model", lambda self: None)
+    library.write_model()
+    assert library.index() == 1
+    assert hashed
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Query pool tests: run with `python -m pytest test_query_pool.py`."""
+
+import asyncio
+import tempfile
+import threading
+
+import pytest
+
+from mcp_server import MAX_RESULTS, SkillSearchServer, parse_n_results
+
+
+def test_timed_out_and_cancelled_queries_return_their_slots():
+    async def run(server: SkillSearchServer, release: threading.Event):
+        # Two calls take both slots; the rest time out or are cancelled waiting
+        busy = [asyncio.create_task(server._run_blocking(release.wait)) for _ in range(2)]
+        waiting = [asyncio.create_task(server._run_blocking(release.wait)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        for task in waiting[:3]:
+            task.cancel()
+        results = await asyncio.gather(*busy, *waiting, return_exceptions=True)
+        assert all(isinstance(r, (TimeoutError, asyncio.CancelledError)) for r in results)
+
+        release.set()
+        await asyncio.sleep(0.05)  # workers finish and hand their slots back
+        assert server._query_slots._value == 2
+        assert await server._run_blocking(lambda: "ok") == "ok"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = SkillSearchServer(tmp, store_path=tmp, query_workers=2, query_timeout=0.1)
+        asyncio.run(run(server, threading.Event()))
+
+
+def test_n_results_must_be_positive():
+    assert parse_n_results({}) >= 1
+    assert parse_n_results({"n_results": 1}) == 1
+    assert parse_n_results({"n_results": MAX_RESULTS + 10}) == MAX_RESULTS
+    for bad in (0, -1, True, "3", 2.5):
+        with pytest.raises(ValueError):
+            parse_n_results({"n_results": bad})
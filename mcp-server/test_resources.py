@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""skill:// resource tests: run with `python -m pytest test_resources.py`."""
+
+import asyncio
+
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import (
+    ListResourcesRequest, ReadResourceRequest, ReadResourceRequestParams, ReadResourceResult,
+)
+
+from mcp_server import RESOURCE_NOT_FOUND, SkillSearchServer, skill_uri
+
+ALPHA, BETA, GAMMA = (f"skills/{name}/SKILL.md" for name in ("alpha", "beta", "gamma"))
+
+
+async def _list(server: SkillSearchServer) -> dict[str, str]:
+    """{path: etag} of every listed resource."""
+    result = await server._list_resources(ListResourcesRequest(method="resources/list"))
+    prefix = len(skill_uri(""))
+    return {str(r.uri)[prefix:]: r.meta["etag"] for r in result.resources}
+
+
+async def _read(server: SkillSearchServer, path: str, etag: str | None = None) -> ReadResourceResult:
+    uri = skill_uri(path) + (f"?if-none-match={etag}" if etag else "")
+    return await server._read_resource(ReadResourceRequest(
+        method="resources/read", params=ReadResourceRequestParams(uri=uri)))
+
+
+async def _reload(server: SkillSearchServer):
+    server._last_reload_check = 0.0
+    server._maybe_reload()
+    await server._reload_task
+
+
+def test_etags_not_modified_and_listing_after_reload(library):
+    library.write("alpha", "Use for alpha work", "Alpha body.\n")
+    library.write("beta", "Use for beta work", "Beta body.\n")
+    library.index()
+    server = library.server(reload_interval=0.01)
+
+    async def run():
+        await server._warm_up()
+        etags = await _list(server)
+        assert list(etags) == [ALPHA, BETA]
+
+        # Full read carries the listed ETag; a matching if-none-match sends nothing
+        result = await _read(server, ALPHA)
+        assert "Alpha body." in result.contents[0].text
+        assert result.meta["etag"] == result.contents[0].meta["etag"] == etags[ALPHA]
+        result = await _read(server, ALPHA, etags[ALPHA])
+        assert result.contents == [] and result.meta == {"etag": etags[ALPHA], "notModified": True}
+        assert (await _read(server, ALPHA, "stale")).contents
+
+        # Re-index: alpha edited, beta removed, gamma added
+        library.write("alpha", "Use for alpha work", "Alpha body, revised.\n")
+        library.remove("beta")
+        library.write("gamma", "Use for gamma work")
+        library.index()
+        await _reload(server)
+
+        after = await _list(server)
+        assert list(after) == [ALPHA, GAMMA]
+        assert after[ALPHA] != etags[ALPHA]
+        result = await _read(server, ALPHA, etags[ALPHA])
+        assert "revised" in result.contents[0].text and result.meta["etag"] == after[ALPHA]
+        assert (await _read(server, ALPHA, after[ALPHA])).meta["notModified"] is True
+        with pytest.raises(McpError) as error:
+            await _read(server, BETA)
+        assert error.value.error.code == RESOURCE_NOT_FOUND
+
+    asyncio.run(run())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Search response cache tests: run with `python -m pytest test_result_cache.py`."""
+
+import asyncio
+
+from mcp_server import ResultCache
+
+
+def test_result_cache_evicts_least_recently_used_to_fit_bytes():
+    cache = ResultCache(max_bytes=100)
+    cache.put(("a",), "a" * 40)
+    cache.put(("b",), "b" * 40)
+    assert cache.get(("a",)) == "a" * 40  # now most recently used
+    cache.put(("c",), "c" * 40)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == "a" * 40 and cache.get(("c",)) == "c" * 40
+    assert cache.bytes == 80 <= cache.max_bytes
+
+    # Larger than the whole budget: not stored, nothing evicted
+    cache.put(("d",), "d" * 101)
+    assert cache.get(("d",)) is None
+    assert cache.stats()["size"] == 2
+
+    # Sized in UTF-8 bytes, not characters
+    cache.put(("e",), "é" * 30)
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_search_hits_cache_until_generation_bump(library):
+    library.write("alpha", "Use for alpha work")
+    library.write("beta", "Use for beta work")
+    library.index()
+    server = library.server(reload_interval=0.01)
+
+    async def search(query: str) -> str:
+        return (await server._search_skills({"query": query}))[0].text
+
+    async def run():
+        await server._warm_up()
+        first = await search("alpha work")
+        assert server.result_cache.stats()["misses"] == 1
+
+        # Same normalized query: served from the cache
+        assert await search("  alpha   work ") == first.replace("'alpha work'", "'  alpha   work '")
+        assert server.result_cache.stats()["hits"] == 1
+
+        # Re-index: the reload clears the cache and the next search misses
+        library.write("alpha", "Use for alpha work, revised")
+        library.index()
+        server._last_reload_check = 0.0
+        server._maybe_reload()
+        await server._reload_task
+        assert server.index.generation == 2
+        after = await search("alpha work")
+        assert "revised" in after and "revised" not in first
+        assert server.result_cache.stats()["misses"] == 2
+
+    asyncio.run(run())
@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
 """Quick test script for semantic search."""
 
-import chromadb
-from chromadb.utils import embedding_functions
+import argparse
+
+from embeddings import EmbeddingConfig, OnnxEmbedder
+from vector_backends import collection_space, distance_to_relevance, open_collection
 
 def main():
-    client = chromadb.PersistentClient(path='./chroma_data')
-    ef = embedding_functions.DefaultEmbeddingFunction()
+    parser = argparse.ArgumentParser(description="Quick semantic search test")
+    parser.add_argument('--chroma-path', default='./chroma_data',
+                        help="Path to ChromaDB data directory (default: ./chroma_data)")
+    parser.add_argument('--chroma-url',
+                        help="Query a Chroma server (e.g. http://localhost:8000) instead")
+    EmbeddingConfig.add_arguments(parser)
+    args = parser.parse_args()
+
+    config = EmbeddingConfig.from_args(args)
+    embed = OnnxEmbedder(config)
 
     try:
-        coll = client.get_collection('srecodex_skills', embedding_function=ef)
-    except ValueError:
-        print("Error: Collection not found. Run 'make index' first.")
+        coll = open_collection('chroma', args.chroma_path, 'srecodex_skills', None,
+                               chroma_url=args.chroma_url)
+    except Exception as e:
+        print(f"Error: Collection not found ({e}). Run 'make index' first.")
         return 1
 
-    print(f"Skills indexed: {coll.count()}")
+    space = collection_space(coll)
+    print(f"Skills indexed: {coll.count()} (space: {space})")
+    for mismatch in config.mismatches(coll.metadata or {}):
+        print(f"WARNING: embedding settings differ from the index: {mismatch}")
     print()
 
     queries = [
@@ -24,14 +38,14 @@ def main():
     ]
 
     for q in queries:
-        r = coll.query(query_texts=[q], n_results=2)
+        r = coll.query(query_embeddings=embed([q]), n_results=2)
         print(f'Query: "{q}"')
         for i, (id, meta, dist) in enumerate(zip(
             r['ids'][0],
             r['metadatas'][0],
             r['distances'][0]
         )):
-            relevance = 1 - dist
+            relevance = distance_to_relevance(dist, space)
             print(f"  {i+1}. {meta['name']} (relevance: {relevance:.2f})")
         print()
 
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Search filter tests: run with `python -m pytest test_skill_filters.py`."""
+
+import pytest
+
+from mcp_server import parse_filters
+from skill_filters import build_where, filter_fields, matches_where, normalize_filters
+
+SKILLS = {
+    "uv-python": filter_fields("uv,python,pytest", ["python"], "Low"),
+    "doc-parser": filter_fields(["document", "RAG"], None, "medium", always_load=True),
+    "bash-tools": filter_fields("shell", "bash, zsh", "high"),
+    "orchestrator": filter_fields("routing", ["python", "bash"], None, always_load=True),
+}
+
+# (tool arguments, skills expected to match)
+CASES = [
+    ({}, {"uv-python", "doc-parser", "bash-tools", "orchestrator"}),
+    ({"tags": ["PYTHON"]}, {"uv-python"}),
+    ({"tags": ["python", "pytest"]}, {"uv-python"}),
+    ({"tags": ["python", "shell"]}, set()),
+    ({"risk_level": ["low", "high"]}, {"uv-python", "bash-tools"}),
+    ({"risk_level": "unknown"}, {"orchestrator"}),
+    ({"languages": ["bash"]}, {"doc-parser", "bash-tools", "orchestrator"}),  # doc-parser: all
+    ({"languages": ["rust"]}, {"doc-parser"}),
+    ({"always_load": True}, {"doc-parser", "orchestrator"}),
+    ({"always_load": False, "languages": ["python"]}, {"uv-python"}),
+    ({"tags": ["rag"], "risk_level": ["medium"], "languages": ["go"], "always_load": True},
+     {"doc-parser"}),
+]
+
+
+def _matching(where: dict | None) -> set[str]:
+    return {name for name, metadata in SKILLS.items() if matches_where(metadata, where)}
+
+
+@pytest.mark.parametrize("arguments, expected", CASES)
+def test_filter_combinations(arguments, expected):
+    filters, _ = parse_filters(arguments)
+    assert _matching(build_where(filters)) == expected
+
+
+def test_single_condition_is_not_wrapped_in_and():
+    assert build_where({}) is None
+    assert build_where(normalize_filters(tags=["python"])) == {"tag:python": True}
+    assert build_where(normalize_filters(always_load=False)) == {"always_load": False}
+    where = build_where(normalize_filters(tags=["python"], always_load=True))
+    assert where == {"$and": [{"tag:python": True}, {"always_load": True}]}
+
+
+def test_equal_filters_normalize_equal():
+    assert normalize_filters(tags="b, A,a") == normalize_filters(tags=["a", "b"])
+    assert normalize_filters(tags=[], languages="") == {}
+
+
+@pytest.mark.parametrize("arguments", [
+    {"risk_level": ["hgih"]},
+    {"risk_level": ["low", "critical"]},
+    {"always_load": "yes"},
+    {"tags": 3},
+    {"languages": {"python": True}},
+    {"exclude_paths": 1},
+])
+def test_invalid_filters_rejected(arguments):
+    with pytest.raises(ValueError):
+        parse_filters(arguments)
+
+
+def test_chroma_evaluates_where_like_matches_where():
+    chromadb = pytest.importorskip("chromadb")
+    collection = chromadb.EphemeralClient().get_or_create_collection("filters")
+    names = list(SKILLS)
+    collection.add(ids=names, metadatas=[SKILLS[n] for n in names],
+                   embeddings=[[float(i), 1.0] for i in range(len(names))])
+    for arguments, expected in CASES:
+        where = build_where(parse_filters(arguments)[0])
+        assert set(collection.get(where=where)["ids"]) == expected, arguments
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Skill store garbage collection tests: run with `python -m pytest test_skill_store.py`."""
+
+import os
+
+from skill_store import SkillStore, content_hash
+
+
+def _digest(library, name: str) -> str:
+    with open(os.path.join(library.skills_dir, name, "SKILL.md"), "rb") as f:
+        return content_hash(f.read())
+
+
+def test_reindex_deletes_blobs_after_previous_generation(library):
+    store = SkillStore(library.store_path)
+    library.write("alpha", "Use for alpha work", "v1\n")
+    library.write("beta", "Use for beta work")
+    library.index()
+    alpha_v1, beta = _digest(library, "alpha"), _digest(library, "beta")
+
+    # Edited and removed skills keep their blobs for servers on the previous generation
+    library.write("alpha", "Use for alpha work", "v2\n")
+    library.remove("beta")
+    library.index()
+    alpha_v2 = _digest(library, "alpha")
+    assert store.has(alpha_v1) and store.has(beta) and store.has(alpha_v2)
+
+    library.write("alpha", "Use for alpha work", "v3\n")
+    library.index()
+    alpha_v3 = _digest(library, "alpha")
+    assert not store.has(alpha_v1) and not store.has(beta)
+    assert store.has(alpha_v2) and store.has(alpha_v3)
+    assert "v3" in store.read(alpha_v3)
+
+    # An up-to-date run deletes nothing
+    library.index()
+    assert store.has(alpha_v2) and store.has(alpha_v3)
+
+
+def test_retain_keeps_blobs_other_owners_reference(tmp_path):
+    store = SkillStore(str(tmp_path))
+    shared, own, new, newer, untracked = (
+        store.put(text) for text in ("shared", "own", "new", "newer", "untracked"))
+    store.retain("index-a", [shared, own])
+    store.retain("index-b", [shared])
+
+    assert store.retain("index-a", [new]) == 0  # still the previous set
+    assert store.retain("index-a", [new]) == 0  # unchanged: previous set kept
+    assert store.retain("index-a", [newer]) == 1
+    assert store.has(shared) and not store.has(own) and store.has(new)
+    # Never listed in any refs (e.g. an index from before refs existed)
+    assert store.has(untracked)
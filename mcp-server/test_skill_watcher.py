@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Skills directory watcher tests: run with `python -m pytest test_skill_watcher.py`."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import skill_watcher
+
+DEBOUNCE = 0.3
+POLL_INTERVAL = 0.05
+
+
+class Stop(Exception):
+    """Raised from on_change to end watch()."""
+
+
+def _write(root: str, name: str, text: str) -> str:
+    directory = os.path.join(root, name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, skill_watcher.SKILL_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+@pytest.mark.parametrize("mode", ["polling", "inotify"])
+def test_burst_of_edits_is_one_update(tmp_path, monkeypatch, mode):
+    if mode == "polling":
+        def no_inotify(root):
+            raise OSError("inotify disabled for this test")
+        monkeypatch.setattr(skill_watcher, "InotifyWatcher", no_inotify)
+    elif not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux only")
+
+    root = os.path.realpath(tmp_path)
+    alpha = _write(root, "alpha", "# alpha\n")
+    beta = _write(root, "beta", "# beta\n")
+
+    # Start watching only once the watcher exists (polling scans at creation)
+    started = threading.Event()
+    open_watcher = skill_watcher.open_watcher
+
+    def opened(*args):
+        watcher = open_watcher(*args)
+        started.set()
+        return watcher
+
+    monkeypatch.setattr(skill_watcher, "open_watcher", opened)
+    calls = []
+
+    def on_change(paths):
+        calls.append(paths)
+        if len(calls) == 2:
+            raise Stop
+
+    errors = []
+
+    def run():
+        try:
+            skill_watcher.watch(root, on_change, debounce=DEBOUNCE, poll_interval=POLL_INTERVAL)
+        except Stop:
+            pass
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(5)
+
+    # A burst: alpha saved repeatedly, beta edited, gamma created
+    for i in range(5):
+        _write(root, "alpha", "# alpha\n" + "edit\n" * (i + 1))
+        time.sleep(0.02)
+    _write(root, "beta", "# beta, edited\n")
+    gamma = _write(root, "gamma", "# gamma\n")
+
+    time.sleep(DEBOUNCE * 4)
+    assert not errors
+    assert len(calls) == 1
+    # inotify cannot attribute files in a new directory and asks for a rescan
+    assert calls[0] in ({alpha, beta, gamma}, None)
+    if mode == "polling":
+        assert calls[0] == {alpha, beta, gamma}
+
+    # The next, separate edit is its own update
+    _write(root, "beta", "# beta, edited again\n")
+    thread.join(5)
+    assert not thread.is_alive() and not errors
+    assert calls[1] == {beta}
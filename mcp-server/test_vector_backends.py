@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Vector backend tests: run with `python -m pytest test_vector_backends.py`."""
+
+import gc
+import tempfile
+
+import pytest
+
+import vector_backends
+
+chromadb = pytest.importorskip("chromadb")
+from chromadb.api.client import SharedSystemClient  # noqa: E402
+
+
+def test_fresh_chroma_snapshots_stop_their_system(monkeypatch):
+    systems = []
+    private_client = vector_backends._private_persistent_client
+
+    def recording_client(path: str):
+        client, system = private_client(path)
+        systems.append(system)
+        return client, system
+
+    monkeypatch.setattr(vector_backends, "_private_persistent_client", recording_client)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = vector_backends.open_collection("chroma", tmp, "skills", None, create=True)
+        shared = SharedSystemClient._identifier_to_system[tmp]
+        writer.upsert(ids=["a"], embeddings=[[1.0, 0.0]], metadatas=[{"name": "a"}])
+
+        # Two reloads: each snapshot gets its own System, outside the shared cache
+        first = vector_backends.open_collection("chroma", tmp, "skills", None, fresh=True)
+        writer.upsert(ids=["b"], embeddings=[[0.0, 1.0]], metadatas=[{"name": "b"}])
+        second = vector_backends.open_collection("chroma", tmp, "skills", None, fresh=True)
+        assert len(systems) == 2 and None not in systems
+        assert systems[0] is not systems[1]
+        assert shared not in systems
+        assert SharedSystemClient._identifier_to_system[tmp] is shared
+        assert second.count() == 2
+
+        # Releasing a snapshot stops its System only
+        del first
+        gc.collect()
+        assert not systems[0]._running
+        assert systems[1]._running and shared._running
+        del second
+        gc.collect()
+        assert not systems[1]._running
+        assert writer.count() == 2
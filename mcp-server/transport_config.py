@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+MCP Transport Settings for SREcodex
+
+Where mcp_server.py listens and at which paths, shared with stdio_shim.py
+and bench/load_test.py so they can build the server URL without importing
+the server (and its embedding, index and ChromaDB dependencies).
+"""
+
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+DEFAULT_TRANSPORT = "stdio"
+DEFAULT_BIND = "127.0.0.1:8765"
+SSE_PATH = "/sse"
+SSE_MESSAGES_PATH = "/messages/"
+STREAMABLE_HTTP_PATH = "/mcp"
@@ -0,0 +1,686 @@
+#!/usr/bin/env python3
+"""
+Pluggable Vector Backends for SREcodex Skill Search
+
+Both the indexer and the MCP server talk to a "collection": an object
+exposing the subset of the ChromaDB Collection API they use:
+
+    count() -> int
+    get(ids=None, include=[...]) -> {"ids": [...], "metadatas": [...]}
+    query(query_embeddings=[...], n_results=k, include=[...])
+        -> {"ids": [[...]], "metadatas": [[...]], "distances": [[...]]}
+    upsert(ids=[...], documents=[...], metadatas=[...], embeddings=None)
+    delete(ids=[...])
+
+Backends:
+- chroma: a ChromaDB PersistentClient collection (SQLite + HNSW), or with
+          a chroma_url, a collection on a shared Chroma server reached over
+          one keep-alive HTTP connection pool, with timeouts and retries
+- numpy:  NumpyBackend, exact cosine search over a memory-mapped matrix.
+          A skill library is thousands of entries, not millions, so one
+          matmul is fast and avoids Chroma's startup cost and RSS.
+
+Both accept a ChromaDB-style `where` filter on query (see skill_filters.py);
+the NumPy backend evaluates it once per distinct filter into a row bitmask.
+
+Distances follow ChromaDB's definition for the collection's space
+("hnsw:space" in its metadata: squared L2 by default, or cosine / inner
+product distance), and distance_to_relevance() maps each back to cosine
+similarity, so relevance scoring is backend- and space-independent. HNSW
+graph parameters (M, construction/search ef) are also kept in the
+collection metadata; see hnsw_metadata().
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable
+from urllib.parse import urlsplit
+
+from atomic_files import atomic_write
+from embeddings import METADATA_PREFIX as EMBEDDING_METADATA_PREFIX
+from skill_filters import matches_where
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+BACKENDS = ("chroma", "numpy")
+DEFAULT_BACKEND = "chroma"
+DEFAULT_NUMPY_PATH = "./numpy_index"
+NUMPY_DTYPES = ("float32", "float16", "int8")
+DEFAULT_NUMPY_DTYPE = "float32"
+INT8_SCALE = 127.0
+
+# Distance space and HNSW graph parameters (ChromaDB's defaults)
+SPACES = ("l2", "cosine", "ip")
+DEFAULT_SPACE = "l2"
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_CONSTRUCTION_EF = 100
+DEFAULT_HNSW_SEARCH_EF = 100
+# Fixed once the graph is built; changing one means rebuilding the collection
+HNSW_BUILD_KEYS = ("hnsw:space", "hnsw:M", "hnsw:construction_ef")
+MASK_CACHE_SIZE = 64  # distinct `where` filters whose row bitmasks are kept
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+# Chroma HTTP client (--chroma-url)
+DEFAULT_CHROMA_TIMEOUT = 5.0       # seconds per HTTP request
+DEFAULT_CHROMA_POOL_SIZE = 8       # max (keep-alive) connections per process
+CHROMA_KEEPALIVE_SECS = 120.0      # idle connections are reused this long
+CHROMA_RETRIES = 3                 # attempts after the first, on transient errors
+CHROMA_BACKOFF = 0.2               # seconds; doubles per retry, with jitter
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+def hnsw_metadata(space: str = DEFAULT_SPACE, m: int = DEFAULT_HNSW_M,
+                  construction_ef: int = DEFAULT_HNSW_CONSTRUCTION_EF,
+                  search_ef: int = DEFAULT_HNSW_SEARCH_EF) -> dict:
+    """Collection metadata keys selecting the distance space and HNSW parameters."""
+    if space not in SPACES:
+        raise ValueError(f"space must be one of: {', '.join(SPACES)}")
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef,
+    }
+
+
+def hnsw_settings(collection) -> dict:
+    """
+    Return a collection's effective settings as hnsw_metadata() keys.
+
+    ChromaDB's configuration is authoritative (search ef can be changed
+    after creation without updating the metadata); collections without one
+    fall back to their metadata, then to ChromaDB's defaults.
+    """
+    if isinstance(collection, NumpyBackend):
+        return {"hnsw:space": collection.space}
+    settings = hnsw_metadata()
+    settings.update({k: v for k, v in (collection.metadata or {}).items() if k in settings})
+    hnsw = (getattr(collection, "configuration", None) or {}).get("hnsw") or {}
+    for key, field in (("hnsw:space", "space"), ("hnsw:M", "max_neighbors"),
+                       ("hnsw:construction_ef", "ef_construction"),
+                       ("hnsw:search_ef", "ef_search")):
+        if hnsw.get(field) is not None:
+            settings[key] = hnsw[field]
+    return settings
+
+
+def collection_space(collection) -> str:
+    """Distance space of a collection ('l2' for indexes built before it was configurable)."""
+    return hnsw_settings(collection).get("hnsw:space", DEFAULT_SPACE)
+
+
+def max_batch_size(collection) -> int | None:
+    """Most records one upsert() may carry (ChromaDB's limit; None = no limit)."""
+    client = getattr(collection, "_client", None)
+    return client.get_max_batch_size() if client is not None else None
+
+
+def distance_to_relevance(distance: float, space: str = DEFAULT_SPACE) -> float:
+    """
+    Convert a distance in the given space to a 0-1 relevance score (cosine
+    similarity, clamped at 0). Embeddings are unit vectors, so squared L2
+    is 2 - 2 * cosine, and cosine / inner-product distance is 1 - cosine.
+    """
+    if space == "l2":
+        return max(0.0, 1 - distance / 2)
+    return max(0.0, 1 - distance)
+
+
+def rebuild_keys(requested: dict, current: dict, backend: str = "chroma") -> list[str]:
+    """
+    Keys of requested collection metadata whose change invalidates the
+    stored vectors: the embedding settings ("embedding:*", see
+    embeddings.py) and, for Chroma, HNSW_BUILD_KEYS.
+    """
+    return [
+        key for key, value in requested.items()
+        if (key.startswith(EMBEDDING_METADATA_PREFIX)
+            or (backend == "chroma" and key in HNSW_BUILD_KEYS))
+        and current.get(key) != value
+    ]
+
+
+def normalize_rows(vectors) -> "np.ndarray":
+    """L2-normalize vectors as float32 rows (a single vector becomes one row)."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cached_mask(cache: OrderedDict, where: dict,
+                compute: Callable[[dict], "np.ndarray"]) -> "np.ndarray":
+    """compute(where), memoized per distinct filter in cache (LRU, MASK_CACHE_SIZE entries)."""
+    key = json.dumps(where, sort_keys=True)
+    mask = cache.get(key)
+    if mask is None:
+        mask = cache[key] = compute(where)
+        while len(cache) > MASK_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return mask
+
+
+def where_mask(metadatas, where: dict) -> "np.ndarray":
+    """Boolean row mask of the metadatas matching a `where` filter."""
+    return np.fromiter((matches_where(m, where) for m in metadatas),
+                       dtype=bool, count=len(metadatas))
+
+
+def exact_top_k(matrix: "np.ndarray", queries: "np.ndarray", n_results: int,
+                mask: "np.ndarray | None" = None, scale: float = 1.0,
+                space: str = DEFAULT_SPACE) -> tuple[list[list[int]], list[list[float]]]:
+    """
+    Exact top-k rows of a normalized matrix (stored values divided by scale)
+    for normalized queries, by cosine similarity: one matmul plus
+    argpartition. Rows where mask is False are never returned. Returns
+    (rows, distances) per query, distances in the given space.
+    """
+    n_queries = queries.shape[0]
+    n_allowed = int(mask.sum()) if mask is not None else matrix.shape[0]
+    k = min(n_results, n_allowed)
+    if k == 0:
+        return [[] for _ in range(n_queries)], [[] for _ in range(n_queries)]
+
+    scores = queries @ matrix.T.astype(np.float32, copy=False)
+    if scale != 1.0:
+        scores /= scale
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(scores.shape[1]), (n_queries, 1))
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    if space == "l2":
+        distances = np.maximum(0.0, 2.0 - 2.0 * top_scores)
+    else:
+        distances = 1.0 - top_scores
+    return top.tolist(), distances.tolist()
+
+
+class NumpyBackend:
+    """
+    Exact cosine top-k over a normalized embedding matrix stored as .npy.
+
+    The matrix is memory-mapped read-only at open, so startup cost is
+    independent of library size and pages are shared between processes.
+    Rows are L2-normalized and may be stored as float32, float16 or int8
+    (scaled by 127); scoring upcasts to float32. Search is exact, so only
+    the space (which sets how distances are reported) applies, not HNSW
+    parameters.
+    """
+
+    def __init__(self, path: str, embedding_function=None,
+                 dtype: str = DEFAULT_NUMPY_DTYPE, space: str | None = None):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy not installed. Install with: pip install numpy")
+        if dtype not in NUMPY_DTYPES:
+            raise ValueError(f"dtype must be one of: {', '.join(NUMPY_DTYPES)}")
+        if space is not None and space not in SPACES:
+            raise ValueError(f"space must be one of: {', '.join(SPACES)}")
+
+        self.path = path
+        self.embedding_function = embedding_function
+        self.dtype = dtype                 # format used when (re)writing
+        self.stored_dtype = dtype          # format of the matrix on disk
+        self.space = space or DEFAULT_SPACE  # on disk wins unless given (rewrites)
+        self._requested_space = space
+        # Collection-level metadata, like a ChromaDB collection's .metadata
+        self.metadata: dict = {}
+        self.ids: list[str] = []
+        self.metadatas: list[dict] = []
+        self.matrix = None
+        self._positions: dict[str, int] = {}
+        self._masks: OrderedDict[str, "np.ndarray"] = OrderedDict()
+        self._load()
+
+    @property
+    def embeddings_path(self) -> str:
+        return os.path.join(self.path, EMBEDDINGS_FILE)
+
+    @property
+    def metadata_path(self) -> str:
+        return os.path.join(self.path, METADATA_FILE)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Check whether an index has been written at path."""
+        return os.path.exists(os.path.join(path, METADATA_FILE))
+
+    def _load(self):
+        """Memory-map an existing index, if any."""
+        if not self.exists(self.path):
+            return
+
+        with open(self.metadata_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(self.embeddings_path, mmap_mode="r")
+        if matrix.shape[0] != len(meta["ids"]):
+            raise ValueError(
+                f"Inconsistent numpy index at {self.path}: "
+                f"{matrix.shape[0]} vectors for {len(meta['ids'])} ids"
+            )
+
+        self.stored_dtype = meta.get("dtype", DEFAULT_NUMPY_DTYPE)
+        self.space = self._requested_space or meta.get("space", DEFAULT_SPACE)
+        self.metadata = meta.get("collection_metadata", {})
+        self.ids = meta["ids"]
+        self.metadatas = meta["metadatas"]
+        self.matrix = matrix
+        self._positions = {skill_id: i for i, skill_id in enumerate(self.ids)}
+        self._masks = OrderedDict()
+
+    def clear(self):
+        """Drop all rows in memory; the next upsert rewrites the index from scratch."""
+        self.ids = []
+        self.metadatas = []
+        self.matrix = None
+        self._positions = {}
+        self._masks = OrderedDict()
+
+    def _dequantized(self) -> "np.ndarray":
+        """Return the stored matrix as float32 (copies; used for rewrites)."""
+        if self.matrix is None:
+            return None
+        matrix = np.array(self.matrix, dtype=np.float32)
+        if self.stored_dtype == "int8":
+            matrix = matrix / INT8_SCALE
+        return matrix
+
+    def _quantize(self, matrix: "np.ndarray") -> "np.ndarray":
+        """Convert a normalized float32 matrix to the storage dtype."""
+        if self.dtype == "int8":
+            return np.clip(np.rint(matrix * INT8_SCALE), -127, 127).astype(np.int8)
+        return matrix.astype(self.dtype)
+
+    def _mask(self, where: dict) -> "np.ndarray":
+        """Boolean row mask for a `where` filter, memoized per distinct filter."""
+        return cached_mask(self._masks, where, lambda w: where_mask(self.metadatas, w))
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get(self, ids: list[str] | None = None, include: list[str] | None = None,
+            **_ignored) -> dict:
+        """
+        Return {"ids", "metadatas"} for the given ids (all when None), plus
+        "embeddings" (normalized float32 rows) if include asks for them.
+        """
+        if ids is None:
+            ids = self.ids
+        found = [skill_id for skill_id in ids if skill_id in self._positions]
+        result = {
+            "ids": found,
+            "metadatas": [self.metadatas[self._positions[i]] for i in found],
+        }
+        if include and "embeddings" in include:
+            rows = np.array([self._positions[i] for i in found], dtype=np.int64)
+            matrix = np.asarray(self.matrix[rows], dtype=np.float32)
+            result["embeddings"] = matrix / INT8_SCALE if self.stored_dtype == "int8" else matrix
+        return result
+
+    def query(self, query_embeddings=None, query_texts: list[str] | None = None,
+              n_results: int = 10, include: list[str] | None = None,
+              where: dict | None = None, **_ignored) -> dict:
+        """
+        Exact top-k by cosine similarity: one matmul plus argpartition.
+        Rows excluded by where are masked out before selection.
+        """
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = normalize_rows(query_embeddings)
+        if not self.ids:
+            return {"ids": [[] for _ in queries], "metadatas": [[] for _ in queries],
+                    "distances": [[] for _ in queries]}
+
+        mask = self._mask(where) if where else None
+        rows, distances = exact_top_k(
+            self.matrix, queries, n_results, mask,
+            INT8_SCALE if self.stored_dtype == "int8" else 1.0, self.space
+        )
+        return {
+            "ids": [[self.ids[j] for j in row] for row in rows],
+            "metadatas": [[self.metadatas[j] for j in row] for row in rows],
+            "distances": distances,
+        }
+
+    def upsert(self, ids: list[str], documents: list[str] | None = None,
+               metadatas: list[dict] | None = None, embeddings=None):
+        """Insert or replace rows and rewrite the index files atomically."""
+        if embeddings is None:
+            embeddings = self.embedding_function(documents)
+        new_rows = normalize_rows(embeddings)
+        metadatas = metadatas or [{} for _ in ids]
+
+        matrix = self._dequantized()
+        if matrix is None:
+            matrix = np.zeros((0, new_rows.shape[1]), dtype=np.float32)
+        skill_ids = list(self.ids)
+        skill_metadatas = list(self.metadatas)
+        positions = dict(self._positions)
+
+        appended = []
+        for skill_id, row, metadata in zip(ids, new_rows, metadatas):
+            if skill_id in positions:
+                matrix[positions[skill_id]] = row
+                skill_metadatas[positions[skill_id]] = metadata
+            else:
+                positions[skill_id] = len(skill_ids)
+                skill_ids.append(skill_id)
+                skill_metadatas.append(metadata)
+                appended.append(row)
+        if appended:
+            matrix = np.vstack([matrix, np.stack(appended)])
+        self._write(matrix, skill_ids, skill_metadatas)
+
+    def delete(self, ids: list[str]):
+        """Remove rows by id (unknown ids are ignored) and rewrite the index."""
+        doomed = {self._positions[skill_id] for skill_id in ids if skill_id in self._positions}
+        if not doomed:
+            return
+        keep = [i for i in range(len(self.ids)) if i not in doomed]
+        self._write(self._dequantized()[keep],
+                    [self.ids[i] for i in keep], [self.metadatas[i] for i in keep])
+
+    def _write(self, matrix: "np.ndarray", skill_ids: list[str], skill_metadatas: list[dict]):
+        """
+        Rewrite the index files atomically (embeddings first, then metadata,
+        which is what readers key on) and reload them.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        stored = self._quantize(matrix)
+        atomic_write(self.embeddings_path, lambda f: np.save(f, stored))
+        meta = {
+            "dtype": self.dtype,
+            "space": self.space,
+            "collection_metadata": self.metadata,
+            "dim": int(matrix.shape[1]),
+            "ids": skill_ids,
+            "metadatas": skill_metadatas,
+        }
+        atomic_write(self.metadata_path, lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        self._load()
+
+
+def parse_chroma_url(url: str) -> tuple[str, int, bool]:
+    """Split 'http[s]://host[:port]' into (host, port, ssl)."""
+    parts = urlsplit(url if "://" in url else f"http://{url}")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Invalid Chroma URL '{url}' (expected http://host:port)")
+    ssl = parts.scheme == "https"
+    return parts.hostname, parts.port or (443 if ssl else 8000), ssl
+
+
+def chroma_http_client(url: str, timeout: float = DEFAULT_CHROMA_TIMEOUT,
+                       pool_size: int = DEFAULT_CHROMA_POOL_SIZE):
+    """
+    Create a ChromaDB HttpClient with a bounded keep-alive connection pool
+    and per-request timeouts.
+
+    ChromaDB caches the client per host:port, so every collection opened in
+    this process shares one httpx session (and its pooled connections).
+
+    chromadb (1.3.5) has no client-side HTTP timeout setting; its session
+    is created with timeout=None, and the timeout is set on that session.
+    Raises RuntimeError rather than run without one if the client no
+    longer has it.
+    """
+    import chromadb
+    import httpx
+    from chromadb.config import Settings
+
+    host, port, ssl = parse_chroma_url(url)
+    settings = Settings(
+        anonymized_telemetry=False,
+        chroma_http_keepalive_secs=CHROMA_KEEPALIVE_SECS,
+        chroma_http_max_connections=pool_size,
+        chroma_http_max_keepalive_connections=pool_size,
+    )
+    # Creating the client already makes a request (user identity)
+    client = with_retries(
+        chromadb.HttpClient, host=host, port=port, ssl=ssl, settings=settings
+    )
+
+    # Without it a hung server would hang the caller forever
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if not isinstance(session, httpx.Client):
+        raise RuntimeError(f"Cannot apply the {timeout:g}s Chroma HTTP timeout: this chromadb "
+                           f"version's HttpClient has no httpx session to set it on")
+    session.timeout = httpx.Timeout(timeout)
+    return client
+
+
+def _is_transient(error: BaseException | None) -> bool:
+    """
+    True for errors worth retrying: connection failures, timeouts, 429/5xx.
+    ChromaDB sometimes re-raises these as ValueError, so the chain is walked.
+    """
+    import httpx
+
+    while error is not None:
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def with_retries(fn, *args, retries: int = CHROMA_RETRIES,
+                 backoff: float = CHROMA_BACKOFF, **kwargs):
+    """
+    Call fn, retrying transient HTTP errors with exponential backoff and
+    full jitter. Other errors, and the last transient one, propagate.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == retries or not _is_transient(e):
+                raise
+            delay = random.uniform(0, backoff * 2 ** attempt)
+            print(f"WARNING: Chroma request failed ({e}); retrying in {delay:.2f}s", file=sys.stderr)
+            time.sleep(delay)
+
+
+class RetryingCollection:
+    """
+    Wrap a ChromaDB HTTP collection so count/get/query/upsert/delete retry
+    transient failures. All four are idempotent (upsert rewrites the same
+    ids), so a retry after a lost response is safe.
+    """
+
+    def __init__(self, collection, retries: int = CHROMA_RETRIES,
+                 backoff: float = CHROMA_BACKOFF):
+        self._collection = collection
+        self._retries = retries
+        self._backoff = backoff
+
+    def _call(self, method: str, *args, **kwargs):
+        return with_retries(
+            getattr(self._collection, method), *args,
+            retries=self._retries, backoff=self._backoff, **kwargs
+        )
+
+    def count(self) -> int:
+        return self._call("count")
+
+    def get(self, *args, **kwargs):
+        return self._call("get", *args, **kwargs)
+
+    def query(self, *args, **kwargs):
+        return self._call("query", *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._call("upsert", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call("delete", *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+def _apply_collection_metadata(client, collection, embedding_function, metadata: dict):
+    """Bring an existing Chroma collection in line with requested metadata."""
+    current = {**(collection.metadata or {}), **hnsw_settings(collection)}
+    changed = rebuild_keys(metadata, current)
+    if changed:
+        print(
+            f"WARNING: Rebuilding collection '{collection.name}': "
+            + ", ".join(f"{k} {current.get(k)} -> {metadata[k]}" for k in changed),
+            file=sys.stderr
+        )
+        with_retries(client.delete_collection, name=collection.name)
+        return with_retries(
+            client.create_collection,
+            name=collection.name,
+            embedding_function=embedding_function,
+            metadata=metadata
+        )
+
+    search_ef = metadata.get("hnsw:search_ef")
+    if search_ef is not None and current.get("hnsw:search_ef") != search_ef:
+        with_retries(collection.modify, configuration={"hnsw": {"ef_search": search_ef}})
+    return collection
+
+
+def _private_persistent_client(path: str):
+    """
+    A PersistentClient on its own ChromaDB System, bypassing (and leaving
+    out of) the per-process cache of one System per path. Returns
+    (client, system).
+
+    chromadb has no public way to do this, so it works on the cache
+    (SharedSystemClient._identifier_to_system, keyed by the path as given;
+    test_vector_backends.py covers the pinned version). If the cache is
+    not found where expected, the shared System is used instead and system
+    is None, with a warning: reloads then may not see other processes' writes.
+    """
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+
+    systems = getattr(SharedSystemClient, "_identifier_to_system", None)
+    if not isinstance(systems, dict):
+        print("WARNING: chromadb has no per-path System cache to bypass; reloaded indexes "
+              "share one System and may not see other processes' writes", file=sys.stderr)
+        return chromadb.PersistentClient(path=path), None
+
+    # Park any cached System so a new one is created, then take the new one out again
+    cached = systems.pop(str(path), None)
+    try:
+        client = chromadb.PersistentClient(path=path)
+    finally:
+        system = systems.pop(str(path), None)
+        if cached is not None:
+            systems[str(path)] = cached
+    if system is None:
+        print("WARNING: chromadb did not cache the System under the index path; reloaded "
+              "indexes may not see other processes' writes", file=sys.stderr)
+    return client, system
+
+
+def open_collection(backend: str, path: str, collection_name: str,
+                    embedding_function, create: bool = False,
+                    metadata: dict | None = None,
+                    numpy_dtype: str = DEFAULT_NUMPY_DTYPE,
+                    fresh: bool = False,
+                    chroma_url: str | None = None,
+                    chroma_timeout: float = DEFAULT_CHROMA_TIMEOUT,
+                    chroma_pool_size: int = DEFAULT_CHROMA_POOL_SIZE):
+    """
+    Open (or with create, get-or-create) the skills collection on a backend.
+
+    For "chroma", path is the PersistentClient directory and a ChromaDB
+    Collection is returned; for "numpy", path is the index directory.
+    Raises if the collection does not exist and create is False.
+
+    ChromaDB caches one client system per path for the life of the process,
+    and that system does not see writes made by other processes. With fresh,
+    the collection gets a System of its own, so it reflects the data on disk
+    now; that System is stopped once the collection is garbage collected.
+    Collections opened earlier keep working.
+
+    With chroma_url, path is ignored and the collection lives on a Chroma
+    server (e.g. the docker-compose service); it is returned wrapped in a
+    RetryingCollection. A server always serves current data, so fresh is
+    not needed there.
+
+    With create, "hnsw:*" keys in metadata (see hnsw_metadata()) are
+    applied to an existing collection too: a different search ef is
+    changed in place (processes that already have the collection open keep
+    the old value until they reopen it, as servers do on the generation
+    bump), while a different space, M or construction ef, or different
+    "embedding:*" settings, rebuild the (then empty) collection, since the
+    stored vectors cannot be converted (see rebuild_keys()). The NumPy
+    backend takes only the space and the embedding settings.
+    """
+    if backend == "chroma":
+        import chromadb
+
+        system = None
+        if chroma_url:
+            client = chroma_http_client(chroma_url, chroma_timeout, chroma_pool_size)
+        elif fresh:
+            client, system = _private_persistent_client(path)
+        else:
+            client = chromadb.PersistentClient(path=path)
+
+        if create:
+            collection = with_retries(
+                client.get_or_create_collection,
+                name=collection_name,
+                embedding_function=embedding_function,
+                metadata=metadata
+            )
+            collection = _apply_collection_metadata(client, collection, embedding_function,
+                                                    metadata or {})
+        else:
+            collection = with_retries(
+                client.get_collection,
+                name=collection_name,
+                embedding_function=embedding_function
+            )
+        if system is not None:
+            # Released with the last reference (e.g. a server's previous index snapshot)
+            weakref.finalize(collection, system.stop)
+        return RetryingCollection(collection) if chroma_url else collection
+
+    if backend == "numpy":
+        if not create and not NumpyBackend.exists(path):
+            raise FileNotFoundError(f"No numpy index at {path}")
+        if not create:
+            return NumpyBackend(path, embedding_function=embedding_function, dtype=numpy_dtype)
+        metadata = metadata or {}
+        collection = NumpyBackend(path, embedding_function=embedding_function, dtype=numpy_dtype,
+                                  space=metadata.get("hnsw:space"))
+        changed = rebuild_keys(metadata, collection.metadata, backend) if collection.ids else []
+        if changed:
+            print(f"WARNING: Rebuilding numpy index at {path}: " + ", ".join(changed),
+                  file=sys.stderr)
+            collection.clear()
+        collection.metadata = dict(metadata)
+        return collection
+
+    raise ValueError(f"Unknown backend '{backend}' (expected one of: {', '.join(BACKENDS)})")